@@ -0,0 +1,51 @@
+"""
+Time PortfolioAnalytics.compute on synthetic SIP portfolios (no database needed).
+
+    python -m benchmarks.bench_analytics --schemes 50 --instalments 120
+"""
+import argparse
+import datetime
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from src.analytics.returns import PortfolioAnalytics
+
+CashFlow = namedtuple("CashFlow", "scheme_id scheme_code scheme_name amount units investment_date nav nav_date")
+
+
+def synthetic_portfolio(schemes: int, instalments: int) -> list:
+    rng = np.random.default_rng(7)
+    start = datetime.datetime(2015, 1, 1)
+    valued_on = (start + datetime.timedelta(days=30 * instalments)).date()
+    rows = []
+    for scheme in range(schemes):
+        growth = 1 + rng.uniform(-0.005, 0.015)
+        for month in range(instalments):
+            purchase_nav = 10 * growth ** month
+            rows.append(CashFlow(f"scheme-{scheme}", f"{100000 + scheme}", f"Scheme {scheme}", 1000.0,
+                                 1000.0 / purchase_nav, start + datetime.timedelta(days=30 * month),
+                                 10 * growth ** instalments, valued_on))
+    return rows
+
+
+def main(schemes: int, instalments: int, runs: int):
+    rows = synthetic_portfolio(schemes, instalments)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = PortfolioAnalytics.compute(rows)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{len(rows)} instalments across {schemes} schemes: "
+          f"min {min(timings):.2f}ms, median {sorted(timings)[len(timings) // 2]:.2f}ms")
+    print(f"portfolio: {result['totals']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schemes", type=int, default=50)
+    parser.add_argument("--instalments", type=int, default=120)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    main(args.schemes, args.instalments, args.runs)
@@ -0,0 +1,68 @@
+"""
+Compare the scheduler's two load modes (batched INSERT ... ON CONFLICT vs COPY + merge)
+on a synthetic feed. Needs a Postgres database reachable through SQL_URL.
+
+    python -m benchmarks.bench_bulk_load --schemes 50000 --runs 3
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from src.db.pg.handler import SQLHandler
+from src.db.pg.sessions import session_util
+from src.scheduler.ingestion import FundIngestionPipeline
+
+
+def synthetic_feed(schemes: int, nav_date: str):
+    async def records():
+        for i in range(schemes):
+            yield {
+                "Scheme_Code": 100000 + i,
+                "Scheme_Name": f"Synthetic Scheme {i} - Direct Plan - Growth",
+                "Mutual_Fund_Family": f"Synthetic Mutual Fund {i % 45}",
+                "Scheme_Type": "Open Ended Schemes",
+                "Net_Asset_Value": round(10 + (i % 997) * 0.731, 4),
+                "Date": nav_date,
+            }
+    return records()
+
+
+async def reset():
+    async with session_util.async_session() as session:
+        await session.execute(text("DELETE FROM fund_schemes WHERE scheme_code LIKE '1_____'"))
+        await session.commit()
+
+
+async def load(mode: str, schemes: int, nav_date: str):
+    async with session_util.async_session() as session:
+        started = time.perf_counter()
+        report = await FundIngestionPipeline(SQLHandler(session=session), load_mode=mode).run(
+            synthetic_feed(schemes, nav_date)
+        )
+        return time.perf_counter() - started, report
+
+
+NAV_DATES = ("14-Oct-2026", "15-Oct-2026", "16-Oct-2026", "17-Oct-2026")
+
+
+async def main(schemes: int, runs: int):
+    print(f"{'mode':<6} {'run':<12} {'seconds':>8} {'rows/s':>10}  stages")
+    for mode in ("batch", "copy"):
+        await reset()
+        # first run inserts every scheme, later runs update them with a new NAV date
+        for run, nav_date in enumerate(NAV_DATES[:runs]):
+            elapsed, report = await load(mode, schemes, nav_date)
+            label = "insert" if run == 0 else f"update #{run}"
+            stages = ", ".join(f"{stage}={ms:.0f}ms" for stage, ms in report.timings_ms.items())
+            print(f"{mode:<6} {label:<12} {elapsed:>8.2f} {schemes / elapsed:>10.0f}  {stages}")
+    await reset()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schemes", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=3, choices=range(1, len(NAV_DATES) + 1))
+    args = parser.parse_args()
+    asyncio.run(main(args.schemes, args.runs))
@@ -0,0 +1,84 @@
+"""
+Time the portfolio revaluation stage on synthetic investments seeded with generate_series.
+Needs a Postgres database reachable through SQL_URL.
+
+    python -m benchmarks.bench_revaluation --investments 1000000 --portfolios 100000 --schemes 5000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from src.core.schemas.scheduler import IngestionReport
+from src.db.pg.handler import SQLHandler
+from src.db.pg.sessions import session_util
+from src.scheduler.fund_schema import SchedulerHandler
+
+SEED = [
+    """INSERT INTO fund_schemes (id, scheme_code, scheme_name, fund_family, fund_type, created_at, updated_at)
+       SELECT gen_random_uuid(), 'REVAL' || i, 'Revaluation Scheme ' || i, 'Revaluation Fund', 'Open', now(), now()
+       FROM generate_series(1, :schemes) AS i""",
+    """INSERT INTO latest_nav (scheme_id, nav, nav_date, updated_at)
+       SELECT id, 10 + random() * 90, current_date, now() FROM fund_schemes WHERE scheme_code LIKE 'REVAL%'""",
+    """INSERT INTO users (id, email, first_name, last_name, password, is_active, created_at, updated_at)
+       VALUES (gen_random_uuid(), 'revaluation-bench@example.com', 'Bench', 'Mark', 'x', true, now(), now())""",
+    """INSERT INTO portfolios (id, user_id, name, created_at, updated_at)
+       SELECT gen_random_uuid(), u.id, 'Bench ' || i, now(), now()
+       FROM users u, generate_series(1, :portfolios) AS i WHERE u.email = 'revaluation-bench@example.com'""",
+    """INSERT INTO investments (id, portfolio_id, scheme_id, amount, units, purchased_nav, investment_date, is_active,
+                                updated_at)
+       SELECT gen_random_uuid(), p.ids[1 + i % cardinality(p.ids)], s.ids[1 + (i * 7919) % cardinality(s.ids)],
+              1000, 1000 / 20.0, 20, now(), true, now()
+       FROM generate_series(1, :investments) AS i,
+            (SELECT array_agg(id) AS ids FROM portfolios WHERE name LIKE 'Bench %') AS p,
+            (SELECT array_agg(id) AS ids FROM fund_schemes WHERE scheme_code LIKE 'REVAL%') AS s""",
+]
+
+
+async def execute(statements: list[str], **params):
+    async with session_util.async_session() as session:
+        for statement in statements:
+            await session.execute(text(statement), params)
+        await session.commit()
+
+
+async def reset():
+    await execute([
+        "DELETE FROM users WHERE email = 'revaluation-bench@example.com'",
+        "DELETE FROM fund_schemes WHERE scheme_code LIKE 'REVAL%'",
+    ])
+
+
+async def revalue(scheme_ids):
+    async with session_util.async_session() as session:
+        report = IngestionReport(changed_scheme_ids=scheme_ids)
+        await SchedulerHandler.revalue_portfolios(SQLHandler(session=session), report)
+        return report
+
+
+async def main(investments: int, portfolios: int, schemes: int, changed: int):
+    await reset()
+    await execute(SEED, investments=investments, portfolios=portfolios, schemes=schemes)
+    async with session_util.async_session() as session:
+        for table in ("investments", "portfolios", "latest_nav"):
+            await session.execute(text(f"ANALYZE {table}"))
+        scheme_ids = (await session.execute(text(
+            "SELECT id FROM fund_schemes WHERE scheme_code LIKE 'REVAL%' ORDER BY scheme_code LIMIT :changed"
+        ), {"changed": changed})).scalars().all()
+    print(f"{'run':<12} {'portfolios':>10} {'investments':>12} {'seconds':>8} {'rows/s':>10}")
+    full_pass = set(range(SQLHandler.MAX_INCREMENTAL_VALUATION_SCHEMES + 1))  # too many changes: values every portfolio
+    for label, changed_ids in (("all schemes", full_pass), (f"{changed} schemes", set(scheme_ids))):
+        report = await revalue(changed_ids)
+        print(f"{label:<12} {report.portfolios_revalued:>10} {report.investments_revalued:>12} "
+              f"{report.timings_ms['revalue'] / 1000:>8.2f} {report.revaluation_rows_per_sec:>10.0f}")
+    await reset()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--investments", type=int, default=1000000)
+    parser.add_argument("--portfolios", type=int, default=100000)
+    parser.add_argument("--schemes", type=int, default=5000)
+    parser.add_argument("--changed", type=int, default=50, help="schemes changed in the incremental run")
+    args = parser.parse_args()
+    asyncio.run(main(args.investments, args.portfolios, args.schemes, args.changed))
@@ -0,0 +1,68 @@
+"""
+Compare the per-row cost of the old response path (jsonable_encoder on the rows, SuccessResponseModel validation,
+jsonable_encoder again, json.dumps) with FastJSONResponse (orjson straight from the row dicts). No database needed.
+
+    python -m benchmarks.bench_serialization --rows 5000
+"""
+import argparse
+import datetime
+import decimal
+import json
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+
+from src.core.schemas.responses import SuccessResponseModel
+from src.utils.serialization import FastJSONResponse
+
+
+def synthetic_rows(rows: int) -> list[dict]:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "scheme_id": uuid.uuid4(),
+            "scheme_code": str(100000 + i),
+            "scheme_name": f"Synthetic Scheme {i} - Direct Plan - Growth",
+            "fund_family": f"Synthetic Mutual Fund {i % 45}",
+            "amount": decimal.Decimal("1000.00"),
+            "units": 1000 / (10 + i % 97),
+            "nav": 10 + (i % 997) * 0.731,
+            "nav_date": now.date(),
+            "investment_date": now,
+            "is_active": True,
+        }
+        for i in range(rows)
+    ]
+
+
+def old_path(rows: list[dict]) -> bytes:
+    data = jsonable_encoder(rows)  # SQLOps.execute_query(json_result=True)
+    model = SuccessResponseModel(message="Investments fetched successfully", data=data)
+    return json.dumps(jsonable_encoder(model)).encode()  # FastAPI serialize_response + JSONResponse.render
+
+
+def new_path(rows: list[dict]) -> bytes:
+    return FastJSONResponse.success(message="Investments fetched successfully", data=rows).body
+
+
+def main(rows: int, runs: int):
+    data = synthetic_rows(rows)
+    print(f"{'path':<8} {'median ms':>10} {'us/row':>8}")
+    for label, encode in (("old", old_path), ("orjson", new_path)):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            encode(data)
+            timings.append(time.perf_counter() - started)
+        median = sorted(timings)[len(timings) // 2]
+        print(f"{label:<8} {median * 1000:>10.2f} {median / rows * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    main(args.rows, args.runs)
@@ -1,8 +1,9 @@
-import datetime
-from datetime import timedelta
-
-from src.scheduler.fund_schema import SchedulerHandler
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from src.cache.nav import nav_cache
+from src.db.pg.sessions import session_util
+from src.logging import logger
+from src.scheduler.runner import SchedulerRunner
+from src.utils.password import password_hasher
+from src.utils.serialization import FastJSONResponse
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,7 +11,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.core.routers import all_routers
 
 
-from src.config import ModuleConfig
+from src.config import ModuleConfig, SchedulerConfig
 
 
 app = FastAPI(
@@ -24,6 +25,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=FastJSONResponse,
 )
 
 app.include_router(all_routers)
@@ -53,25 +55,25 @@ async def root():
     return {"message": f"Welcome to the {ModuleConfig.APP_NAME}!"}
 
 
-# Create scheduler
-scheduler = AsyncIOScheduler()
+# In standalone mode the sync runs in `python scheduler.py`; API workers only keep their NAV cache fresh.
+scheduler_runner = SchedulerRunner(leader_jobs=SchedulerConfig.SCHEDULER_MODE == "embedded")
 
 @app.on_event("startup")
-async def start_scheduler():
-    handler = SchedulerHandler()
+async def warm_nav_cache():
+    try:
+        async with session_util.async_session() as session:
+            await nav_cache.reload(session)
+    except Exception as e:
+        logger.error(f"Could not warm NAV cache at startup: {e}")
 
-    # Schedule the job (every 30 seconds for example)
-    scheduler.add_job(
-        handler.update_all_portfolios,
-        "interval",
-        minutes=60, # Run every 60 minutes
-        # next_run_time=datetime.datetime.now()+timedelta(seconds=10)
-    )
-
-    scheduler.start()
-    print("Scheduler started!")
+@app.on_event("startup")
+async def start_scheduler():
+    await scheduler_runner.start()
 
 @app.on_event("shutdown")
 async def shutdown_scheduler():
-    scheduler.shutdown()
-    print("Scheduler stopped!")
\ No newline at end of file
+    await scheduler_runner.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_password_hasher():
+    password_hasher.shutdown()
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import datetime
+import signal
+
+from src.scheduler.fund_schema import SchedulerHandler
+from src.scheduler.runner import SchedulerRunner
+
+
+async def main():
+    """
+    Run the scheduler on its own, outside the API workers (use with SCHEDULER_MODE=standalone).
+    Several copies may run; only the leader syncs.
+    """
+    runner = SchedulerRunner(leader_jobs=True, local_jobs=False)
+    await runner.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    await runner.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scheduler, or backfill portfolio_daily_value and exit.")
+    subcommands = parser.add_subparsers(dest="command")
+    backfill = subcommands.add_parser("backfill", help="value every user on every day of a date range")
+    backfill.add_argument("--from", dest="start", type=datetime.date.fromisoformat, required=True)
+    backfill.add_argument("--to", dest="end", type=datetime.date.fromisoformat,
+                          default=datetime.datetime.now(datetime.timezone.utc).date())
+    backfill.add_argument("--workers", type=int, default=None, help="days valued concurrently")
+    args = parser.parse_args()
+    if args.command == "backfill":
+        report = asyncio.run(SchedulerHandler.backfill_daily_values(args.start, args.end, workers=args.workers))
+        print(report.summary())
+        raise SystemExit(report.status != "success")
+    asyncio.run(main())
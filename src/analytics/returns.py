@@ -0,0 +1,164 @@
+import datetime
+import time
+
+import numpy as np
+
+DAYS_PER_YEAR = 365.0
+MIN_RATE = -0.9999  # XIRR is only defined for rates above -100%
+MAX_RATE = 1000.0
+
+
+def xirr(amounts: np.ndarray, days: np.ndarray, groups: np.ndarray, n_groups: int,
+         tol: float = 1e-9, max_newton: int = 50, max_bisect: int = 200) -> np.ndarray:
+    """
+    Solve XIRR for many cash-flow series at once.
+
+    Every flow belongs to a group (a scheme, the whole portfolio, ...). Newton's method runs on all groups in
+    lock-step, with the per-group NPV and its derivative summed by np.bincount; groups Newton cannot settle are
+    finished by a vectorized bisection on [MIN_RATE, MAX_RATE].
+
+    :param amounts: Signed cash flows (investments negative, current value positive).
+    :param days: Day of each flow (any common origin, e.g. date ordinals).
+    :param groups: Group index (0..n_groups-1) of each flow.
+    :param n_groups: Number of groups.
+    :return: Annual rate per group; NaN where no rate solves the series (e.g. flows all of one sign).
+    """
+    years = (days - days.min()) / DAYS_PER_YEAR if len(days) else days.astype(float)
+
+    def npv(rates):
+        discount = (1.0 + rates[groups]) ** -years
+        value = np.bincount(groups, amounts * discount, minlength=n_groups)
+        slope = np.bincount(groups, -years * amounts * discount / (1.0 + rates[groups]), minlength=n_groups)
+        return value, slope
+
+    rates = np.full(n_groups, 0.1)
+    done = np.zeros(n_groups, dtype=bool)
+    with np.errstate(all="ignore"):
+        for _ in range(max_newton):
+            value, slope = npv(rates)
+            step = np.where(done | (slope == 0), 0.0, value / slope)
+            rates = np.clip(rates - step, MIN_RATE, MAX_RATE)
+            done |= np.abs(step) < tol * np.maximum(1.0, np.abs(rates))
+            if done.all():
+                break
+        value, _ = npv(rates)
+        scale = np.bincount(groups, np.abs(amounts), minlength=n_groups)
+        solved = done & np.isfinite(rates) & (np.abs(value) <= 1e-6 * np.maximum(scale, 1.0))
+        if solved.all():
+            return rates
+
+        low, high = np.full(n_groups, MIN_RATE), np.full(n_groups, MAX_RATE)
+        value_low, _ = npv(low)
+        value_high, _ = npv(high)
+        bracketed = np.sign(value_low) != np.sign(value_high)
+        for _ in range(max_bisect):
+            mid = (low + high) / 2
+            value_mid, _ = npv(mid)
+            go_high = np.sign(value_mid) == np.sign(value_low)
+            low, value_low = np.where(go_high, mid, low), np.where(go_high, value_mid, value_low)
+            high = np.where(go_high, high, mid)
+            if np.all(high - low < tol):
+                break
+    return np.where(solved, rates, np.where(bracketed, (low + high) / 2, np.nan))
+
+
+class PortfolioAnalytics:
+    """
+    Return metrics of a user's investments, computed in batch with NumPy.
+
+    Each investment is a cash outflow on its investment date; each scheme's holding is a cash inflow of
+    units * latest NAV on that scheme's latest NAV date. From these flows the engine reports, per scheme and for
+    the whole portfolio: absolute (holding-period) return, amount-weighted holding period, CAGR over that
+    holding period, and XIRR.
+
+    Only since-inception metrics are supported: the terminal value is always the latest NAV. Trailing-period
+    returns (1y, 3y, ...) would need the valuation at the period start from nav_series or portfolio_daily_value.
+    """
+
+    @classmethod
+    def compute(cls, rows) -> dict:
+        """
+        Compute analytics for the given investment rows.
+
+        :param rows: Rows with scheme_id, scheme_code, scheme_name, amount, units, investment_date, nav and nav_date.
+        :return: {"as_of", "totals", "schemes", "compute_ms"}.
+        """
+        started = time.perf_counter()
+        rows = list(rows)
+        if not rows:
+            return {"as_of": None, "totals": cls._metrics(0.0, 0.0, 0.0, np.nan, 0), "schemes": [],
+                    "compute_ms": 0.0}
+
+        scheme_ids = np.array([str(row.scheme_id) for row in rows])
+        amount = np.array([row.amount for row in rows], dtype=float)
+        units = np.array([row.units for row in rows], dtype=float)
+        nav = np.array([row.nav for row in rows], dtype=float)
+        invested_on = np.array([cls._ordinal(row.investment_date) for row in rows], dtype=np.int64)
+        valued_on = np.array([cls._ordinal(row.nav_date) for row in rows], dtype=np.int64)
+
+        keys, first_row, idx = np.unique(scheme_ids, return_index=True, return_inverse=True)
+        n_schemes = len(keys)
+        invested = np.bincount(idx, amount, minlength=n_schemes)
+        scheme_units = np.bincount(idx, units, minlength=n_schemes)
+        value = np.bincount(idx, units * nav, minlength=n_schemes)
+        instalments = np.bincount(idx, minlength=n_schemes)
+        valuation_day = np.zeros(n_schemes, dtype=np.int64)
+        np.maximum.at(valuation_day, idx, valued_on)
+        held_days = np.maximum(valuation_day[idx] - invested_on, 0)
+        weighted_days = np.bincount(idx, amount * held_days, minlength=n_schemes)
+
+        # Groups 0..n-1 are the schemes, group n is the whole portfolio.
+        portfolio = n_schemes
+        rates = xirr(
+            amounts=np.concatenate([-amount, value, -amount, value]),
+            days=np.concatenate([invested_on, valuation_day, invested_on, valuation_day]),
+            groups=np.concatenate([idx, np.arange(n_schemes), np.full(len(rows), portfolio),
+                                   np.full(n_schemes, portfolio)]),
+            n_groups=n_schemes + 1,
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            holding_days = np.where(invested > 0, weighted_days / invested, 0.0)
+        schemes = []
+        for i in np.argsort(-value, kind="stable"):
+            row = rows[first_row[i]]
+            schemes.append({
+                "scheme_id": str(row.scheme_id),
+                "scheme_code": row.scheme_code,
+                "scheme_name": row.scheme_name,
+                "units": round(float(scheme_units[i]), 4),
+                **cls._metrics(invested[i], value[i], holding_days[i], rates[i], int(instalments[i])),
+            })
+
+        total_invested = float(invested.sum())
+        total_days = float(weighted_days.sum() / total_invested) if total_invested > 0 else 0.0
+        as_of = datetime.date.fromordinal(int(valuation_day.max()))
+        return {
+            "as_of": as_of,
+            "totals": cls._metrics(total_invested, float(value.sum()), total_days, rates[portfolio], len(rows)),
+            "schemes": schemes,
+            "compute_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    @staticmethod
+    def _metrics(invested: float, value: float, holding_days: float, rate: float, instalments: int) -> dict:
+        invested, value, holding_days = float(invested), float(value), float(holding_days)
+        cagr = None
+        if invested > 0 and value > 0 and holding_days >= 1:
+            cagr = round(((value / invested) ** (DAYS_PER_YEAR / holding_days) - 1) * 100, 2)
+        return {
+            "invested": round(invested, 2),
+            "current_value": round(value, 2),
+            "gain_loss": round(value - invested, 2),
+            "absolute_return_pct": round((value - invested) / invested * 100, 2) if invested > 0 else 0.0,
+            "holding_period_days": round(holding_days, 1),
+            "cagr_pct": cagr,
+            "xirr_pct": round(float(rate) * 100, 2) if np.isfinite(rate) else None,
+            "instalments": instalments,
+        }
+
+    @staticmethod
+    def _ordinal(value) -> int:
+        if isinstance(value, datetime.datetime):
+            value = value.date()
+        return value.toordinal()
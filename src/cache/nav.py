@@ -0,0 +1,130 @@
+import datetime
+from typing import NamedTuple
+
+from src.db.pg.handler import SQLHandler
+from src.logging import logger
+
+
+class NavEntry(NamedTuple):
+    scheme_id: str
+    scheme_code: str
+    nav: float
+    nav_date: datetime.date
+    updated_at: datetime.datetime
+
+    def to_dict(self) -> dict:
+        return {
+            "scheme_id": self.scheme_id,
+            "scheme_code": self.scheme_code,
+            "nav": self.nav,
+            "nav_date": self.nav_date,
+            "updated_at": self.updated_at,
+        }
+
+
+class NavSnapshot(NamedTuple):
+    epoch: int
+    by_code: dict[str, NavEntry]
+    by_id: dict[str, NavEntry]
+    loaded_at: datetime.datetime | None
+
+    def get_by_code(self, scheme_code: str) -> NavEntry | None:
+        return self.by_code.get(str(scheme_code))
+
+    def get_by_id(self, scheme_id: str) -> NavEntry | None:
+        return self.by_id.get(str(scheme_id))
+
+
+class NavCache:
+    """
+    In-process cache of the latest NAV per scheme, keyed by scheme_code and scheme_id.
+
+    The whole snapshot is replaced with a single assignment after every successful NAV sync,
+    so readers always see one consistent snapshot. ``epoch`` identifies that snapshot: it is the
+    newest latest_nav.updated_at (in milliseconds), which is the same in every worker for the same data.
+    """
+
+    def __init__(self):
+        self.snapshot = NavSnapshot(epoch=0, by_code={}, by_id={}, loaded_at=None)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def epoch(self) -> int:
+        return self.snapshot.epoch
+
+    def get_by_code(self, scheme_code: str) -> NavEntry | None:
+        return self._count(self.snapshot.get_by_code(scheme_code))
+
+    def get_by_id(self, scheme_id: str) -> NavEntry | None:
+        return self._count(self.snapshot.get_by_id(scheme_id))
+
+    def swap(self, rows) -> NavSnapshot:
+        """
+        Build a new snapshot from latest NAV rows and swap it in.
+
+        :param rows: Iterable of rows with scheme_id, scheme_code, nav, nav_date and updated_at.
+        :return: The new snapshot.
+        """
+        by_code, by_id = {}, {}
+        newest = None
+        for row in rows:
+            entry = NavEntry(str(row.scheme_id), str(row.scheme_code), float(row.nav), row.nav_date, row.updated_at)
+            by_code[entry.scheme_code] = entry
+            by_id[entry.scheme_id] = entry
+            if entry.updated_at and (newest is None or entry.updated_at > newest):
+                newest = entry.updated_at
+        epoch = self.epoch_of(newest)
+        self.snapshot = NavSnapshot(epoch=epoch, by_code=by_code, by_id=by_id,
+                                    loaded_at=datetime.datetime.now(datetime.timezone.utc))
+        return self.snapshot
+
+    async def reload(self, session) -> NavSnapshot:
+        """
+        Reload the cache from latest_nav.
+
+        :param session: Database session to read from.
+        :return: The new snapshot.
+        """
+        rows = await SQLHandler(session=session).fetch_latest_navs()
+        snapshot = self.swap(rows)
+        logger.info(f"NAV cache loaded: {len(snapshot.by_code)} schemes, epoch {snapshot.epoch}")
+        return snapshot
+
+    async def refresh_if_stale(self, session) -> bool:
+        """
+        Reload the cache if latest_nav has moved past the cached epoch, e.g. after a sync run by another process.
+
+        :param session: Database session to read from.
+        :return: True if the cache was reloaded.
+        """
+        newest = await SQLHandler(session=session).fetch_latest_nav_updated_at()
+        if self.epoch_of(newest) == self.snapshot.epoch:
+            return False
+        await self.reload(session)
+        return True
+
+    @staticmethod
+    def epoch_of(updated_at: datetime.datetime | None) -> int:
+        return int(updated_at.timestamp() * 1000) if updated_at else 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "epoch": self.snapshot.epoch,
+            "schemes": len(self.snapshot.by_code),
+            "loaded_at": self.snapshot.loaded_at,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _count(self, entry: NavEntry | None) -> NavEntry | None:
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+
+nav_cache = NavCache()
@@ -0,0 +1,245 @@
+import asyncio
+import functools
+import hashlib
+import time
+from collections import OrderedDict
+
+from fastapi.responses import Response, StreamingResponse
+
+from src.config import CacheConfig
+from src.logging import logger
+from src.utils.serialization import JSONUtil
+
+
+class MemoryBackend:
+    """
+    In-process, bounded LRU store of rendered response bodies, each expiring after its TTL.
+    A ``max_size`` of 0 stores nothing.
+    """
+
+    def __init__(self, max_size: int = CacheConfig.RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, body: bytes, ttl_seconds: float):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = (time.monotonic() + ttl_seconds, body)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "size": len(self.entries), "max_size": self.max_size,
+                "evictions": self.evictions}
+
+
+class RedisBackend:
+    """
+    Response bodies in a Redis-protocol server, shared by every worker. Expiry uses the server's TTLs and the size
+    bound is the server's own eviction policy (e.g. ``maxmemory-policy allkeys-lru``).
+    """
+
+    def __init__(self, client, prefix: str = CacheConfig.RESPONSE_CACHE_PREFIX):
+        """
+        :param client: An asyncio Redis client (``redis.asyncio.Redis`` or anything with the same get/set/
+            scan_iter/delete methods).
+        :param prefix: Prefix of every key written by this cache.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str = CacheConfig.RESPONSE_CACHE_REDIS_URL) -> "RedisBackend":
+        import redis.asyncio  # only needed when RESPONSE_CACHE_BACKEND=redis
+
+        return cls(redis.asyncio.Redis.from_url(url))
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, body: bytes, ttl_seconds: float):
+        await self.client.set(self.prefix + key, body, px=max(int(ttl_seconds * 1000), 1))
+
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}*", count=1000)]
+        if keys:
+            await self.client.delete(*keys)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "prefix": self.prefix}
+
+
+class ResponseCache:
+    """
+    Cache of rendered responses that are the same for every user.
+
+    Handler methods opt in with the ``cached`` decorator. Concurrent misses on one key are collapsed (single-flight):
+    the first request computes the response and the others in this worker wait for its result, so an expiry costs
+    one query per worker instead of one per waiting request. Entries live for ``ttl_seconds`` at most and the whole
+    cache is invalidated whenever a NAV sync changes the data.
+    """
+
+    def __init__(self, backend, ttl_seconds: float = CacheConfig.RESPONSE_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_config(cls) -> "ResponseCache":
+        if CacheConfig.RESPONSE_CACHE_BACKEND == "redis":
+            return cls(RedisBackend.from_url())
+        return cls(MemoryBackend())
+
+    @staticmethod
+    def default_key(*args, **kwargs) -> str:
+        """
+        Build a key from a handler method's arguments (pydantic models count by their fields).
+        """
+        return hashlib.sha1(JSONUtil.dumps([args, sorted(kwargs.items())])).hexdigest()
+
+    def cached(self, namespace: str, key=None):
+        """
+        Decorate a handler method so its successful JSON responses are cached.
+
+        :param namespace: Name of the cached endpoint, prefixed to every key.
+        :param key: Callable taking the method's arguments (without self) and returning the cache key, or None to
+            bypass the cache for that call (e.g. streamed responses). Defaults to ``default_key``.
+        :return: The decorator.
+        """
+        key_func = key or self.default_key
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(handler, *args, **kwargs):
+                cache_key = key_func(*args, **kwargs)
+                if cache_key is None:
+                    return await func(handler, *args, **kwargs)
+                return await self.get_or_compute(f"{namespace}:{cache_key}",
+                                                 lambda: func(handler, *args, **kwargs))
+
+            return wrapper
+
+        return decorator
+
+    async def get_or_compute(self, key: str, compute):
+        """
+        Serve ``key`` from the backend, or compute, store and return it, collapsing concurrent misses.
+
+        :param key: Cache key.
+        :param compute: Coroutine function producing the handler's result.
+        :return: A JSON response (or the handler's own result when it cannot be cached).
+        """
+        body = await self._backend_get(key)
+        if body is not None:
+            self.hits += 1
+            return self._response(body)
+
+        flight = self.in_flight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            try:
+                body = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # The computing request went away; compute ourselves unless it is this request being cancelled
+                if not flight.cancelled():
+                    raise
+                body = None
+            if body is not None:
+                return self._response(body)
+            return await compute()
+
+        self.misses += 1
+        invalidations = self.invalidations
+        flight = asyncio.get_running_loop().create_future()
+        # Waiters may all be gone by the time the flight fails; do not log its exception as never retrieved
+        flight.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self.in_flight[key] = flight
+        try:
+            result = await compute()
+            body = self._render(result)
+            # Not stored if the cache was invalidated meanwhile: the result may predate the sync
+            if body is not None and invalidations == self.invalidations:
+                await self._backend_set(key, body)
+            flight.set_result(body)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+        return self._response(body) if body is not None else result
+
+    async def invalidate(self):
+        """
+        Drop every cached response, e.g. after a NAV sync.
+        """
+        self.invalidations += 1
+        try:
+            await self.backend.clear()
+        except Exception as e:
+            # A failed invalidation leaves entries to expire by TTL; it must not fail the sync
+            logger.error(f"Error invalidating response cache: {e}")
+
+    async def _backend_get(self, key: str) -> bytes | None:
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            # An unreachable cache server degrades to computing every response, not to failing requests
+            logger.error(f"Error reading response cache: {e}")
+            return None
+
+    async def _backend_set(self, key: str, body: bytes):
+        try:
+            await self.backend.set(key, body, self.ttl_seconds)
+        except Exception as e:
+            logger.error(f"Error writing response cache: {e}")
+
+    @staticmethod
+    def _render(result) -> bytes | None:
+        if isinstance(result, StreamingResponse):
+            return None
+        if isinstance(result, Response):
+            return result.body if result.status_code == 200 and result.media_type == "application/json" else None
+        return JSONUtil.dumps(result)
+
+    @staticmethod
+    def _response(body: bytes) -> Response:
+        # A new response per request: callers add their own headers (ETag, Cache-Control) to it
+        return Response(content=body, media_type="application/json")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **self.backend.stats(),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "in_flight": len(self.in_flight),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache.from_config()
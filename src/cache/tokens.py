@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+
+from src.config import JWTConfig
+
+
+class TokenCache:
+    """
+    In-process, bounded LRU cache of verified JWTs → decoded claims, so a client polling with the same token is not
+    re-verified on every request. An entry is dropped once the token's ``exp`` passes.
+
+    Entries are keyed by the whole token, not the signature alone: a cached signature must never vouch for a
+    different header or payload. A ``max_size`` of 0 disables the cache.
+    """
+
+    def __init__(self, max_size: int = JWTConfig.JWT_TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> dict | None:
+        entry = self.entries.get(token)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self.entries[token]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(token)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, token: str, claims: dict):
+        if self.max_size <= 0 or "exp" not in claims:
+            return
+        self.entries[token] = (float(claims["exp"]), claims)
+        self.entries.move_to_end(token)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache()
@@ -0,0 +1,83 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import NamedTuple
+
+from src.config import AuthConfig
+
+
+class UserPrincipal(NamedTuple):
+    """
+    The authenticated user as seen by the endpoints: detached from any session, so it can be cached.
+    """
+    id: uuid.UUID
+    email: str
+    first_name: str
+    last_name: str
+    is_active: bool
+
+
+class UserCache:
+    """
+    In-process, bounded LRU cache of active user principals keyed by user_id.
+
+    Entries expire after ``ttl_seconds`` so a change made through another worker is picked up quickly; changes made
+    through this worker call ``invalidate`` straight away. A ``max_size`` of 0 disables the cache.
+    """
+
+    def __init__(self, max_size: int = AuthConfig.AUTH_USER_CACHE_SIZE,
+                 ttl_seconds: float = AuthConfig.AUTH_USER_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, tuple[float, UserPrincipal]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id) -> UserPrincipal | None:
+        key = str(user_id)
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, principal: UserPrincipal):
+        if self.max_size <= 0 or not principal.is_active:
+            return
+        key = str(principal.id)
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id):
+        """
+        Drop a user's entry, e.g. after the user was updated or deactivated.
+
+        :param user_id: ID of the user.
+        """
+        self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+user_cache = UserCache()
@@ -19,6 +19,8 @@ class _ModuleConfig(BaseSettings):
     CORS_ORIGINS: list[str] = ['*']
     APP_NAME: str = "Mutual Fund Backend API"
     MODULE_VERSION: str = "0.1"
+    INTERNAL_API_TOKEN: str = ""  # X-Internal-Token required by /api/internal/*; empty disables those endpoints
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 60  # how long browsers/CDNs may serve shared NAV-derived responses unrevalidated
 
     @model_validator(mode="before")
     def validate(cls, values: dict[str, Any]) -> dict[str, Any]:
@@ -47,6 +49,11 @@ class _JWTConfig(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60  # default to 1 hour
+    JWT_REFRESH_TOKEN_EXPIRE_MINUTES: int = 10080  # refresh tokens (POST /auth/refresh), default 7 days; 0 disables
+    JWT_KEY_ID: str = "default"  # kid header of the tokens signed with JWT_SECRET_KEY
+    # Keys still accepted for verification while tokens they signed expire: "kid1:secret1,kid2:secret2"
+    JWT_PREVIOUS_KEYS: str = ""
+    JWT_TOKEN_CACHE_SIZE: int = 10000  # verified tokens cached per worker until they expire; 0 disables
 
     @model_validator(mode="before")
     def validate(cls, values: dict[str, Any]) -> dict[str, Any]:
@@ -61,8 +68,70 @@ class _JWTConfig(BaseSettings):
         """
         if "JWT_SECRET_KEY" not in values or not values["JWT_SECRET_KEY"]:
             raise ValueError("JWT_SECRET_KEY must be provided")
+        for key in filter(None, values.get("JWT_PREVIOUS_KEYS", "").split(",")):
+            if ":" not in key:
+                raise ValueError("JWT_PREVIOUS_KEYS must be a comma separated list of kid:secret pairs")
         return values
 
+class _AuthConfig(BaseSettings):
+    """
+    Configuration settings for authentication.
+    This class is used to load environment variables related to authenticating requests.
+    """
+    AUTH_USER_CACHE_SIZE: int = 10000  # active users cached per worker by get_current_user; 0 disables
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30  # how long another worker's change to a user can go unseen
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # bcrypt cost factor; existing hashes are rehashed on login when it changes
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" (bcrypt releases the GIL) or "process"
+    PASSWORD_HASH_WORKERS: int = 2  # hashes computed concurrently per API worker
+    PASSWORD_HASH_MAX_PENDING: int = 32  # hashes allowed to wait for a worker before requests get 429
+
+    @model_validator(mode="before")
+    def validate(cls, values: dict[str, Any]) -> dict[str, Any]:
+        """
+        Validate the authentication configuration settings.
+
+        Args:
+            values (Any): The values to validate.
+        Returns:
+            Self: The validated authentication configuration instance.
+        """
+        if "PASSWORD_HASH_EXECUTOR" in values:
+            if values["PASSWORD_HASH_EXECUTOR"].lower() not in ("thread", "process"):
+                raise ValueError("PASSWORD_HASH_EXECUTOR must be 'thread' or 'process'")
+            values["PASSWORD_HASH_EXECUTOR"] = values["PASSWORD_HASH_EXECUTOR"].lower()
+        if "PASSWORD_BCRYPT_ROUNDS" in values and not 4 <= int(values["PASSWORD_BCRYPT_ROUNDS"]) <= 31:
+            raise ValueError("PASSWORD_BCRYPT_ROUNDS must be between 4 and 31")
+        return values
+
+
+class _CacheConfig(BaseSettings):
+    """
+    Configuration settings for the shared response cache.
+    This class is used to load environment variables related to caching public (non-user) responses.
+    """
+    RESPONSE_CACHE_BACKEND: str = "memory"  # "memory" (per worker) or "redis" (shared by every worker)
+    RESPONSE_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    RESPONSE_CACHE_PREFIX: str = "mf:response:"  # key prefix in Redis; invalidation deletes every key under it
+    RESPONSE_CACHE_SIZE: int = 1000  # responses kept per worker by the memory backend; 0 disables the cache
+    RESPONSE_CACHE_TTL_SECONDS: float = 300  # upper bound; every NAV sync also invalidates the cache
+
+    @model_validator(mode="before")
+    def validate(cls, values: dict[str, Any]) -> dict[str, Any]:
+        """
+        Validate the response cache configuration settings.
+
+        Args:
+            values (Any): The values to validate.
+        Returns:
+            Self: The validated cache configuration instance.
+        """
+        if "RESPONSE_CACHE_BACKEND" in values:
+            if values["RESPONSE_CACHE_BACKEND"].lower() not in ("memory", "redis"):
+                raise ValueError("RESPONSE_CACHE_BACKEND must be 'memory' or 'redis'")
+            values["RESPONSE_CACHE_BACKEND"] = values["RESPONSE_CACHE_BACKEND"].lower()
+        return values
+
+
 class _SQLConfig(BaseSettings):
     """
     Configuration settings for SQL.
@@ -70,6 +139,12 @@ class _SQLConfig(BaseSettings):
     """
     SQL_URL: str
     SQL_DATABASE: str = "mutual_funds"
+    SQL_POOL_SIZE: int = 5
+    SQL_MAX_OVERFLOW: int = 10
+    SQL_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    SQL_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    SQL_POOL_PRE_PING: bool = True
+    SQL_CONNECT_TIMEOUT: int = 10  # seconds
 
     @model_validator(mode="before")
     def validate(cls, values: dict[str, Any]) -> dict[str, Any]:
@@ -85,6 +160,8 @@ class _SQLConfig(BaseSettings):
         if "SQL_URL" not in values or not values["SQL_URL"]:
             raise ValueError("SQL_URL must be provided")
         values["SQL_URL"] = values["SQL_URL"].strip().rstrip('/')
+        if "SQL_POOL_PRE_PING" in values and isinstance(values["SQL_POOL_PRE_PING"], str):
+            values['SQL_POOL_PRE_PING'] = values['SQL_POOL_PRE_PING'] in ('true', '1')
         return values
 
 class _RapidAPIConfig(BaseSettings):
@@ -115,8 +192,19 @@ class _SchedulerConfig(BaseSettings):
     Configuration settings for Scheduler.
     This class is used to load environment variables related to Scheduler.
     """
-    SCHEDULER_ENABLED: bool = True
-    SCHEDULER_INTERVAL_SECONDS: int = 3600  # default to 1 hour
+    SCHEDULER_ENABLED: bool = True  # False: no sync/summary jobs in this deployment (caches still refresh)
+    SCHEDULER_INTERVAL_SECONDS: int = 3600  # full refresh (scheme master + NAVs), default to 1 hour
+    SCHEDULER_NAV_INTERVAL_SECONDS: int = 900  # NAV-only refresh; 0 disables
+    SCHEDULER_SUMMARY_INTERVAL_SECONDS: int = 21600  # summary table rebuild; 0 disables
+    SCHEDULER_CACHE_INTERVAL_SECONDS: int = 30  # per-worker NAV cache check; 0 disables
+    SCHEDULER_JITTER_SECONDS: int = 60  # random delay added to each sync run so workers/pods don't align
+    SCHEDULER_BATCH_SIZE: int = 1000  # rows per upsert statement during ingestion
+    SCHEDULER_LOAD_MODE: str = "batch"  # "batch" (INSERT ... ON CONFLICT per batch) or "copy" (COPY into staging + merge)
+    SCHEDULER_MODE: str = "embedded"  # "embedded" (API workers elect a leader) or "standalone" (python scheduler.py)
+    SCHEDULER_LOCK_KEY: int = 7310021  # Postgres advisory lock key held by the scheduler leader
+    SCHEDULER_HEARTBEAT_SECONDS: int = 15
+    SCHEDULER_SNAPSHOT_RETENTION_DAYS: int = 30  # portfolio snapshots older than this are pruned; 0 keeps them all
+    SCHEDULER_BACKFILL_WORKERS: int = 4  # days valued concurrently by the portfolio_daily_value backfill
 
     @model_validator(mode="before")
     def validate(cls, values: dict[str, Any]) -> dict[str, Any]:
@@ -131,13 +219,23 @@ class _SchedulerConfig(BaseSettings):
         """
         if "SCHEDULER_ENABLED" in values:
             values['SCHEDULER_ENABLED'] = values['SCHEDULER_ENABLED'] in ('true', '1')
+        if "SCHEDULER_LOAD_MODE" in values:
+            if values["SCHEDULER_LOAD_MODE"].lower() not in ("batch", "copy"):
+                raise ValueError("SCHEDULER_LOAD_MODE must be 'batch' or 'copy'")
+            values["SCHEDULER_LOAD_MODE"] = values["SCHEDULER_LOAD_MODE"].lower()
+        if "SCHEDULER_MODE" in values:
+            if values["SCHEDULER_MODE"].lower() not in ("embedded", "standalone"):
+                raise ValueError("SCHEDULER_MODE must be 'embedded' or 'standalone'")
+            values["SCHEDULER_MODE"] = values["SCHEDULER_MODE"].lower()
         return values
 
 
 ModuleConfig = _ModuleConfig()
 JWTConfig = _JWTConfig()
+AuthConfig = _AuthConfig()
+CacheConfig = _CacheConfig()
 SQLConfig = _SQLConfig()
 RapidAPIConfig = _RapidAPIConfig()
 SchedulerConfig = _SchedulerConfig()
 
-__all__ = ["ModuleConfig", "JWTConfig", "SQLConfig", "RapidAPIConfig", "SchedulerConfig"]
+__all__ = ["ModuleConfig", "JWTConfig", "AuthConfig", "CacheConfig", "SQLConfig", "RapidAPIConfig", "SchedulerConfig"]
@@ -1,12 +1,17 @@
-from fastapi import Depends, HTTPException
+import hmac
+import uuid
+
+from fastapi import Depends, Header, HTTPException, Request, status
 
 import jwt
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config import JWTConfig
+from src.cache.users import UserPrincipal, user_cache
+from src.config import ModuleConfig
+from src.db.pg.handler import SQLHandler
 from src.db.pg.sessions import get_db
-from src.db.pg.sql_schemas import Users
+from src.utils.jwt_util import JWTUtil
 
 security = HTTPBearer()
 
@@ -15,18 +20,41 @@ class ModuleAuthenticationHandler:
 
     @staticmethod
     async def get_current_user(
+            request: Request,
             credentials: HTTPAuthorizationCredentials = Depends(security),
-            db: Session = Depends(get_db)
-    ):
+            db: AsyncSession = Depends(get_db)
+    ) -> UserPrincipal:
+        # Resolved once per request, however many router/endpoint dependencies ask for it
+        if (principal := getattr(request.state, "current_user", None)) is not None:
+            return principal
         try:
-            payload = jwt.decode(credentials.credentials, JWTConfig.JWT_SECRET_KEY, algorithms=[JWTConfig.JWT_ALGORITHM])
+            payload = JWTUtil.decode_token(credentials.credentials)
             user_id: str = payload.get("user_id")
             if user_id is None:
                 raise HTTPException(status_code=401, detail="Invalid token")
-        except jwt.PyJWTError:
+            user_id = uuid.UUID(user_id)
+        except (jwt.PyJWTError, ValueError):
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        user = db.query(Users).filter(Users.id == user_id).first()
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
+        principal = user_cache.get(user_id)
+        if principal is None:
+            user = await SQLHandler(session=db).fetch_user_principal_by_id(user_id)
+            if not user or not user.is_active:
+                raise HTTPException(status_code=401, detail="User not found")
+            principal = UserPrincipal(user.id, user.email, user.first_name, user.last_name, user.is_active)
+            user_cache.put(principal)
+        request.state.current_user = principal
+        return principal
+
+    @staticmethod
+    async def require_internal_token(x_internal_token: str | None = Header(default=None)):
+        """
+        Guard the operational endpoints with the shared INTERNAL_API_TOKEN instead of a user login, so
+        self-registered users cannot read pool, cache or scheduler internals. Without a configured token the
+        endpoints do not exist.
+        """
+        if not ModuleConfig.INTERNAL_API_TOKEN:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+        if not x_internal_token or not hmac.compare_digest(x_internal_token.encode(),
+                                                          ModuleConfig.INTERNAL_API_TOKEN.encode()):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal token")
@@ -0,0 +1,53 @@
+from fastapi import Depends, HTTPException, Request, status
+
+from src.cache.nav import nav_cache
+from src.cache.users import UserPrincipal
+from src.config import ModuleConfig
+from src.core.handlers.auth import ModuleAuthenticationHandler
+from src.db.pg.handler import SQLHandler
+from src.db.pg.sessions import get_db
+from src.utils.http_cache import ConditionalGet
+
+
+class HTTPCacheHandler:
+    """
+    Conditional GET for NAV-derived endpoints. ETags are derived from data versions rather than response bodies,
+    so a 304 is answered before the handler runs: the worker's NAV cache epoch for shared data, and the user's
+    investments_version plus the database's NAV epoch for per-user data.
+    """
+
+    @staticmethod
+    def _check(request: Request, etag: str | None, cache_control: str) -> ConditionalGet:
+        validators = ConditionalGet(etag=etag, cache_control=cache_control)
+        if validators.not_modified(request.headers.get("if-none-match")):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators.headers)
+        return validators
+
+    @staticmethod
+    async def shared(request: Request) -> ConditionalGet:
+        """
+        Validators for data that is the same for every user (served publicly, so a CDN can cache it).
+        No ETag is sent until this worker's NAV cache has been loaded.
+        """
+        epoch = nav_cache.epoch
+        return HTTPCacheHandler._check(request, f'W/"nav-{epoch}"' if epoch else None,
+                                       f"public, max-age={ModuleConfig.HTTP_CACHE_MAX_AGE_SECONDS}")
+
+    @staticmethod
+    async def per_user(request: Request,
+                       user: UserPrincipal = Depends(ModuleAuthenticationHandler.get_current_user),
+                       session=Depends(get_db)) -> ConditionalGet:
+        """
+        Validators for data derived from NAVs and the current user's investments (private: never stored by a CDN,
+        always revalidated). The versions are read from the database, not from the TTL-cached principal or this
+        worker's NAV cache, so a write through any worker changes the ETag everywhere at once.
+
+        This is a deliberate trade-off: a per-user 304 still costs one small read (a users primary-key lookup and an
+        index lookup of max(latest_nav.updated_at)), but skips the summary query and the response body. Caching the
+        version per worker would save that read at the price of serving stale 304s for up to the cache TTL after a
+        write made through another worker.
+        """
+        versions = await SQLHandler(session=session).fetch_summary_versions(user.id)
+        epoch = nav_cache.epoch_of(versions.nav_updated_at) if versions else 0
+        etag = f'W/"nav-{epoch}-inv-{versions.investments_version}"' if epoch else None
+        return HTTPCacheHandler._check(request, etag, "private, no-cache")
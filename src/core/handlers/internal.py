@@ -0,0 +1,43 @@
+from src.cache.nav import nav_cache
+from src.cache.responses import response_cache
+from src.cache.tokens import token_cache
+from src.cache.users import user_cache
+from src.core.schemas.responses import SuccessResponseModel
+from src.db.pg.handler import SQLHandler
+from src.db.pg.pool_metrics import pool_metrics
+from src.scheduler.leader import leader_election
+
+
+class InternalHandler:
+    """
+    Handler for internal/operational endpoints (pool statistics, caches, jobs).
+    """
+
+    @staticmethod
+    async def fetch_pool_stats():
+        """
+        Fetch connection pool statistics for every engine in this worker.
+        :return: Pool size, checked-out/idle/overflow counts and checkout wait histogram per pool.
+        """
+        return SuccessResponseModel(message="Pool stats fetched successfully", data=pool_metrics.snapshot())
+
+    @staticmethod
+    async def fetch_cache_stats():
+        """
+        Fetch size, version and hit/miss counters of the in-process caches in this worker.
+        :return: Cache statistics keyed by cache name.
+        """
+        return SuccessResponseModel(message="Cache stats fetched successfully",
+                                    data={"nav": nav_cache.stats(), "users": user_cache.stats(),
+                                          "tokens": token_cache.stats(), "responses": response_cache.stats()})
+
+    @staticmethod
+    async def fetch_scheduler_status(db):
+        """
+        Fetch this process's view of the scheduler leader election and the last run of every scheduler job.
+        :param db: Database session.
+        :return: Instance id, leadership flag, leader-since and last heartbeat timestamps, and the job runs.
+        """
+        jobs = await SQLHandler(session=db).fetch_scheduler_jobs()
+        return SuccessResponseModel(message="Scheduler status fetched successfully",
+                                    data={**leader_election.status(), "jobs": jobs})
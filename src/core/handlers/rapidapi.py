@@ -1,10 +1,22 @@
+import datetime
+import uuid
+
 from fastapi import status
+from fastapi.responses import Response, StreamingResponse
 
+from src.analytics.returns import PortfolioAnalytics
+from src.cache.nav import nav_cache
+from src.cache.responses import ResponseCache, response_cache
 from src.config import RapidAPIConfig
-from src.core.schemas.rapidapi import CreateInvestmentModel, CreateInvestmentDatabaseModel, CreatePortfolio
+from src.core.schemas.rapidapi import CreateInvestmentModel, CreateInvestmentDatabaseModel, CreatePortfolio, \
+    CreateInvestmentBatchModel, FundSchemeListParams
 from src.core.schemas.responses import SuccessResponseModel
 from src.db.pg.handler import SQLHandler
+from src.db.pg.sessions import session_util
 from src.exceptions import MutualFundException
+from src.utils.http_cache import ETagUtil
+from src.utils.pagination import CursorUtil
+from src.utils.serialization import FastJSONResponse, JSONUtil
 
 
 class RapidAPIHandler:
@@ -27,51 +39,142 @@ class RapidAPIHandler:
             "X-RapidAPI-Host": "example-rapidapi-host.p.rapidapi.com"
         }
 
-    async def fetch_fund_families(self,):
-        """Fetch available fund families from RapidAPI"""
-        fund_families = await self.sql_handler.fetch_fund_families()
-        return SuccessResponseModel(message="Fund families fetched successfully", data=fund_families)
+    @response_cache.cached("fund-families",
+                           key=lambda params: None if params.stream else ResponseCache.default_key(params))
+    async def fetch_fund_families(self, params: FundSchemeListParams):
+        """
+        Fetch fund schemes with their latest NAV, one keyset page at a time or streamed as NDJSON
+        :param params: Filters, page size and cursor
+        :return: One page of schemes and the cursor of the next page, or a streaming NDJSON response
+        """
+        after = CursorUtil.decode(params.cursor, size=2) if params.cursor else None
+        filters = {"family": params.family, "fund_type": params.fund_type, "name_prefix": params.name_prefix}
+        if params.stream:
+            return StreamingResponse(self.stream_fund_families(filters=filters, after=after),
+                                     media_type="application/x-ndjson")
+
+        schemes = await self.sql_handler.fetch_fund_families(**filters, after=after, limit=params.limit + 1)
+        next_cursor = None
+        if len(schemes) > params.limit:
+            schemes = schemes[:params.limit]
+            next_cursor = CursorUtil.encode(schemes[-1]["fund_family"], schemes[-1]["scheme_code"])
+        return FastJSONResponse.success(message="Fund families fetched successfully",
+                                        data={"items": schemes, "next_cursor": next_cursor})
+
+    @staticmethod
+    async def stream_fund_families(filters: dict, after: list | None = None):
+        """
+        Yield every matching scheme as one NDJSON line.
+        Uses its own session because the response body is produced after the request dependencies have exited.
+        :param filters: family / fund_type / name_prefix filters
+        :param after: (fund_family, scheme_code) to resume after
+        """
+        async with session_util.async_session() as session:
+            async for row in SQLHandler(session=session).stream_fund_families(**filters, after=after):
+                yield JSONUtil.dumps(row) + b"\n"
+
+    async def fetch_fund_family_index(self, if_none_match: str | None = None):
+        """
+        Fetch the list of fund families with scheme count and latest NAV date
+        :param if_none_match: If-None-Match header sent by the client
+        :return: JSON response with an ETag, or 304 when the client's copy is current
+        """
+        fund_families = await self.sql_handler.fetch_fund_family_index()
+        body = JSONUtil.dumps(
+            SuccessResponseModel.model_construct(message="Fund family index fetched successfully", data=fund_families)
+        )
+        etag = ETagUtil.from_body(body)
+        if ETagUtil.matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
+    @response_cache.cached("schemes-by-family")
     async def fetch_schemes_by_family(self, family_name: str):
         """
         Fetch open-ended schemes for a specific fund family
         :param family_name: Name of the fund family
         :return: List of open-ended schemes
         """
+        if not await self.sql_handler.check_fund_family_exists(family_name):
+            raise MutualFundException(message=f"Unknown fund family: {family_name}",
+                                      code=status.HTTP_404_NOT_FOUND)
         schemes = await self.sql_handler.fetch_fund_family_schemes(family_name)
         if not schemes:
             return SuccessResponseModel(
                 message=f"No schemes found for fund family: {family_name}",
                 data=[]
             )
-        final_schemes = []
-        for scheme in schemes:
-            scheme_data = {
-                "scheme_code": scheme[0].scheme_code,
-                "scheme_name": scheme[0].scheme_name,
-                "fund_family": scheme[0].fund_family,
-                "fund_type": scheme[0].fund_type,
-                "nav": scheme[0].nav_history[-1].nav if scheme[0].nav_history else None,
-                "date": scheme[0].nav_history[-1].updated_at if scheme[0].nav_history else None,
-
-            }
-            final_schemes.append(scheme_data)
-        return SuccessResponseModel(message="Schemes fetched successfully", data=final_schemes)
+        return FastJSONResponse.success(message="Schemes fetched successfully", data=schemes)
 
+    @response_cache.cached("nav-by-scheme-code")
     async def fetch_nav_by_scheme_code(self, scheme_code: str):
         """
-        Fetch current NAV for a specific scheme using RapidAPI
+        Fetch current NAV for a specific scheme, from the in-process NAV cache when possible
         :param scheme_code: Scheme code of the mutual fund
-        :return: Current NAV value or None if not found
+        :return: Columnar NAV payload (codes, navs, dates) of the one scheme
         """
-        nav = await self.sql_handler.fetch_nav_by_scheme_code(scheme_code)
-        if nav is not None:
-            return SuccessResponseModel(message="NAV fetched successfully", data=nav)
+        navs = await self.lookup_navs([scheme_code])
+        if not navs["codes"]:
+            raise MutualFundException(message="NAV not found for the given scheme code",
+                                      data=[],
+                                      code=status.HTTP_404_NOT_FOUND)
+        return FastJSONResponse.success(message="NAV fetched successfully", data=navs, nav_epoch=navs.pop("nav_epoch"))
 
-        raise MutualFundException(message="NAV not found for the given scheme code",
-                                  data=[],
-                                  code=status.HTTP_404_NOT_FOUND)
+    async def fetch_navs_by_scheme_codes(self, scheme_codes: list[str]):
+        """
+        Fetch the current NAV of many schemes in one call
+        :param scheme_codes: Scheme codes of the mutual funds
+        :return: Columnar NAV payload (codes, navs, dates) in request order, plus the codes that were not found
+        """
+        navs = await self.lookup_navs(scheme_codes)
+        return FastJSONResponse.success(message="NAVs fetched successfully", data=navs, nav_epoch=navs.pop("nav_epoch"))
+
+    async def lookup_navs(self, scheme_codes: list[str]) -> dict:
+        """
+        Look up latest NAVs in the in-process NAV cache, then fetch the codes it does not hold (all of them while
+        the cache is cold) with a single query
+        :param scheme_codes: Scheme codes to look up; duplicates are answered once
+        :return: codes/navs/dates columns, missing codes, and the NAV epoch if every NAV came from the cache
+        """
+        scheme_codes = list(dict.fromkeys(scheme_codes))
+        found = {}
+        if nav_cache.epoch:
+            for scheme_code in scheme_codes:
+                if entry := nav_cache.get_by_code(scheme_code):
+                    found[scheme_code] = (entry.nav, entry.nav_date)
+        nav_epoch = nav_cache.epoch or None
+        if uncached := [scheme_code for scheme_code in scheme_codes if scheme_code not in found]:
+            rows = await self.sql_handler.fetch_navs_by_scheme_codes(uncached)
+            if rows:
+                nav_epoch = None
+            for row in rows:
+                found[row.scheme_code] = (float(row.nav), row.nav_date)
 
+        codes = [scheme_code for scheme_code in scheme_codes if scheme_code in found]
+        return {
+            "codes": codes,
+            "navs": [found[scheme_code][0] for scheme_code in codes],
+            "dates": [found[scheme_code][1] for scheme_code in codes],
+            "missing": [scheme_code for scheme_code in scheme_codes if scheme_code not in found],
+            "nav_epoch": nav_epoch,
+        }
+
+    async def resolve_portfolio(self, user_id, portfolio_id: str | None):
+        """
+        Resolve the portfolio an investment goes into: the given one if the user owns it, else the user's default
+        :param user_id: ID of the user making the investment
+        :param portfolio_id: Portfolio requested by the client, if any
+        :return: ID of the portfolio
+        """
+        if not portfolio_id:
+            return await self.sql_handler.upsert_portfolio(user_id=user_id)
+        try:
+            portfolio_id = uuid.UUID(str(portfolio_id))
+        except ValueError:
+            portfolio_id = None
+        if portfolio_id is None or not await self.sql_handler.check_portfolio_owner(portfolio_id, user_id):
+            raise MutualFundException(message="Portfolio not found", code=status.HTTP_404_NOT_FOUND)
+        return portfolio_id
 
     async def create_investment(self, user_id: str, request_data: CreateInvestmentModel):
         """
@@ -80,25 +183,99 @@ class RapidAPIHandler:
         :param request_data: Details of the investment to be created
         :return: Details of the created investment
         """
-        # Fetch the fund scheme by scheme code
-        fund_scheme = await self.sql_handler.fetch_fund_scheme_by_id(request_data.scheme_id)
-        if not fund_scheme:
-            raise MutualFundException(message="Fund scheme not found for the given scheme code",
-                                      code=status.HTTP_404_NOT_FOUND)
+        try:
+            scheme_id = uuid.UUID(str(request_data.scheme_id))
+        except ValueError as e:
+            raise MutualFundException(message="Invalid scheme id", code=status.HTTP_422_UNPROCESSABLE_ENTITY) from e
+
+        request_data.portfolio_id = await self.resolve_portfolio(user_id, request_data.portfolio_id)
 
-        if not request_data.portfolio_id:
-            request_data.portfolio_id = await self.sql_handler.upsert_portfolio(user_id=user_id)
+        # Price from the cached NAV snapshot; fall back to the database for schemes the cache has not seen
+        nav_epoch = nav_cache.epoch
+        if entry := nav_cache.get_by_id(scheme_id):
+            scheme_id, nav = entry.scheme_id, entry.nav
+        else:
+            fund_scheme = await self.sql_handler.fetch_fund_scheme_by_id(scheme_id)
+            if not fund_scheme:
+                raise MutualFundException(message="Fund scheme not found for the given scheme code",
+                                          code=status.HTTP_404_NOT_FOUND)
+            scheme_id, nav, nav_epoch = fund_scheme.id, fund_scheme.latest_nav.nav if fund_scheme.latest_nav else 0, None
 
         # Create the investment record
         create_investment_schema = CreateInvestmentDatabaseModel(
             portfolio_id=str(request_data.portfolio_id),
-            scheme_id=str(fund_scheme.id),
+            scheme_id=str(scheme_id),
             amount=request_data.amount,
-            units=request_data.amount / fund_scheme.nav_history[-1].nav if fund_scheme.nav_history else 0,
-            purchased_nav=fund_scheme.nav_history[-1].nav if fund_scheme.nav_history else 0
+            units=request_data.amount / nav if nav else 0,
+            purchased_nav=nav
         )
+        # The row, the version bump and the valuation refresh are committed together
         await self.sql_handler.create_investment(data=create_investment_schema)
-        return SuccessResponseModel(message="Investment created successfully", data=create_investment_schema.model_dump())
+        await self.sql_handler.bump_investments_version(user_id, commit=False)
+        await self.sql_handler.refresh_portfolio_valuations(user_ids=[user_id])
+        return SuccessResponseModel(message="Investment created successfully", data=create_investment_schema.model_dump(),
+                                    nav_epoch=nav_epoch)
+
+    async def create_investments(self, user_id, request_data: CreateInvestmentBatchModel):
+        """
+        Create several investments (a basket or SIP order) for a user in one transaction
+        :param user_id: ID of the user making the investments
+        :param request_data: Portfolio and line items of the order
+        :return: The created investments and the errors of the rejected line items, by line item index
+        """
+        errors, items = [], []
+        for index, item in enumerate(request_data.investments):
+            try:
+                scheme_id = str(uuid.UUID(item.scheme_id))
+            except ValueError:
+                errors.append({"index": index, "scheme_id": item.scheme_id, "message": "Invalid scheme id"})
+                continue
+            if item.amount <= 0:
+                errors.append({"index": index, "scheme_id": item.scheme_id, "message": "Amount must be positive"})
+                continue
+            items.append((index, scheme_id, item.amount))
+
+        # Price every line item from one NAV snapshot: the cached one if it knows every scheme, else one query
+        scheme_ids = {scheme_id for _, scheme_id, _ in items}
+        snapshot = nav_cache.snapshot
+        navs = {scheme_id: entry.nav for scheme_id in scheme_ids if (entry := snapshot.get_by_id(scheme_id))}
+        nav_epoch = snapshot.epoch or None
+        if len(navs) < len(scheme_ids):
+            navs = await self.sql_handler.fetch_scheme_navs_by_ids([uuid.UUID(scheme_id) for scheme_id in scheme_ids])
+            nav_epoch = None
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        investments, created = [], []
+        for index, scheme_id, amount in items:
+            if scheme_id not in navs:
+                errors.append({"index": index, "scheme_id": scheme_id, "message": "Fund scheme not found"})
+                continue
+            if not (nav := navs[scheme_id]):
+                errors.append({"index": index, "scheme_id": scheme_id, "message": "No NAV available for the scheme"})
+                continue
+            investment = {"id": uuid.uuid4(), "scheme_id": uuid.UUID(scheme_id), "amount": amount,
+                          "units": amount / nav, "purchased_nav": nav, "investment_date": now, "is_active": True,
+                          "updated_at": now}
+            investments.append(investment)
+            created.append({"index": index, "id": investment["id"], "scheme_id": scheme_id, "amount": amount,
+                            "units": investment["units"], "purchased_nav": nav})
+
+        if investments:
+            portfolio_id = await self.resolve_portfolio(user_id, request_data.portfolio_id)
+            for investment in investments:
+                investment["portfolio_id"] = portfolio_id
+
+            # The rows, the version bump and the valuation refresh are committed together
+            await self.sql_handler.create_investments(investments)
+            await self.sql_handler.bump_investments_version(user_id, commit=False)
+            await self.sql_handler.refresh_portfolio_valuations(user_ids=[user_id])
+
+        errors.sort(key=lambda error: error["index"])
+        return FastJSONResponse.success(
+            message=f"{len(created)} of {len(request_data.investments)} investments created successfully",
+            data={"created": created, "errors": errors},
+            nav_epoch=nav_epoch,
+        )
 
     # async def fetch_user_portfolio(self, user_id: str):
     #     """
@@ -139,7 +316,7 @@ class RapidAPIHandler:
 
         """
         investments = await self.sql_handler.fetch_investments_by_user_id(user_id=user_id)
-        return SuccessResponseModel(
+        return FastJSONResponse.success(
             message="Investments fetched successfully",
             data=investments
         )
@@ -186,3 +363,49 @@ class RapidAPIHandler:
             message="Portfolio summary fetched successfully",
             data=portfolio_summary
         )
+
+    async def fetch_portfolio_analytics(self, user_id: str):
+        """
+        Fetch return analytics (XIRR, CAGR, absolute and holding-period returns) of a user's portfolio,
+        in total and per scheme.
+
+        :param user_id: The ID of the user to fetch analytics for.
+        :return: Portfolio analytics.
+        """
+        cash_flows = await self.sql_handler.fetch_investment_cash_flows(user_id=user_id)
+        return SuccessResponseModel(
+            message="Portfolio analytics fetched successfully",
+            data=PortfolioAnalytics.compute(cash_flows)
+        )
+
+    async def fetch_portfolio_history(self, user_id: str, start: datetime.date | None = None,
+                                      end: datetime.date | None = None, granularity: str = "daily"):
+        """
+        Fetch the value of a user's portfolio over time from the stored daily values.
+
+        :param user_id: The ID of the user to fetch the history for.
+        :param start: First day of the range (defaults to one year before end).
+        :param end: Last day of the range (defaults to today).
+        :param granularity: "daily", "weekly" or "monthly"; weekly/monthly points are the last day of each period.
+        :return: Points with date, total_amount, total_value, gain_loss and returns_pct, oldest first.
+        """
+        end = end or datetime.datetime.now(datetime.timezone.utc).date()
+        start = start or end - datetime.timedelta(days=365)
+        if start > end:
+            raise MutualFundException(message="'from' must not be after 'to'", code=status.HTTP_400_BAD_REQUEST)
+        history = await self.sql_handler.fetch_portfolio_history(user_id=user_id, start=start, end=end,
+                                                                 granularity=granularity)
+        points = [
+            {
+                'date': point['value_date'],
+                'total_amount': round(float(point['total_amount']), 2),
+                'total_value': round(float(point['total_value']), 2),
+                'gain_loss': round(float(point['gain_loss']), 2),
+                'returns_pct': round(float(point['returns_pct']), 2),
+            }
+            for point in history
+        ]
+        return SuccessResponseModel(
+            message="Portfolio history fetched successfully",
+            data={"from": start, "to": end, "granularity": granularity, "points": points}
+        )
@@ -1,7 +1,11 @@
+import datetime
+import uuid
+
+import jwt
 from fastapi import status
 from fastapi.responses import Response
 
-from src.core.schemas.user import RegisterUser, LoginUser
+from src.core.schemas.user import RegisterUser, LoginUser, RefreshToken
 from src.db.pg.handler import SQLHandler
 from src.exceptions import MutualFundException
 from src.utils.jwt_util import JWTUtil
@@ -15,19 +19,32 @@ class UserHandler:
 
     async def register_user(self, register_data: RegisterUser):
         """
-        Register a new user with the provided registration data.
+        Register a new user with the provided registration data, together with their default portfolio.
 
         :param register_data: Data required for user registration.
         :return: Confirmation message or user details.
         """
-        if await self.sql_handler.check_user_exists_by_mail(register_data.email):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        user = {
+            **register_data.model_dump(),
+            "id": uuid.uuid4(),
+            "password": await PasswordHashingUtil.hash_password(register_data.password),
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        portfolio = {
+            "id": uuid.uuid4(),
+            "name": "Default Portfolio",
+            "description": "This is the default portfolio.",
+            "created_at": now,
+            "updated_at": now,
+        }
+        if await self.sql_handler.register_user(user=user, portfolio=portfolio) is None:
             raise MutualFundException(
                 code=status.HTTP_409_CONFLICT,
                 message="User with email already exists"
             )
-        register_data.password = PasswordHashingUtil.hash_password(register_data.password)
-        user = await self.sql_handler.insert_new_user(register_data)
-        await self.sql_handler.upsert_portfolio(user_id=user.id)
         return {
             "status": "success",
             "message": "User registered successfully. Please Return Back and Login",
@@ -41,26 +58,64 @@ class UserHandler:
         :param response: fastapi response
         :return: Confirmation message or user details.
         """
-        user = await self.sql_handler.check_user_exists_by_mail(login_data.email)
+        user = await self.sql_handler.fetch_user_credentials_by_email(login_data.email)
         if not user:
             raise MutualFundException(message="User with this email does not exist.",
                                       code=status.HTTP_404_NOT_FOUND)
 
-        if not PasswordHashingUtil.verify_password(login_data.password, user.password):
+        verified, new_hash = await PasswordHashingUtil.verify_and_update(login_data.password, user.password)
+        if not verified:
             raise MutualFundException(message="Invalid Password",
                                       code=status.HTTP_401_UNAUTHORIZED)
-        access_token = JWTUtil.create_access_token({
-            "user_id": str(user.id),
-            "email": str(user.email),
-        })
-        response.headers['Authorization'] = f"{access_token}"
-        response.headers["Access-Control-Expose-Headers"] = "Authorization"
+        if new_hash:
+            # Stored hash used an old cost factor
+            await self.sql_handler.update_user(user.id, {"password": new_hash})
+        self.issue_tokens(response, user_id=user.id, email=user.email)
         return {
             "status": "success",
             "message": "User logged in successfully.",
             "user_id": str(user.id),
         }
 
+    async def refresh_tokens(self, response: Response, refresh_data: RefreshToken):
+        """
+        Exchange a refresh token for a new access token (and a new refresh token), without a password check.
+
+        :param response: fastapi response
+        :param refresh_data: The refresh token issued at login or by the previous refresh.
+        :return: Confirmation message.
+        """
+        try:
+            user_id = uuid.UUID(JWTUtil.decode_token(refresh_data.refresh_token, token_type="refresh")["user_id"])
+        except (jwt.PyJWTError, KeyError, ValueError) as e:
+            raise MutualFundException(message="Invalid refresh token", code=status.HTTP_401_UNAUTHORIZED) from e
+        user = await self.sql_handler.fetch_user_principal_by_id(user_id)
+        if not user or not user.is_active:
+            raise MutualFundException(message="User not found.", code=status.HTTP_401_UNAUTHORIZED)
+        self.issue_tokens(response, user_id=user.id, email=user.email)
+        return {
+            "status": "success",
+            "message": "Tokens refreshed successfully.",
+            "user_id": str(user.id),
+        }
+
+    @staticmethod
+    def issue_tokens(response: Response, user_id, email: str):
+        """
+        Put a new access token in the Authorization header and, when enabled, a refresh token in X-Refresh-Token.
+
+        :param response: fastapi response
+        :param user_id: ID of the user the tokens are for.
+        :param email: Email of the user.
+        """
+        claims = {"user_id": str(user_id), "email": str(email)}
+        response.headers['Authorization'] = f"{JWTUtil.create_access_token(claims)}"
+        exposed = ["Authorization"]
+        if refresh_token := JWTUtil.create_refresh_token(claims):
+            response.headers["X-Refresh-Token"] = refresh_token
+            exposed.append("X-Refresh-Token")
+        response.headers["Access-Control-Expose-Headers"] = ", ".join(exposed)
+
     async def fetch_user_details(self, user_id: str):
         """
         Fetch user details by user ID.
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends
 from .users import user_router
 from .rapidapi import rapidapi_router
+from .internal import internal_router
 from ..handlers.auth import ModuleAuthenticationHandler
 
 all_routers = APIRouter(prefix="/api")
 
 all_routers.include_router(user_router, tags=['User'])
 all_routers.include_router(rapidapi_router, tags=['RapidAPI'], dependencies=[Depends(ModuleAuthenticationHandler.get_current_user)])
+all_routers.include_router(internal_router, tags=['Internal'], dependencies=[Depends(ModuleAuthenticationHandler.require_internal_token)])
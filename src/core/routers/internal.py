@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+
+from src.core.handlers.internal import InternalHandler
+from src.db.pg.sessions import get_db
+
+internal_router = APIRouter(prefix="/internal", include_in_schema=False)
+
+
+@internal_router.get("/pool-stats")
+async def get_pool_stats():
+    """
+    Endpoint to fetch database connection pool statistics for this worker.
+    Used to size SQL_POOL_SIZE / SQL_MAX_OVERFLOW from real checkout wait times.
+    """
+    return await InternalHandler.fetch_pool_stats()
+
+
+@internal_router.get("/cache-stats")
+async def get_cache_stats():
+    """
+    Endpoint to fetch statistics (size, epoch, hit/miss counters) of the in-process caches of this worker.
+    """
+    return await InternalHandler.fetch_cache_stats()
+
+
+@internal_router.get("/scheduler")
+async def get_scheduler_status(session=Depends(get_db)):
+    """
+    Endpoint to fetch whether this worker is the scheduler leader, when it last sent a heartbeat,
+    and the duration/outcome of the last run of every scheduler job.
+    """
+    return await InternalHandler.fetch_scheduler_status(db=session)
@@ -1,21 +1,61 @@
-from fastapi import APIRouter, Depends
+import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, Query
 from watchfiles import awatch
 
 from src.core.handlers.auth import ModuleAuthenticationHandler
+from src.core.handlers.http_cache import HTTPCacheHandler
 from src.core.handlers.rapidapi import RapidAPIHandler
-from src.core.schemas.rapidapi import CreateInvestmentModel
+from src.core.schemas.rapidapi import CreateInvestmentBatchModel, CreateInvestmentModel, FundSchemeListParams, \
+    NavBatchRequest
 from src.db.pg.sessions import get_db
 
 rapidapi_router = APIRouter()
 
 
 @rapidapi_router.get("/fund-families")
-async def get_fund_families(session=Depends(get_db)):
+async def get_fund_families(params: FundSchemeListParams = Depends(), session=Depends(get_db),
+                            http_cache=Depends(HTTPCacheHandler.shared)):
+    """
+    Endpoint to fetch fund schemes with their latest NAV.
+    Keyset-paginated on (fund_family, scheme_code): pass the returned next_cursor as cursor to get the next page.
+    Filter with family, fund_type and name_prefix; set stream=true to receive every match as NDJSON.
+    Returns 304 for If-None-Match matching the current NAV sync's ETag.
+    """
+    return http_cache.apply(await RapidAPIHandler(session=session).fetch_fund_families(params=params))
+
+@rapidapi_router.get("/fund-families/index")
+async def get_fund_family_index(if_none_match: str | None = Header(default=None), session=Depends(get_db)):
+    """
+    Endpoint to fetch the distinct fund families with scheme count and latest NAV date.
+    Served from the fund_families summary table; supports conditional GET via ETag / If-None-Match.
+    """
+    return await RapidAPIHandler(session=session).fetch_fund_family_index(if_none_match=if_none_match)
+
+@rapidapi_router.get("/fund-families/{family_name}/schemes")
+async def get_schemes_by_family(family_name: str, session=Depends(get_db)):
+    """
+    Endpoint to fetch the open-ended schemes of a fund family with their latest NAV.
+    Unknown families are rejected with 404.
+    """
+    return await RapidAPIHandler(session=session).fetch_schemes_by_family(family_name=family_name)
+
+@rapidapi_router.get("/nav/{scheme_code}")
+async def get_nav(scheme_code: str, session=Depends(get_db), http_cache=Depends(HTTPCacheHandler.shared)):
+    """
+    Endpoint to fetch the latest NAV of a scheme as a columnar payload (codes, navs, dates).
+    Unknown scheme codes are rejected with 404; returns 304 for If-None-Match matching the current NAV sync's ETag.
     """
-    Endpoint to fetch fund families from RapidAPI.
-    This is a placeholder implementation and should be replaced with actual logic to call RapidAPI.
+    return http_cache.apply(await RapidAPIHandler(session=session).fetch_nav_by_scheme_code(scheme_code=scheme_code))
+
+@rapidapi_router.post("/nav/batch")
+async def get_navs(nav_request: NavBatchRequest, session=Depends(get_db)):
+    """
+    Endpoint to fetch the latest NAV of up to 5000 schemes in one call, as a columnar payload (codes, navs, dates)
+    in request order. Codes without a NAV are listed in missing.
     """
-    return await RapidAPIHandler(session=session).fetch_fund_families()
+    return await RapidAPIHandler(session=session).fetch_navs_by_scheme_codes(scheme_codes=nav_request.scheme_codes)
 
 @rapidapi_router.post("/investment")
 async def create_investment(create_investment_schema:CreateInvestmentModel, session=Depends(get_db), user=Depends(ModuleAuthenticationHandler.get_current_user)):
@@ -25,6 +65,15 @@ async def create_investment(create_investment_schema:CreateInvestmentModel, sess
     """
     return await RapidAPIHandler(session=session).create_investment(user_id=user.id, request_data=create_investment_schema)
 
+@rapidapi_router.post("/investments/batch")
+async def create_investments(batch: CreateInvestmentBatchModel, session=Depends(get_db),
+                             user=Depends(ModuleAuthenticationHandler.get_current_user)):
+    """
+    Endpoint to create a basket/SIP order of up to 500 investments in one transaction.
+    Every line item is priced from one NAV snapshot; rejected line items are reported by index in errors.
+    """
+    return await RapidAPIHandler(session=session).create_investments(user_id=user.id, request_data=batch)
+
 @rapidapi_router.get("/investments")
 async def get_investment_history(session=Depends(get_db), user=Depends(ModuleAuthenticationHandler.get_current_user)):
     """
@@ -42,10 +91,31 @@ async def get_investment_history(session=Depends(get_db), user=Depends(ModuleAut
 #     return await RapidAPIHandler(session=session).fetch_investments_by_portfolio_id(portfolio_id=portfolio_id)
 
 @rapidapi_router.get("/portfolio/summary")
-async def get_portfolios(session=Depends(get_db), user=Depends(ModuleAuthenticationHandler.get_current_user)):
+async def get_portfolios(session=Depends(get_db), user=Depends(ModuleAuthenticationHandler.get_current_user),
+                         http_cache=Depends(HTTPCacheHandler.per_user)):
     """
     Endpoint to fetch portfolios.
-    This is a placeholder implementation and should be replaced with actual logic to fetch portfolios.
+    Returns 304 for If-None-Match while neither the NAVs nor the user's investments have changed.
     """
     # return await RapidAPIHandler(session=session).fetch_user_portfolio(user_id=user.id)
-    return await RapidAPIHandler(session=session).get_portfolio_summary(user_id=user.id)
+    return http_cache.apply(await RapidAPIHandler(session=session).get_portfolio_summary(user_id=user.id))
+
+@rapidapi_router.get("/portfolio/analytics")
+async def get_portfolio_analytics(session=Depends(get_db), user=Depends(ModuleAuthenticationHandler.get_current_user)):
+    """
+    Endpoint to fetch portfolio return analytics: XIRR, CAGR, absolute and holding-period returns,
+    for the whole portfolio and per scheme.
+    """
+    return await RapidAPIHandler(session=session).fetch_portfolio_analytics(user_id=user.id)
+
+@rapidapi_router.get("/portfolio/history")
+async def get_portfolio_history(from_date: datetime.date | None = Query(default=None, alias="from"),
+                                to_date: datetime.date | None = Query(default=None, alias="to"),
+                                granularity: Literal["daily", "weekly", "monthly"] = "daily",
+                                session=Depends(get_db), user=Depends(ModuleAuthenticationHandler.get_current_user)):
+    """
+    Endpoint to fetch the portfolio value over time for charts, from the precomputed portfolio_daily_value table.
+    Defaults to the last year; weekly and monthly series are downsampled in SQL.
+    """
+    return await RapidAPIHandler(session=session).fetch_portfolio_history(user_id=user.id, start=from_date,
+                                                                          end=to_date, granularity=granularity)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Response
 
-from src.core.schemas.user import RegisterUser, LoginUser
+from src.core.schemas.user import RegisterUser, LoginUser, RefreshToken
 from src.core.handlers.users import UserHandler
 from src.db.pg.sessions import get_db
 from ..handlers.auth import ModuleAuthenticationHandler
@@ -25,6 +25,14 @@ async def login_user(login_data: LoginUser, response: Response, session=Depends(
     """
     return await UserHandler(session=session).login_user(response=response, login_data=login_data)
 
+@user_router.post("/auth/refresh", summary="Refresh access token")
+async def refresh_tokens(refresh_data: RefreshToken, response: Response, session=Depends(get_db)):
+    """
+    Endpoint to exchange the refresh token returned by login (X-Refresh-Token header) for a new access token.
+    Lets clients keep access tokens short-lived without logging in again.
+    """
+    return await UserHandler(session=session).refresh_tokens(response=response, refresh_data=refresh_data)
+
 @user_router.get("/me", summary="Get current user")
 async def get_current_user(user=Depends(ModuleAuthenticationHandler.get_current_user), session=Depends(get_db)):
     """
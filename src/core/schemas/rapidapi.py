@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CreateInvestmentModel(BaseModel):
@@ -19,3 +19,37 @@ class CreatePortfolio(BaseModel):
     """
     name: str
     description: str | None = None
+
+
+class FundSchemeListParams(BaseModel):
+    """
+    Query parameters for listing fund schemes with their latest NAV.
+    Results are ordered by (fund_family, scheme_code); ``cursor`` is the opaque ``next_cursor`` of the previous page.
+    """
+    cursor: str | None = None
+    limit: int = Field(default=500, ge=1, le=5000)
+    family: str | None = None
+    fund_type: str | None = None
+    name_prefix: str | None = None
+    stream: bool = False  # stream every matching row as NDJSON instead of returning one page
+
+
+class NavBatchRequest(BaseModel):
+    """
+    Scheme codes whose latest NAV to look up in one request (duplicates are answered once).
+    """
+    scheme_codes: list[str] = Field(min_length=1, max_length=5000)
+
+
+class InvestmentBatchItem(BaseModel):
+    scheme_id: str
+    amount: float
+
+
+class CreateInvestmentBatchModel(BaseModel):
+    """
+    Schema for a basket/SIP order: several investments into one portfolio (the user's default portfolio if not
+    given). Line items are validated individually; invalid ones are reported without failing the others.
+    """
+    portfolio_id: str | None = None
+    investments: list[InvestmentBatchItem] = Field(min_length=1, max_length=500)
@@ -5,3 +5,4 @@ class SuccessResponseModel(BaseModel):
     status: str = "success"
     message: str | None = None
     data: dict | list | None = None
+    nav_epoch: int | None = None  # NAV snapshot the data was priced from, when NAV-derived
@@ -0,0 +1,72 @@
+import datetime
+import time
+import uuid
+from contextlib import contextmanager
+
+from pydantic import BaseModel, Field
+
+
+class IngestionReport(BaseModel):
+    """
+    Row counts and per-stage timings of one RapidAPI ingestion run.
+    """
+    received: int = 0  # records parsed from the feed
+    valid: int = 0  # records that passed validation/normalization
+    rejected: int = 0  # records dropped by validation
+    batches: int = 0
+    inserted: int = 0  # schemes seen for the first time
+    updated: int = 0  # known schemes whose fingerprint changed
+    unchanged: int = 0  # known schemes skipped because their fingerprint matched
+    skipped: int = 0  # unknown schemes ignored by a NAV-only run
+    schemes_upserted: int = 0
+    navs_upserted: int = 0
+    run_id: uuid.UUID = Field(default_factory=uuid.uuid4)
+    portfolios_revalued: int = 0  # portfolio snapshots written by the revaluation stage
+    investments_revalued: int = 0  # active investments valued by the revaluation stage
+    revaluation_rows_per_sec: float = 0.0
+    status: str = "success"
+    error: str | None = None
+    timings_ms: dict[str, float] = Field(default_factory=dict)
+    changed_scheme_ids: set = Field(default_factory=set, exclude=True)  # schemes whose NAV/details were written
+
+    @contextmanager
+    def timed(self, stage: str):
+        """
+        Add the time spent inside the block to the given stage.
+
+        :param stage: Stage name, e.g. "parse", "normalize", "upsert_schemes".
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.timings_ms[stage] = round(self.timings_ms.get(stage, 0.0) + elapsed, 3)
+
+    def summary(self) -> str:
+        stages = ", ".join(f"{stage}={elapsed:.0f}ms" for stage, elapsed in self.timings_ms.items())
+        return (f"received={self.received} valid={self.valid} rejected={self.rejected} batches={self.batches} "
+                f"inserted={self.inserted} updated={self.updated} unchanged={self.unchanged} skipped={self.skipped} "
+                f"schemes={self.schemes_upserted} navs={self.navs_upserted} "
+                f"revalued={self.portfolios_revalued}/{self.investments_revalued} "
+                f"({self.revaluation_rows_per_sec:.0f} rows/s) [{stages}]")
+
+
+class BackfillReport(BaseModel):
+    """
+    Outcome of one portfolio_daily_value backfill over a date range.
+    """
+    start: datetime.date
+    end: datetime.date
+    workers: int
+    days: int = 0  # days valued successfully
+    rows: int = 0  # user rows written
+    failed_days: list[datetime.date] = Field(default_factory=list)
+    elapsed_ms: float = 0.0
+    status: str = "success"
+    error: str | None = None
+
+    def summary(self) -> str:
+        rate = self.rows / (self.elapsed_ms / 1000) if self.elapsed_ms else 0.0
+        return (f"{self.start}..{self.end} workers={self.workers} days={self.days} rows={self.rows} "
+                f"failed={len(self.failed_days)} in {self.elapsed_ms:.0f}ms ({rate:.0f} rows/s)")
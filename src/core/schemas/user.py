@@ -27,3 +27,10 @@ class LoginUser(BaseModel):
     """
     email: str
     password: str
+
+
+class RefreshToken(BaseModel):
+    """
+    Schema for exchanging a refresh token for new tokens.
+    """
+    refresh_token: str
@@ -1,8 +1,14 @@
+import datetime
+import uuid
+
+from src.cache.users import user_cache
 from src.core.schemas.rapidapi import CreateInvestmentDatabaseModel, CreatePortfolio
-from src.core.schemas.user import RegisterUser
 from src.db.pg.queries import SQLQueries
 from src.db.pg.ops import SQLOps
-from src.db.pg.sql_schemas import Users, Portfolio, Investment, FundScheme, NavHistory
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.db.pg.sql_schemas import Portfolio, FundScheme, NavHistory, LatestNav
+from src.logging import logger
 
 
 class SQLHandler:
@@ -11,28 +17,43 @@ class SQLHandler:
     It provides methods to execute SQL queries and manage database connections.
     """
 
+    # Above this many changed schemes, re-valuing every portfolio in one pass beats an IN list of schemes.
+    MAX_INCREMENTAL_VALUATION_SCHEMES = 1000
+
     def __init__(self, session):
         self.sql_ops = SQLOps(session)
 
-    async def check_user_exists_by_mail(self, email: str):
+    async def fetch_user_credentials_by_email(self, email: str):
         """
-        Check if a user exists with the given email.
+        Fetch the id, email and password hash of an active user by email (used for login).
 
-        :param email: The email of the user to check.
-        :return: True if the user exists, False otherwise.
+        :param email: The email of the user.
+        :return: A row with id, email and password, or None if there is no such active user.
         """
-        query = SQLQueries.check_user_with_email(email)
-        result = await self.sql_ops.execute_query(query=query, first_result=True)
-        return result
+        query = SQLQueries.fetch_user_credentials_by_email(email)
+        result = await self.sql_ops.execute(query)
+        return result.first()
 
-    async def insert_new_user(self, new_user:RegisterUser):
+    async def register_user(self, user: dict, portfolio: dict):
         """
-        Insert a new user into the database.
+        Insert a user and their default portfolio in a single transaction (a single statement on Postgres).
+        A taken email is detected by the unique email index, not by a prior lookup.
 
-        :param new_user: A dictionary containing user data.
-        :return: The result of the insert operation.
+        :param user: Column values of the new user, including its id.
+        :param portfolio: Column values of the default portfolio, without user_id.
+        :return: The new user's ID, or None if the email is already registered.
         """
-        return self.sql_ops.insert_one(new_user.model_dump(), model=Users)
+        if self.sql_ops.dialect_name == "postgresql":
+            user_id = (await self.sql_ops.execute(SQLQueries.register_user_with_portfolio(user, portfolio))).scalar()
+        else:
+            user_id = (await self.sql_ops.execute(SQLQueries.insert_user_if_new(user))).scalar()
+            if user_id is not None:
+                await self.sql_ops.execute(SQLQueries.insert_portfolio({**portfolio, "user_id": user_id}))
+        if user_id is None:
+            await self.sql_ops.rollback()
+            return None
+        await self.sql_ops.commit()
+        return user_id
 
     async def fetch_user_by_id(self, user_id: str):
         """
@@ -45,24 +66,122 @@ class SQLHandler:
         result = await self.sql_ops.execute_query(query=query, first_result=True, json_result=True)
         return result
 
-    async def fetch_fund_families(self):
+    async def fetch_user_principal_by_id(self, user_id):
+        """
+        Fetch the columns of a user that authentication needs.
+
+        :param user_id: The ID of the user to fetch.
+        :return: A row with id, email, first_name, last_name and is_active, or None if not found.
+        """
+        query = SQLQueries.fetch_user_principal_by_id(user_id)
+        result = await self.sql_ops.execute(query)
+        return result.first()
+
+    async def fetch_summary_versions(self, user_id):
+        """
+        Fetch a user's investments_version and the newest latest_nav.updated_at, from the database rather than
+        any per-worker cache, so every worker derives the same ETag.
+
+        :param user_id: The ID of the user.
+        :return: A row with investments_version and nav_updated_at, or None if the user does not exist.
+        """
+        result = await self.sql_ops.execute(SQLQueries.fetch_summary_versions(user_id))
+        return result.first()
+
+    async def bump_investments_version(self, user_id, commit: bool = True):
+        """
+        Increment a user's investments_version, invalidating the ETags of their NAV-derived responses.
+
+        :param user_id: The ID of the user whose investments changed.
+        :param commit: If False, leave the transaction open for the caller to commit.
+        """
+        await self.sql_ops.execute(SQLQueries.bump_investments_version(user_id))
+        if commit:
+            await self.sql_ops.commit()
+
+    async def update_user(self, user_id, data: dict):
+        """
+        Update columns of a user (e.g. a password rehashed with the current cost factor, or is_active) and drop the
+        user's cached principal on this worker.
+
+        :param user_id: The ID of the user to update.
+        :param data: Columns to set.
+        :return: True if the user exists.
+        """
+        data = {**data, "updated_at": datetime.datetime.now(datetime.timezone.utc)}
+        result = await self.sql_ops.execute(SQLQueries.update_user(user_id, data))
+        await self.sql_ops.commit()
+        user_cache.invalidate(user_id)
+        return result.rowcount > 0
+
+    async def fetch_fund_families(self, family: str | None = None, fund_type: str | None = None,
+                                  name_prefix: str | None = None, after: list | None = None, limit: int | None = None):
+        """
+        Fetch one page of fund schemes with their latest NAV.
+
+        :param family: Only schemes of this fund family.
+        :param fund_type: Only schemes of this fund type.
+        :param name_prefix: Only schemes whose name starts with this prefix.
+        :param after: (fund_family, scheme_code) of the last row of the previous page.
+        :param limit: Maximum number of rows to return.
+        :return: A list of fund schemes.
+        """
+        query = SQLQueries.fetch_fund_families(family=family, fund_type=fund_type, name_prefix=name_prefix,
+                                               after=after, limit=limit)
+        result = await self.sql_ops.execute_query(query=query, json_result=True)
+        return result
+
+    async def stream_fund_families(self, family: str | None = None, fund_type: str | None = None,
+                                   name_prefix: str | None = None, after: list | None = None):
         """
-        Fetch all fund families.
+        Stream fund schemes with their latest NAV from a server-side cursor.
 
-        :return: A list of fund families.
+        :param family: Only schemes of this fund family.
+        :param fund_type: Only schemes of this fund type.
+        :param name_prefix: Only schemes whose name starts with this prefix.
+        :param after: (fund_family, scheme_code) to resume after.
+        :return: Async iterator of row mappings.
         """
-        query = SQLQueries.fetch_fund_families()
+        query = SQLQueries.fetch_fund_families(family=family, fund_type=fund_type, name_prefix=name_prefix, after=after)
+        async for row in self.sql_ops.stream_query(query=query):
+            yield row
+
+    async def fetch_fund_family_index(self):
+        """
+        Fetch the fund family summary.
+
+        :return: A list of fund families with scheme count and latest NAV date.
+        """
+        query = SQLQueries.fetch_fund_family_index()
         result = await self.sql_ops.execute_query(query=query, json_result=True)
         return result
 
+    async def check_fund_family_exists(self, fund_family: str) -> bool:
+        """
+        Check whether a fund family is known, using the summary table instead of scanning fund_schemes.
+
+        :param fund_family: The fund family to check.
+        :return: True if the family exists, False otherwise.
+        """
+        query = SQLQueries.check_fund_family_exists(fund_family)
+        return bool(await self.sql_ops.execute_query(query=query, first_result=True))
+
+    async def refresh_fund_family_summary(self):
+        """
+        Rebuild the fund family summary in a single transaction.
+        """
+        await self.sql_ops.execute(SQLQueries.clear_fund_family_summary())
+        await self.sql_ops.execute(SQLQueries.rebuild_fund_family_summary())
+        await self.sql_ops.commit()
+
     async def fetch_fund_family_schemes(self, fund_family: str):
         """
-        Fetch all fund families.
+        Fetch the schemes of a fund family with their latest NAV, in a single query.
         :param fund_family: The fund family to filter schemes.
-        :return: A list of fund families.
+        :return: A list of schemes.
         """
         query = SQLQueries.fetch_schemes_by_family(fund_family=fund_family)
-        result = await self.sql_ops.execute_query(query=query)
+        result = await self.sql_ops.execute_query(query=query, json_result=True)
         return result
 
     async def fetch_nav_by_scheme_code(self, scheme_code: str):
@@ -75,6 +194,72 @@ class SQLHandler:
         result = await self.sql_ops.execute_query(query=query, first_result=True, json_result=True)
         return result
 
+    async def fetch_navs_by_scheme_codes(self, scheme_codes: list[str]):
+        """
+        Fetch the latest NAV of many schemes in one query.
+        :param scheme_codes: Scheme codes to look up.
+        :return: A list of rows with scheme_code, nav and nav_date; unknown codes are absent.
+        """
+        if not scheme_codes:
+            return []
+        query = SQLQueries.fetch_navs_by_scheme_codes(scheme_codes=scheme_codes, dialect_name=self.sql_ops.dialect_name)
+        result = await self.sql_ops.execute_query(query=query)
+        return result
+
+    async def fetch_latest_navs(self):
+        """
+        Fetch the latest NAV of every scheme.
+        :return: A list of rows with scheme_id, scheme_code, nav, nav_date and updated_at.
+        """
+        query = SQLQueries.fetch_latest_navs()
+        result = await self.sql_ops.execute_query(query=query)
+        return result
+
+    async def fetch_latest_nav_updated_at(self):
+        """
+        Fetch the newest latest_nav.updated_at.
+        :return: The timestamp, or None if no NAV has been synced yet.
+        """
+        result = await self.sql_ops.execute(SQLQueries.fetch_latest_nav_updated_at())
+        return result.scalar()
+
+    async def fetch_scheme_fingerprints(self, scheme_codes: list[str]) -> dict:
+        """
+        Fetch the stored fingerprints of the given schemes.
+        :param scheme_codes: Scheme codes to look up.
+        :return: A dictionary mapping scheme codes to their fingerprints (None if never fingerprinted); unknown codes are absent.
+        """
+        if not scheme_codes:
+            return {}
+        query = SQLQueries.fetch_scheme_fingerprints(scheme_codes=scheme_codes)
+        result = await self.sql_ops.execute_query(query=query)
+        return {row.scheme_code: row.fingerprint for row in result}
+
+    async def fetch_scheme_latest_navs(self, scheme_codes: list[str]) -> dict:
+        """
+        Fetch the ID, stored master fields and current latest NAV of the given schemes.
+        :param scheme_codes: Scheme codes to look up.
+        :return: A dictionary mapping scheme codes to rows with id, scheme_name, fund_family, fund_type, nav and
+            nav_date; unknown codes are absent.
+        """
+        if not scheme_codes:
+            return {}
+        query = SQLQueries.fetch_scheme_latest_navs(scheme_codes=scheme_codes)
+        result = await self.sql_ops.execute_query(query=query)
+        return {row.scheme_code: row for row in result}
+
+    async def update_scheme_fingerprints(self, fingerprints: dict, commit: bool = True):
+        """
+        Store new fingerprints of schemes in one statement.
+        :param fingerprints: Scheme IDs mapped to their new fingerprint.
+        :param commit: If False, leave the transaction open for the caller to commit.
+        """
+        if not fingerprints:
+            return
+        await self.sql_ops.execute(SQLQueries.update_scheme_fingerprints(fingerprints))
+        if commit:
+            await self.sql_ops.commit()
+
     async def fetch_fund_scheme_by_id(self, fund_scheme_id: str):
         """
         Fetch a fund scheme by its ID.
@@ -100,7 +285,7 @@ class SQLHandler:
             "name": "Default Portfolio",
             "description": "This is the default portfolio.",
         }
-        portfolio = self.sql_ops.insert_one(data=new_portfolio, model=Portfolio)
+        portfolio = await self.sql_ops.insert_one(data=new_portfolio, model=Portfolio)
         return portfolio.id
 
     async def fetch_portfolio_by_user_id(self, user_id: str):
@@ -116,13 +301,52 @@ class SQLHandler:
 
     async def create_investment(self, data:CreateInvestmentDatabaseModel):
         """
-        Create a new investment record in the database.
+        Create a new investment record in the database, leaving the transaction open for the caller to commit
+        (together with the investments_version bump and the valuation refresh).
 
         :param data: The data for the new investment.
-        :return: The result of the executed insert query.
+        :return: The ID of the new investment.
+
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        investment = {**data.model_dump(), "id": uuid.uuid4(), "portfolio_id": uuid.UUID(data.portfolio_id),
+                      "scheme_id": uuid.UUID(data.scheme_id), "investment_date": now, "is_active": True,
+                      "updated_at": now}
+        await self.create_investments([investment])
+        return investment["id"]
+
+    async def create_investments(self, investments: list[dict]):
+        """
+        Insert many investment records with one statement, leaving the transaction open for the caller to commit
+        (together with the valuation refresh).
 
+        :param investments: Column values of every investment, including their ids.
         """
-        return self.sql_ops.insert_one(data=data.model_dump(), model=Investment)
+        if investments:
+            await self.sql_ops.execute(SQLQueries.insert_investments(investments))
+
+    async def fetch_scheme_navs_by_ids(self, scheme_ids: list) -> dict:
+        """
+        Validate many fund scheme IDs in one query and fetch their latest NAV.
+
+        :param scheme_ids: IDs of the fund schemes.
+        :return: A dictionary mapping scheme IDs (as strings) to their NAV (None without a NAV); unknown IDs are absent.
+        """
+        if not scheme_ids:
+            return {}
+        result = await self.sql_ops.execute_query(query=SQLQueries.fetch_scheme_navs_by_ids(scheme_ids))
+        return {str(row.id): float(row.nav) if row.nav is not None else None for row in result}
+
+    async def check_portfolio_owner(self, portfolio_id, user_id) -> bool:
+        """
+        Check that a portfolio belongs to a user.
+
+        :param portfolio_id: The ID of the portfolio.
+        :param user_id: The ID of the user.
+        :return: True if the user owns the portfolio.
+        """
+        result = await self.sql_ops.execute(SQLQueries.check_portfolio_owner(portfolio_id, user_id))
+        return result.scalar() is not None
 
     async def fetch_portfolios_by_id(self, portfolio_id: str):
         """
@@ -148,7 +372,7 @@ class SQLHandler:
             return False, "Portfolio with the same name already exists."
         portfolio_data = portfolio_data.model_dump()
         portfolio_data['user_id'] = str(user_id)
-        portfolio = self.sql_ops.insert_one(data=portfolio_data, model=Portfolio)
+        portfolio = await self.sql_ops.insert_one(data=portfolio_data, model=Portfolio)
         return True, portfolio.id
 
     async def fetch_investments_by_user_id(self, user_id: str):
@@ -183,36 +407,232 @@ class SQLHandler:
 
     async def upsert_nav_history(self, nav_histories: dict):
         """
-        Upsert multiple NAV history records in the database.
+        Upsert a single NAV point into the NAV time series.
 
-        :param nav_histories: A list of dictionaries containing NAV history data.
+        :param nav_histories: A dictionary containing scheme_id, nav_date and nav.
         :return: The result of the executed upsert query.
         """
-        return await self.sql_ops.upsert_query(data=nav_histories, model=NavHistory, conflict_columns=["scheme_id"])
+        return await self.sql_ops.upsert_query(data=nav_histories, model=NavHistory, conflict_columns=["scheme_id", "nav_date"])
+
+    async def fetch_investment_cash_flows(self, user_id: str):
+        """
+        Fetch the cash flows of a user's active investments with each scheme's latest NAV.
+        :param user_id: The ID of the user to fetch cash flows for.
+        :return: A list of rows with scheme_id, scheme_code, scheme_name, amount, units, investment_date, nav and nav_date.
+        """
+        query = SQLQueries.fetch_investment_cash_flows(user_id=user_id)
+        result = await self.sql_ops.execute_query(query=query)
+        return result
 
     async def get_portfolio_summary(self, user_id: str):
         """
         Fetch portfolio summary for a given user ID.
+        Served from portfolio_valuations; users without a stored valuation yet are valued on the fly.
         :param user_id: The ID of the user to fetch portfolio summary for.
         :return: A list of portfolio summaries associated with the user.
         """
+        query = SQLQueries.fetch_portfolio_valuation(user_id)
+        if result := await self.sql_ops.execute_query(query=query, json_result=True):
+            return result
         query = await SQLQueries.get_portfolio_summary_query(user_id)
         result = await self.sql_ops.execute_query(query=query, json_result=True)
         return result
 
-    async def bulk_upsert_fund_schemes(self, fund_schemes: list[dict]):
+    async def refresh_portfolio_valuations(self, user_ids: list | None = None, scheme_ids=None):
+        """
+        Recompute stored portfolio valuations in a single transaction: upsert the valuation of every user who holds
+        a valued investment and delete the rows of users who no longer do.
+
+        :param user_ids: Users to re-value.
+        :param scheme_ids: Re-value the users holding any of these schemes (e.g. the schemes a NAV sync changed).
+            Large change sets re-value everyone in one pass instead.
+        If neither is given, every user is re-valued.
+        """
+        if scheme_ids is not None:
+            if not scheme_ids:
+                return
+            if len(scheme_ids) <= self.MAX_INCREMENTAL_VALUATION_SCHEMES:
+                user_ids = SQLQueries.fetch_users_holding_schemes(list(scheme_ids))
+        await self.sql_ops.execute(SQLQueries.rebuild_portfolio_valuations(user_ids))
+        await self.sql_ops.execute(SQLQueries.clear_stale_portfolio_valuations(user_ids))
+        await self.sql_ops.commit()
+
+    async def snapshot_portfolio_valuations(self, run_id, valued_at, scheme_ids=None, retain_before=None):
+        """
+        Value every affected portfolio at the latest NAVs in one set-based INSERT ... SELECT and store the result
+        as the snapshot of a revaluation run, in a single transaction.
+
+        :param run_id: ID of the revaluation run.
+        :param valued_at: Valuation timestamp stored on the run's rows.
+        :param scheme_ids: Only value the portfolios holding any of these schemes (e.g. the schemes a NAV sync
+            changed). Large change sets value every portfolio instead; None values every portfolio.
+        :param retain_before: If given, snapshots valued before this time are deleted in the same transaction.
+        :return: A dictionary with the number of portfolios and investments valued.
+        """
+        portfolio_ids = None
+        if scheme_ids is not None:
+            if not scheme_ids:
+                return {"portfolios": 0, "investments": 0}
+            if len(scheme_ids) <= self.MAX_INCREMENTAL_VALUATION_SCHEMES:
+                portfolio_ids = SQLQueries.fetch_portfolios_holding_schemes(list(scheme_ids))
+        await self.sql_ops.execute(SQLQueries.snapshot_portfolio_valuations(run_id, valued_at, portfolio_ids))
+        totals = (await self.sql_ops.execute(SQLQueries.fetch_portfolio_snapshot_totals(run_id))).one()
+        if retain_before is not None:
+            await self.sql_ops.execute(SQLQueries.prune_portfolio_snapshots(retain_before))
+        await self.sql_ops.commit()
+        return {"portfolios": totals.portfolios, "investments": int(totals.investments)}
+
+    async def check_portfolio_daily_values_exist(self, value_date):
+        """
+        Check whether any user has a stored portfolio value for a day.
+
+        :param value_date: The day to check.
+        :return: True if the day has been valued.
+        """
+        result = await self.sql_ops.execute(SQLQueries.check_portfolio_daily_values_exist(value_date))
+        return bool(result.scalar())
+
+    async def refresh_portfolio_daily_values(self, value_date, user_ids: list | None = None, scheme_ids=None):
+        """
+        Recompute the stored portfolio values of a day in a single transaction.
+
+        :param value_date: The day to value.
+        :param user_ids: Users to re-value.
+        :param scheme_ids: Re-value the users holding any of these schemes (e.g. the schemes a NAV sync changed).
+            Large change sets re-value everyone in one pass instead.
+        If neither is given, every user is re-valued.
+        :return: The number of user rows written.
+        """
+        if scheme_ids is not None:
+            if not scheme_ids:
+                return 0
+            if len(scheme_ids) <= self.MAX_INCREMENTAL_VALUATION_SCHEMES:
+                user_ids = SQLQueries.fetch_users_holding_schemes(list(scheme_ids))
+        await self.sql_ops.execute(SQLQueries.clear_portfolio_daily_values(value_date, user_ids))
+        result = await self.sql_ops.execute(SQLQueries.rebuild_portfolio_daily_values(value_date, user_ids))
+        await self.sql_ops.commit()
+        return result.rowcount
+
+    async def fetch_portfolio_history(self, user_id: str, start, end, granularity: str = "daily"):
+        """
+        Fetch a user's portfolio value over a date range from portfolio_daily_value.
+
+        :param user_id: The ID of the user to fetch the history for.
+        :param start: First day of the range.
+        :param end: Last day of the range.
+        :param granularity: "daily", "weekly" or "monthly".
+        :return: A list of points with value_date, total_amount, total_value, gain_loss and returns_pct.
+        """
+        query = SQLQueries.fetch_portfolio_history(user_id=user_id, start=start, end=end, granularity=granularity,
+                                                   dialect_name=self.sql_ops.dialect_name)
+        result = await self.sql_ops.execute_query(query=query, json_result=True)
+        return result
+
+    async def bulk_upsert_fund_schemes(self, fund_schemes: list[dict], commit: bool = True):
         """
         Bulk upsert multiple fund scheme records in the database.
 
         :param fund_schemes: A list of dictionaries containing fund scheme data.
+        :param commit: If False, leave the transaction open for the caller to commit.
         :return: A dictionary mapping scheme codes to their corresponding IDs.
         """
-        return await self.sql_ops.bulk_upsert_fund_schemes(data_list=fund_schemes, model=FundScheme, conflict_columns=['scheme_code'])
+        return await self.sql_ops.bulk_upsert_fund_schemes(data_list=fund_schemes, model=FundScheme,
+                                                           conflict_columns=['scheme_code'], commit=commit)
+
+    async def bulk_upsert_nav_history(self, nav_histories: list[dict], commit: bool = True):
+        """
+        Append NAV points to the NAV time series and move latest_nav forward.
+        A NAV re-published for the same date overwrites that day's point; latest_nav never moves back in time.
+        Call ensure_nav_series_partitions first, otherwise rows land in the default partition.
+
+        :param nav_histories: A list of dictionaries with scheme_id, nav, nav_date and updated_at.
+        :param commit: If False, leave the transaction open for the caller to commit.
+        """
+        if not nav_histories:
+            return None
+        await self.sql_ops.bulk_upsert_nav_history(data_list=nav_histories, model=NavHistory,
+                                                   conflict_columns=["scheme_id", "nav_date"], commit=False)
+        await self.sql_ops.bulk_upsert_nav_history(data_list=nav_histories, model=LatestNav,
+                                                   conflict_columns=["scheme_id"], newer_column="nav_date", commit=False)
+        if commit:
+            await self.sql_ops.commit()
+        return None
+
+    async def record_scheduler_job_run(self, run: dict):
+        """
+        Store the outcome of a scheduler job run in scheduler_jobs.
+
+        :param run: job_id, instance_id, last_started_at, last_finished_at, last_duration_ms, last_status,
+            last_error and last_result.
+        """
+        await self.sql_ops.execute(SQLQueries.record_scheduler_job_run(run=run, failed=run["last_status"] != "success"))
+        await self.sql_ops.commit()
+
+    async def fetch_scheduler_jobs(self):
+        """
+        Fetch the last run of every scheduler job.
+        :return: A list of job rows.
+        """
+        query = SQLQueries.fetch_scheduler_jobs()
+        result = await self.sql_ops.execute_query(query=query, json_result=True)
+        return result
+
+    async def ensure_nav_series_partitions(self, years: set[int]):
+        """
+        Create the yearly nav_series partitions for the given years if they are missing (Postgres only).
+
+        :param years: Calendar years that incoming NAV dates fall in.
+        """
+        if self.sql_ops.dialect_name != "postgresql":
+            return
+        for year in sorted(years):
+            try:
+                await self.sql_ops.execute(SQLQueries.create_nav_series_partition(year))
+                await self.sql_ops.commit()
+            except SQLAlchemyError as e:
+                # Typically the default partition already holds rows for this year; they stay there.
+                await self.sql_ops.rollback()
+                logger.warning(f"Could not create nav_series partition for {year}: {e}")
+
+    async def prepare_scheme_staging(self):
+        """
+        Create the empty staging table used by the COPY loader: a temporary table of this transaction, dropped when
+        it commits or rolls back. Does not commit.
+        """
+        await self.sql_ops.execute(SQLQueries.create_scheme_staging_table())
 
-    async def bulk_upsert_nav_history(self, nav_histories: list[dict]):
+    async def copy_scheme_staging(self, rows: list[tuple]):
         """
-        Bulk upsert multiple NAV history records in the database.
+        COPY normalized feed rows into the staging table. Does not commit.
+
+        :param rows: Tuples of (seq, scheme_code, scheme_name, fund_family, fund_type, nav, nav_date, updated_at,
+            fingerprint).
         """
+        await self.sql_ops.copy_records(
+            table_name="fund_scheme_staging",
+            columns=["seq", "scheme_code", "scheme_name", "fund_family", "fund_type", "nav", "nav_date", "updated_at",
+                     "fingerprint"],
+            records=rows,
+        )
 
-        return await self.sql_ops.bulk_upsert_nav_history(data_list=nav_histories, model=NavHistory, conflict_columns=["scheme_id"])
+    async def discard_unchanged_staged_schemes(self):
+        """
+        Drop staged schemes whose fingerprint matches the stored one, so the merge only touches real changes.
+        Does not commit.
+        """
+        await self.sql_ops.execute(SQLQueries.discard_unchanged_staged_schemes())
 
+    async def merge_scheme_staging(self) -> tuple[dict, int, int]:
+        """
+        Merge the staging table into fund_schemes, nav_series and latest_nav with set-based upserts. Does not commit.
+
+        :return: A dictionary mapping scheme codes to their corresponding IDs, the number of those schemes that were
+            newly inserted, and the number of NAV points written.
+        """
+        result = await self.sql_ops.execute(SQLQueries.merge_staged_fund_schemes())
+        rows = result.fetchall()
+        scheme_mapping = {row.scheme_code: row.id for row in rows}
+        inserted = sum(1 for row in rows if row.inserted)
+        nav_result = await self.sql_ops.execute(SQLQueries.merge_staged_nav_series())
+        await self.sql_ops.execute(SQLQueries.merge_staged_latest_nav())
+        return scheme_mapping, inserted, nav_result.rowcount
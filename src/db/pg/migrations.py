@@ -0,0 +1,84 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from src.logging import logger
+
+
+class SchemaMigrations:
+    """
+    Idempotent upgrades of databases created by an older version of the schema (Postgres only).
+
+    ``create_all`` creates missing tables but never alters or fills existing ones, so every column added to an
+    existing table and every move of data between tables is listed here. The upgrades run after ``create_all``
+    whenever an engine is created, in one transaction serialized by an advisory lock, and are no-ops once applied.
+    """
+
+    LOCK_KEY = "mutual_fund_schema_migrations"
+
+    # (name, statement) in the order they are applied.
+    MIGRATIONS = [
+        (
+            # nav_history (one row per scheme, no NAV date) was replaced by the nav_series time series and the
+            # latest_nav table. Copy its rows into both, dated by their updated_at, creating the yearly partitions
+            # they fall in, then rename it so the copy runs once and the old rows are kept until dropped by hand.
+            "nav_history_to_nav_series",
+            """
+            DO $$
+            DECLARE
+                nav_year INTEGER;
+            BEGIN
+                IF to_regclass('nav_history') IS NULL THEN
+                    RETURN;
+                END IF;
+                FOR nav_year IN SELECT DISTINCT EXTRACT(YEAR FROM updated_at)::INTEGER FROM nav_history LOOP
+                    BEGIN
+                        EXECUTE format(
+                            'CREATE TABLE IF NOT EXISTS nav_series_y%s PARTITION OF nav_series '
+                            'FOR VALUES FROM (%L) TO (%L)',
+                            lpad(nav_year::TEXT, 4, '0'), make_date(nav_year, 1, 1), make_date(nav_year + 1, 1, 1)
+                        );
+                    EXCEPTION WHEN OTHERS THEN
+                        -- The default partition already holds rows of this year; the copied rows join them there.
+                        NULL;
+                    END;
+                END LOOP;
+                INSERT INTO nav_series (scheme_id, nav_date, nav, updated_at)
+                SELECT scheme_id, updated_at::DATE, nav, updated_at FROM nav_history
+                ON CONFLICT (scheme_id, nav_date) DO NOTHING;
+                INSERT INTO latest_nav (scheme_id, nav, nav_date, updated_at)
+                SELECT scheme_id, nav, updated_at::DATE, updated_at FROM nav_history
+                ON CONFLICT (scheme_id) DO NOTHING;
+                ALTER TABLE nav_history RENAME TO nav_history_migrated;
+            END $$
+            """,
+        ),
+        (
+            # Content fingerprint compared by the scheduler's change detection; NULL until the next full refresh.
+            "fund_schemes_fingerprint",
+            "ALTER TABLE fund_schemes ADD COLUMN IF NOT EXISTS fingerprint VARCHAR",
+        ),
+        (
+            # Per-user data version behind the portfolio ETags, bumped by every investment write.
+            "users_investments_version",
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS investments_version INTEGER NOT NULL DEFAULT 0",
+        ),
+        (
+            "latest_nav_updated_at_index",
+            "CREATE INDEX IF NOT EXISTS ix_latest_nav_updated_at ON latest_nav (updated_at)",
+        ),
+    ]
+
+    @classmethod
+    def upgrade(cls, engine: Engine):
+        """
+        Apply every migration to the database behind the engine.
+
+        :param engine: Sync engine of the database to upgrade.
+        """
+        if engine.dialect.name != "postgresql":
+            return
+        with engine.begin() as connection:
+            connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": cls.LOCK_KEY})
+            for _, statement in cls.MIGRATIONS:
+                connection.execute(text(statement))
+        logger.info(f"Schema migrations checked: {', '.join(name for name, _ in cls.MIGRATIONS)}")
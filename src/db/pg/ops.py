@@ -1,5 +1,5 @@
-from fastapi.encoders import jsonable_encoder
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class SQLOps:
@@ -15,24 +15,96 @@ class SQLOps:
         """
         self.session = session
 
+    @property
+    def is_async(self) -> bool:
+        """True when the underlying session is an AsyncSession (the API path); False for sync sessions (tests/scripts)."""
+        return isinstance(self.session, AsyncSession)
+
+    @property
+    def dialect_name(self) -> str:
+        """Name of the dialect the session is bound to, e.g. "postgresql" or "sqlite"."""
+        return self.session.bind.dialect.name
+
+    async def execute(self, query):
+        """
+        Execute a statement on the session, awaiting the driver when the session is async.
+
+        :param query: The SQLAlchemy statement to execute.
+        :return: The (buffered) result of the statement.
+        """
+        if self.is_async:
+            return await self.session.execute(query)
+        return self.session.execute(query)
+
+    async def commit(self):
+        """
+        Commit the current transaction on the session.
+        """
+        if self.is_async:
+            await self.session.commit()
+        else:
+            self.session.commit()
+
+    async def rollback(self):
+        """
+        Roll back the current transaction on the session.
+        """
+        if self.is_async:
+            await self.session.rollback()
+        else:
+            self.session.rollback()
+
     async def execute_query(self, query, first_result: bool = False, json_result: bool = False):
         """
         Execute a SQL query.
 
         :param query: The SQL query to execute.
         :param first_result: If True, return only the first result; otherwise, return all results.
-        :param json_result: If True, return the result as JSON; otherwise, return as a list of tuples.
+        :param json_result: If True, return rows as dictionaries; otherwise, return as a list of tuples.
+            Values keep their Python types (UUID, datetime, Decimal); they are serialized once, by the response.
         :return: The result of the executed query.
         """
+        result = await self.execute(query)
         if first_result:
             if json_result:
-                return jsonable_encoder(self.session.execute(query).mappings().first())
-            result = self.session.execute(query).first()
+                row = result.mappings().first()
+                return dict(row) if row is not None else None
+            result = result.first()
             return result[0] if result else []
         else:
             if json_result:
-                return jsonable_encoder(self.session.execute(query).mappings().all())
-            return self.session.execute(query).all()
+                return [dict(row) for row in result.mappings()]
+            return result.all()
+
+    async def stream_query(self, query, batch_size: int = 1000):
+        """
+        Execute a SQL query and yield row mappings without buffering the whole result.
+
+        :param query: The SQL query to execute.
+        :param batch_size: Number of rows fetched from the server-side cursor at a time.
+        :return: Async iterator of row mappings.
+        """
+        if self.is_async:
+            result = await self.session.stream(query.execution_options(yield_per=batch_size))
+            async for partition in result.mappings().partitions():
+                for row in partition:
+                    yield row
+        else:
+            for row in self.session.execute(query.execution_options(yield_per=batch_size)).mappings():
+                yield row
+
+    async def copy_records(self, table_name: str, columns: list[str], records: list[tuple]):
+        """
+        Load records into a table with the Postgres COPY protocol (asyncpg sessions only).
+        Runs on the session's current connection, so it is part of the open transaction.
+
+        :param table_name: Name of the target table.
+        :param columns: Column names, in the order of the values in each record.
+        :param records: Rows to copy.
+        """
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(table_name, records=records, columns=columns)
 
     async def insert_many(self, data: list, model):
         """
@@ -47,10 +119,10 @@ class SQLOps:
             each = model(**each)
             final_result.append(each)
             self.session.add(each)
-        self.session.commit()
+        await self.commit()
         return final_result
 
-    def insert_one(self, data: dict, model):
+    async def insert_one(self, data: dict, model):
         """
         Execute an insert SQL query for a single record.
 
@@ -60,10 +132,10 @@ class SQLOps:
         """
         each = model(**data)
         self.session.add(each)
-        self.session.commit()
+        await self.commit()
         return each
 
-    def update_query(self, data: dict, model, filter_condition):
+    async def update_query(self, data: dict, model, filter_condition):
         """
         Execute an update SQL query.
 
@@ -73,11 +145,11 @@ class SQLOps:
         :return: The result of the executed update query.
         """
         query = model.__table__.update().where(filter_condition).values(data)
-        result = self.session.execute(query)
-        self.session.commit()
+        result = await self.execute(query)
+        await self.commit()
         return result
 
-    def delete_query(self, model, filter_condition):
+    async def delete_query(self, model, filter_condition):
         """
         Execute a delete SQL query.
 
@@ -86,8 +158,8 @@ class SQLOps:
         :return: The result of the executed delete query.
         """
         query = model.__table__.delete().where(filter_condition)
-        result = self.session.execute(query)
-        self.session.commit()
+        result = await self.execute(query)
+        await self.commit()
         return result
 
     async def upsert_query(self, data: dict, model, conflict_columns: list):
@@ -106,11 +178,20 @@ class SQLOps:
             index_elements=conflict_columns,
             set_=data
         ).returning(model.id)
-        result = self.session.execute(upsert_stmt)
-        self.session.commit()
+        result = await self.execute(upsert_stmt)
+        await self.commit()
         return str(result.scalar()) if result else None
 
-    async def bulk_upsert_fund_schemes(self, data_list: list[dict], model, conflict_columns: list):
+    async def bulk_upsert_fund_schemes(self, data_list: list[dict], model, conflict_columns: list, commit: bool = True):
+        """
+        Bulk upsert fund schemes and return their IDs.
+
+        :param data_list: Rows to upsert.
+        :param model: The model class to which the query belongs.
+        :param conflict_columns: The columns to check for conflicts during the upsert operation.
+        :param commit: If False, leave the transaction open so the caller can commit several statements together.
+        :return: A dictionary mapping scheme codes to their IDs.
+        """
         if not data_list:
             return {}
 
@@ -127,13 +208,24 @@ class SQLOps:
             set_=update_dict
         ).returning(model.scheme_code, model.id)
 
-        result = await self.session.execute(upsert_stmt)
-        await self.session.commit()
-
+        result = await self.execute(upsert_stmt)
         # Build mapping {scheme_code: scheme_id}
-        return {row[0]: row[1] for row in result.fetchall()}
+        mapping = {row[0]: row[1] for row in result.fetchall()}
+        if commit:
+            await self.commit()
+        return mapping
+
+    async def bulk_upsert_nav_history(self, data_list: list[dict], model, conflict_columns: list,
+                                      newer_column: str | None = None, commit: bool = True):
+        """
+        Bulk upsert NAV rows.
 
-    async def bulk_upsert_nav_history(self, data_list: list[dict], model, conflict_columns: list):
+        :param data_list: Rows to upsert.
+        :param model: The model class to which the query belongs.
+        :param conflict_columns: The columns to check for conflicts during the upsert operation.
+        :param newer_column: If set, only overwrite an existing row when the incoming value of this column is not older.
+        :param commit: If False, leave the transaction open so the caller can commit several statements together.
+        """
         if not data_list:
             return {}
 
@@ -147,10 +239,12 @@ class SQLOps:
 
         upsert_stmt = stmt.on_conflict_do_update(
             index_elements=conflict_columns,
-            set_=update_dict
+            set_=update_dict,
+            where=(model.__table__.c[newer_column] <= stmt.excluded[newer_column]) if newer_column else None
         )
 
-        await self.session.execute(upsert_stmt)
-        await self.session.commit()
+        await self.execute(upsert_stmt)
+        if commit:
+            await self.commit()
 
         return None
@@ -0,0 +1,114 @@
+import bisect
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Collects connection pool statistics for every engine created by SessionUtil.
+    Wait times are recorded by the instrumented pool classes below; the live
+    checked-out/idle/overflow numbers are read from the pools when a snapshot is taken.
+    """
+
+    WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.pools = {}
+        self.waits = {}
+
+    def register(self, name: str, pool):
+        """
+        Register a pool under the given name so it shows up in snapshots.
+
+        :param name: Name of the pool, e.g. "mutual_funds.async".
+        :param pool: The SQLAlchemy pool instance.
+        """
+        pool.metrics_name = name
+        self.pools[name] = pool
+        self.waits.setdefault(name, self._empty_wait_stats())
+
+    def observe_wait(self, name: str, seconds: float, timed_out: bool = False):
+        """
+        Record the time spent waiting for a connection from the pool.
+
+        :param name: Name of the pool the connection was requested from.
+        :param seconds: Time spent waiting.
+        :param timed_out: True if the checkout failed with a pool timeout.
+        """
+        stats = self.waits.setdefault(name, self._empty_wait_stats())
+        elapsed_ms = seconds * 1000
+        stats["count"] += 1
+        stats["sum_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["buckets"][bisect.bisect_left(self.WAIT_BUCKETS_MS, elapsed_ms)] += 1
+        if timed_out:
+            stats["timeouts"] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Build a JSON-serializable view of every registered pool.
+
+        :return: Dictionary keyed by pool name.
+        """
+        result = {}
+        for name, pool in self.pools.items():
+            wait = self.waits.get(name, self._empty_wait_stats())
+            labels = [f"le_{bucket}ms" for bucket in self.WAIT_BUCKETS_MS] + ["le_inf"]
+            result[name] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": wait["count"],
+                "timeouts": wait["timeouts"],
+                "wait_ms": {
+                    "avg": round(wait["sum_ms"] / wait["count"], 3) if wait["count"] else 0.0,
+                    "max": round(wait["max_ms"], 3),
+                    "histogram": dict(zip(labels, wait["buckets"], strict=True)),
+                },
+            }
+        return result
+
+    def _empty_wait_stats(self) -> dict:
+        return {
+            "count": 0,
+            "timeouts": 0,
+            "sum_ms": 0.0,
+            "max_ms": 0.0,
+            "buckets": [0] * (len(self.WAIT_BUCKETS_MS) + 1),
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _WaitTimingMixin:
+    """Times every checkout from the pool and reports it to pool_metrics."""
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.observe_wait(self.metrics_name, time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.observe_wait(self.metrics_name, time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps the pool for a fresh one; keep it registered under the same name
+        pool = super().recreate()
+        pool_metrics.register(self.metrics_name, pool)
+        return pool
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
@@ -1,7 +1,12 @@
-from sqlalchemy import select, func, case, text
-from sqlalchemy.orm import joinedload
+import datetime
 
-from src.db.pg.sql_schemas import Users, FundScheme, Portfolio, Investment, NavHistory
+from sqlalchemy import select, func, case, text, tuple_, insert, delete, exists, literal, update, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as upsert
+from sqlalchemy.orm import joinedload, selectinload
+
+from src.db.pg.sql_schemas import (Users, FundScheme, Portfolio, Investment, NavHistory, LatestNav, FundFamily,
+                                   PortfolioValuation, PortfolioSnapshot, PortfolioDailyValue, SchedulerJob)
 
 
 class SQLQueries:
@@ -11,16 +16,59 @@ class SQLQueries:
     """
 
     @staticmethod
-    def check_user_with_email(email: str) -> select:
+    def fetch_user_credentials_by_email(email: str) -> select:
+        """
+        SQL query to fetch the columns login needs for an active user with the given email.
+
+        :arg.
+            email (str): The email of the user.
+        :return:
+            select: SQLAlchemy select query returning id, email and password.
+        """
+        return select(Users.id, Users.email, Users.password).where(Users.email == email, Users.is_active.is_(True))
+
+    @staticmethod
+    def insert_user_if_new(user: dict):
+        """
+        SQL statement to insert a user unless the email is already registered (relies on the unique email index).
+
+        :arg.
+            user (dict): Column values of the new user, including its id.
+        :return:
+            insert: SQLAlchemy INSERT ... ON CONFLICT DO NOTHING RETURNING id statement; no row when the email is taken.
+        """
+        return upsert(Users).values(**user).on_conflict_do_nothing(index_elements=[Users.email]).returning(Users.id)
+
+    @staticmethod
+    def insert_portfolio(portfolio: dict):
+        """
+        SQL statement to insert a portfolio.
+
+        :arg.
+            portfolio (dict): Column values of the portfolio, including its id.
+        :return:
+            insert: SQLAlchemy insert statement.
+        """
+        return insert(Portfolio).values(**portfolio)
+
+    @staticmethod
+    def register_user_with_portfolio(user: dict, portfolio: dict):
         """
-        SQL query to check if a user exists with the given email.
+        SQL statement to insert a user and their default portfolio in one round trip (Postgres data-modifying CTE).
+        Nothing is inserted when the email is already registered.
 
         :arg.
-            email (str): The email of the user to check.
+            user (dict): Column values of the new user, including its id.
+            portfolio (dict): Column values of the portfolio, without user_id.
         :return:
-            select: SQLAlchemy select query to check user existence.
+            insert: SQLAlchemy INSERT ... SELECT statement returning the new user's id; no row when the email is taken.
         """
-        return select(Users).where(Users.email == email)
+        new_user = SQLQueries.insert_user_if_new(user).cte("new_user")
+        columns = list(portfolio)
+        return insert(Portfolio).from_select(
+            [*columns, "user_id"],
+            select(*(literal(portfolio[column], Portfolio.__table__.c[column].type) for column in columns), new_user.c.id)
+        ).returning(Portfolio.user_id)
 
     @staticmethod
     def fetch_user_by_id(user_id: str) -> select:
@@ -35,22 +83,151 @@ class SQLQueries:
         return select(*Users.__table__.columns).select_from(Users).where(Users.id == user_id)
 
     @staticmethod
-    def fetch_fund_families():
+    def fetch_user_principal_by_id(user_id) -> select:
         """
-        SQL query to fetch all fund families.
+        SQL query to fetch the columns of a user that authentication needs (primary-key lookup).
 
+        :arg.
+            user_id: The ID of the user to fetch.
         :return:
-            select: SQLAlchemy select query to fetch all fund families.
+            select: SQLAlchemy select query returning id, email, first_name, last_name and is_active.
+        """
+        return select(Users.id, Users.email, Users.first_name, Users.last_name, Users.is_active).where(
+            Users.id == user_id
+        )
+
+    @staticmethod
+    def fetch_summary_versions(user_id) -> select:
+        """
+        SQL query to fetch the versions a user's NAV-derived responses depend on, in one primary-key lookup.
+
+        :arg.
+            user_id: The ID of the user.
+        :return:
+            select: SQLAlchemy select query returning investments_version and nav_updated_at (the newest
+            latest_nav.updated_at, None when latest_nav is empty).
         """
         return select(
+            Users.investments_version,
+            select(func.max(LatestNav.updated_at)).scalar_subquery().label("nav_updated_at"),
+        ).where(Users.id == user_id)
+
+    @staticmethod
+    def bump_investments_version(user_id):
+        """
+        SQL statement to increment a user's investments_version after an investment write.
+
+        :arg.
+            user_id: The ID of the user.
+        :return:
+            update: SQLAlchemy update statement.
+        """
+        return update(Users).where(Users.id == user_id).values(investments_version=Users.investments_version + 1)
+
+    @staticmethod
+    def update_user(user_id, data: dict):
+        """
+        SQL statement to update a user's details.
+
+        :arg.
+            user_id: The ID of the user to update.
+            data (dict): Columns to set.
+        :return:
+            update: SQLAlchemy update statement.
+        """
+        return update(Users).where(Users.id == user_id).values(**data)
+
+    @staticmethod
+    def fetch_fund_families(family: str | None = None, fund_type: str | None = None, name_prefix: str | None = None,
+                            after: list | None = None, limit: int | None = None):
+        """
+        SQL query to fetch fund schemes with their latest NAV, keyset-paginated on (fund_family, scheme_code).
+
+        :arg.
+            family (str): Only schemes of this fund family.
+            fund_type (str): Only schemes of this fund type.
+            name_prefix (str): Only schemes whose name starts with this prefix (case-insensitive).
+            after (list): (fund_family, scheme_code) of the last row of the previous page.
+            limit (int): Maximum number of rows to return.
+        :return:
+            select: SQLAlchemy select query to fetch fund schemes.
+        """
+        query = select(
             FundScheme.id,
             FundScheme.fund_family,
             FundScheme.scheme_code,
             FundScheme.scheme_name,
             FundScheme.fund_type,
-            NavHistory.nav,
-            NavHistory.updated_at,
-        ).join(NavHistory, FundScheme.id == NavHistory.scheme_id).order_by(FundScheme.fund_family)
+            LatestNav.nav,
+            LatestNav.nav_date,
+            LatestNav.updated_at,
+        ).join(LatestNav, FundScheme.id == LatestNav.scheme_id)
+        if family:
+            query = query.where(FundScheme.fund_family == family)
+        if fund_type:
+            query = query.where(FundScheme.fund_type == fund_type)
+        if name_prefix:
+            query = query.where(FundScheme.scheme_name.istartswith(name_prefix, autoescape=True))
+        if after:
+            query = query.where(tuple_(FundScheme.fund_family, FundScheme.scheme_code) > tuple_(*after))
+        query = query.order_by(FundScheme.fund_family, FundScheme.scheme_code)
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    @staticmethod
+    def fetch_fund_family_index():
+        """
+        SQL query to fetch the fund family summary (name, scheme count, latest NAV date).
+
+        :return:
+            select: SQLAlchemy select query to fetch all fund families.
+        """
+        return select(
+            FundFamily.fund_family,
+            FundFamily.scheme_count,
+            FundFamily.latest_nav_date,
+        ).order_by(FundFamily.fund_family)
+
+    @staticmethod
+    def check_fund_family_exists(fund_family: str):
+        """
+        SQL query to check whether a fund family is present in the summary table.
+
+        :arg.
+            fund_family (str): The fund family to check.
+        :return:
+            select: SQLAlchemy select query returning a single boolean.
+        """
+        return select(exists().where(FundFamily.fund_family == fund_family))
+
+    @staticmethod
+    def clear_fund_family_summary():
+        """
+        SQL statement to empty the fund family summary before it is rebuilt.
+
+        :return:
+            delete: SQLAlchemy delete statement.
+        """
+        return delete(FundFamily)
+
+    @staticmethod
+    def rebuild_fund_family_summary():
+        """
+        SQL statement to rebuild the fund family summary from fund_schemes and latest_nav in one set-based pass.
+
+        :return:
+            insert: SQLAlchemy INSERT ... SELECT statement.
+        """
+        return insert(FundFamily).from_select(
+            ["fund_family", "scheme_count", "latest_nav_date", "updated_at"],
+            select(
+                FundScheme.fund_family,
+                func.count(FundScheme.id),
+                func.max(LatestNav.nav_date),
+                func.now(),
+            ).outerjoin(LatestNav, FundScheme.id == LatestNav.scheme_id).group_by(FundScheme.fund_family)
+        )
 
     @staticmethod
     def fetch_schemes_by_family(fund_family: str):
@@ -62,7 +239,15 @@ class SQLQueries:
         :return:
             select: SQLAlchemy select query to fetch schemes by fund family.
         """
-        return select(FundScheme).where(FundScheme.fund_family == fund_family).order_by(FundScheme.scheme_name)
+        return select(
+            FundScheme.scheme_code,
+            FundScheme.scheme_name,
+            FundScheme.fund_family,
+            FundScheme.fund_type,
+            LatestNav.nav,
+            LatestNav.nav_date.label("date"),
+        ).outerjoin(LatestNav, FundScheme.id == LatestNav.scheme_id).where(
+            FundScheme.fund_family == fund_family).order_by(FundScheme.scheme_name)
 
     @staticmethod
     def fetch_nav_by_scheme_code(scheme_code: str):
@@ -74,8 +259,94 @@ class SQLQueries:
         :return:
             select: SQLAlchemy select query to fetch NAV by scheme code.
         """
-        return select(*NavHistory.__table__.columns).join(FundScheme, FundScheme.id == NavHistory.scheme_id).where(
-            FundScheme.scheme_code == scheme_code).order_by(NavHistory.updated_at.desc())
+        return select(*LatestNav.__table__.columns, FundScheme.scheme_code).join(
+            FundScheme, FundScheme.id == LatestNav.scheme_id).where(FundScheme.scheme_code == scheme_code)
+
+    @staticmethod
+    def fetch_navs_by_scheme_codes(scheme_codes: list[str], dialect_name: str = "postgresql"):
+        """
+        SQL query to fetch the latest NAV of many schemes at once.
+        On Postgres the codes are bound as one array (``scheme_code = ANY(:scheme_codes)``), so the statement is the
+        same for any number of codes; other dialects get an expanding IN list.
+
+        :arg.
+            scheme_codes (list[str]): Scheme codes to look up.
+            dialect_name (str): Dialect of the session the query runs on.
+        :return:
+            select: SQLAlchemy select query returning scheme_code, nav and nav_date of the known schemes.
+        """
+        if dialect_name == "postgresql":
+            condition = FundScheme.scheme_code == any_(bindparam("scheme_codes", scheme_codes, type_=ARRAY(String)))
+        else:
+            condition = FundScheme.scheme_code.in_(scheme_codes)
+        return select(FundScheme.scheme_code, LatestNav.nav, LatestNav.nav_date).join(
+            LatestNav, LatestNav.scheme_id == FundScheme.id).where(condition)
+
+    @staticmethod
+    def fetch_latest_navs():
+        """
+        SQL query to fetch the latest NAV of every scheme (used to fill the in-process NAV cache).
+
+        :return:
+            select: SQLAlchemy select query returning scheme_id, scheme_code, nav, nav_date and updated_at.
+        """
+        return select(
+            LatestNav.scheme_id,
+            FundScheme.scheme_code,
+            LatestNav.nav,
+            LatestNav.nav_date,
+            LatestNav.updated_at,
+        ).join(FundScheme, FundScheme.id == LatestNav.scheme_id)
+
+    @staticmethod
+    def fetch_scheme_fingerprints(scheme_codes: list[str]):
+        """
+        Generates a SQL query to fetch the stored fingerprints of the given schemes.
+
+        :arg.
+            scheme_codes (list[str]): Scheme codes to look up.
+
+        :return:
+            select: SQLAlchemy select query returning (scheme_code, fingerprint).
+        """
+        return select(FundScheme.scheme_code, FundScheme.fingerprint).where(FundScheme.scheme_code.in_(scheme_codes))
+
+    @staticmethod
+    def fetch_scheme_latest_navs(scheme_codes: list[str]):
+        """
+        Generates a SQL query to fetch the ID, stored master fields and current latest NAV of the given schemes.
+
+        :arg.
+            scheme_codes (list[str]): Scheme codes to look up.
+
+        :return:
+            select: SQLAlchemy select query returning (scheme_code, id, scheme_name, fund_family, fund_type, nav,
+            nav_date); nav/nav_date are NULL for schemes without a NAV yet.
+        """
+        return select(
+            FundScheme.scheme_code,
+            FundScheme.id,
+            FundScheme.scheme_name,
+            FundScheme.fund_family,
+            FundScheme.fund_type,
+            LatestNav.nav,
+            LatestNav.nav_date,
+        ).outerjoin(LatestNav, LatestNav.scheme_id == FundScheme.id).where(FundScheme.scheme_code.in_(scheme_codes))
+
+    @staticmethod
+    def update_scheme_fingerprints(fingerprints: dict):
+        """
+        Generates a single UPDATE setting the stored fingerprint of each given scheme.
+
+        :arg.
+            fingerprints (dict): Scheme IDs mapped to their new fingerprint.
+
+        :return:
+            update: SQLAlchemy update statement.
+        """
+        return update(FundScheme).where(FundScheme.id.in_(list(fingerprints))).values(
+            fingerprint=case(fingerprints, value=FundScheme.id)
+        )
 
     @staticmethod
     def fetch_fund_scheme_by_id(fund_scheme_id: str):
@@ -87,7 +358,45 @@ class SQLQueries:
         :return:
             select: SQLAlchemy select query to fetch the fund scheme.
         """
-        return select(FundScheme).options(joinedload(FundScheme.nav_history)).where(FundScheme.id == fund_scheme_id)
+        return select(FundScheme).options(selectinload(FundScheme.latest_nav)).where(FundScheme.id == fund_scheme_id)
+
+    @staticmethod
+    def fetch_scheme_navs_by_ids(scheme_ids: list):
+        """
+        SQL query to validate many fund scheme IDs at once and fetch their latest NAV.
+
+        :arg.
+            scheme_ids (list): IDs of the fund schemes.
+        :return:
+            select: SQLAlchemy select query returning (id, nav); nav is NULL for schemes without a NAV yet.
+        """
+        return select(FundScheme.id, LatestNav.nav).outerjoin(LatestNav, LatestNav.scheme_id == FundScheme.id).where(
+            FundScheme.id.in_(scheme_ids))
+
+    @staticmethod
+    def check_portfolio_owner(portfolio_id, user_id):
+        """
+        SQL query to check that a portfolio belongs to a user.
+
+        :arg.
+            portfolio_id: The ID of the portfolio.
+            user_id: The ID of the user.
+        :return:
+            select: SQLAlchemy select query returning the portfolio ID if the user owns it.
+        """
+        return select(Portfolio.id).where(Portfolio.id == portfolio_id, Portfolio.user_id == user_id)
+
+    @staticmethod
+    def insert_investments(investments: list[dict]):
+        """
+        SQL statement to insert many investments with a single multi-row INSERT.
+
+        :arg.
+            investments (list[dict]): Column values of every investment, including their ids.
+        :return:
+            insert: SQLAlchemy insert statement.
+        """
+        return insert(Investment).values(investments)
 
     @staticmethod
     def fetch_portfolio_by_user_id(user_id: str):
@@ -148,20 +457,48 @@ class SQLQueries:
                       FundScheme.scheme_code,
                       FundScheme.fund_family,
                       FundScheme.fund_type,
-                      (Investment.units * NavHistory.nav).label('current_value'),
-                      (Investment.units * NavHistory.nav - Investment.amount).label('gain_loss'),
+                      (Investment.units * LatestNav.nav).label('current_value'),
+                      (Investment.units * LatestNav.nav - Investment.amount).label('gain_loss'),
                       case(
                             (Investment.amount > 0,
-                             (Investment.units * NavHistory.nav - Investment.amount) / Investment.amount * 100),
+                             (Investment.units * LatestNav.nav - Investment.amount) / Investment.amount * 100),
                           else_=0
                       ).label('returns_pct')
                     ).join(Portfolio, Investment.portfolio_id == Portfolio.id
                     ).join(FundScheme, Investment.scheme_id == FundScheme.id
-                    ).join(NavHistory, FundScheme.id == NavHistory.scheme_id
+                    ).join(LatestNav, FundScheme.id == LatestNav.scheme_id
                     ).where(
             Portfolio.user_id == user_id,
             Investment.is_active == True).order_by( Investment.updated_at.desc())
 
+    @staticmethod
+    def fetch_investment_cash_flows(user_id: str):
+        """
+        SQL query to fetch the cash flows of a user's active investments together with each scheme's latest NAV.
+
+        :arg.
+            user_id (str): The ID of the user to fetch cash flows for.
+        :return:
+            select: SQLAlchemy select query returning scheme_id, scheme_code, scheme_name, amount, units,
+            investment_date, nav and nav_date.
+        """
+        return select(
+            Investment.scheme_id,
+            FundScheme.scheme_code,
+            FundScheme.scheme_name,
+            Investment.amount,
+            Investment.units,
+            Investment.investment_date,
+            LatestNav.nav,
+            LatestNav.nav_date,
+        ).join(Portfolio, Investment.portfolio_id == Portfolio.id
+        ).join(FundScheme, Investment.scheme_id == FundScheme.id
+        ).join(LatestNav, Investment.scheme_id == LatestNav.scheme_id
+        ).where(
+            Portfolio.user_id == user_id,
+            Investment.is_active.is_(True)
+        )
+
     @staticmethod
     def fetch_investments_by_portfolio_id(portfolio_id: str):
         """
@@ -185,11 +522,11 @@ class SQLQueries:
         """
         query = (select(
             func.coalesce(func.sum(Investment.amount), 0).label('total_amount'),
-            func.coalesce(func.sum(Investment.units * NavHistory.nav), 0).label('total_value'),
-            func.coalesce(func.sum((Investment.units * NavHistory.nav) - Investment.amount), 0).label('gain_loss'),
+            func.coalesce(func.sum(Investment.units * LatestNav.nav), 0).label('total_value'),
+            func.coalesce(func.sum((Investment.units * LatestNav.nav) - Investment.amount), 0).label('gain_loss'),
             case(
                 (func.sum(Investment.amount) > 0,
-                 (func.sum((Investment.units * NavHistory.nav) - Investment.amount) / func.sum(Investment.amount) * 100)
+                 (func.sum((Investment.units * LatestNav.nav) - Investment.amount) / func.sum(Investment.amount) * 100)
                  ),
                 else_=0
             ).label('returns_pct'),
@@ -197,10 +534,489 @@ class SQLQueries:
         ).select_from(Investment)
         .join(Portfolio, Investment.portfolio_id == Portfolio.id)
         .join(FundScheme, Investment.scheme_id == FundScheme.id)
-        .join(NavHistory, FundScheme.id == NavHistory.scheme_id)
+        .join(LatestNav, FundScheme.id == LatestNav.scheme_id)
         .where(
             Portfolio.user_id == user_id,
             Investment.is_active == True
         ))
 
         return query
+
+    @staticmethod
+    def fetch_portfolio_valuation(user_id: str):
+        """
+        SQL query to fetch the stored portfolio valuation of a user (primary-key lookup).
+
+        :arg.
+            user_id (str): The ID of the user.
+        :return:
+            select: SQLAlchemy select query returning total_amount, total_value, gain_loss, returns_pct
+            and total_investments.
+        """
+        return select(
+            PortfolioValuation.total_amount,
+            PortfolioValuation.total_value,
+            PortfolioValuation.gain_loss,
+            PortfolioValuation.returns_pct,
+            PortfolioValuation.total_investments,
+        ).where(PortfolioValuation.user_id == user_id)
+
+    @staticmethod
+    def fetch_users_holding_schemes(scheme_ids):
+        """
+        SQL query to fetch the users with an active investment in any of the given schemes.
+
+        :arg.
+            scheme_ids: IDs of the schemes.
+        :return:
+            select: SQLAlchemy select query returning distinct user IDs (usable as an IN subquery).
+        """
+        return select(Portfolio.user_id).join(Investment, Investment.portfolio_id == Portfolio.id).where(
+            Investment.scheme_id.in_(scheme_ids),
+            Investment.is_active.is_(True)
+        ).distinct()
+
+    @staticmethod
+    def clear_stale_portfolio_valuations(user_ids=None):
+        """
+        SQL statement to delete the stored valuations of users who no longer hold any valued investment.
+
+        :arg.
+            user_ids: IDs (or a subquery of IDs) of the users to check; all users when None.
+        :return:
+            delete: SQLAlchemy delete statement.
+        """
+        holders = select(Portfolio.user_id).join(Investment, Investment.portfolio_id == Portfolio.id
+        ).join(LatestNav, Investment.scheme_id == LatestNav.scheme_id
+        ).where(Investment.is_active.is_(True))
+        query = delete(PortfolioValuation).where(PortfolioValuation.user_id.not_in(holders))
+        if user_ids is not None:
+            query = query.where(PortfolioValuation.user_id.in_(user_ids))
+        return query
+
+    @staticmethod
+    def rebuild_portfolio_valuations(user_ids=None):
+        """
+        SQL statement to value the active investments of users at their latest NAVs in one set-based pass and
+        upsert the result, so concurrent rebuilds for the same user overwrite each other instead of colliding.
+
+        :arg.
+            user_ids: IDs (or a subquery of IDs) of the users to rebuild; all users when None.
+        :return:
+            insert: SQLAlchemy INSERT ... SELECT ... ON CONFLICT (user_id) DO UPDATE statement.
+        """
+        current_value = Investment.units * LatestNav.nav
+        query = select(
+            Portfolio.user_id,
+            func.coalesce(func.sum(Investment.amount), 0),
+            func.coalesce(func.sum(current_value), 0),
+            func.coalesce(func.sum(current_value - Investment.amount), 0),
+            case(
+                (func.sum(Investment.amount) > 0,
+                 func.sum(current_value - Investment.amount) / func.sum(Investment.amount) * 100),
+                else_=0
+            ),
+            func.count(Investment.id),
+            func.now(),
+        ).select_from(Investment
+        ).join(Portfolio, Investment.portfolio_id == Portfolio.id
+        ).join(LatestNav, Investment.scheme_id == LatestNav.scheme_id
+        ).where(Investment.is_active.is_(True)
+        ).group_by(Portfolio.user_id)
+        if user_ids is not None:
+            query = query.where(Portfolio.user_id.in_(user_ids))
+        columns = ["user_id", "total_amount", "total_value", "gain_loss", "returns_pct", "total_investments",
+                   "updated_at"]
+        stmt = upsert(PortfolioValuation).from_select(columns, query)
+        return stmt.on_conflict_do_update(
+            index_elements=[PortfolioValuation.user_id],
+            set_={column: stmt.excluded[column] for column in columns[1:]},
+        )
+
+    @staticmethod
+    def fetch_portfolios_holding_schemes(scheme_ids):
+        """
+        SQL query to fetch the portfolios with an active investment in any of the given schemes.
+
+        :arg.
+            scheme_ids: IDs of the schemes.
+        :return:
+            select: SQLAlchemy select query returning distinct portfolio IDs (usable as an IN subquery).
+        """
+        return select(Investment.portfolio_id).where(
+            Investment.scheme_id.in_(scheme_ids),
+            Investment.is_active.is_(True)
+        ).distinct()
+
+    @staticmethod
+    def snapshot_portfolio_valuations(run_id, valued_at, portfolio_ids=None):
+        """
+        SQL statement to value the active investments of every portfolio at the latest NAVs in one set-based
+        pass and store the result as the snapshot of a revaluation run.
+
+        :arg.
+            run_id (UUID): ID of the revaluation run the snapshot rows belong to.
+            valued_at (datetime): Valuation timestamp stored on every row of the run.
+            portfolio_ids: IDs (or a subquery of IDs) of the portfolios to value; all portfolios when None.
+        :return:
+            insert: SQLAlchemy INSERT ... SELECT statement.
+        """
+        current_value = Investment.units * LatestNav.nav
+        query = select(
+            literal(run_id, PortfolioSnapshot.run_id.type),
+            Investment.portfolio_id,
+            Portfolio.user_id,
+            func.sum(Investment.amount),
+            func.sum(current_value),
+            func.sum(current_value - Investment.amount),
+            case(
+                (func.sum(Investment.amount) > 0,
+                 func.sum(current_value - Investment.amount) / func.sum(Investment.amount) * 100),
+                else_=0
+            ),
+            func.count(Investment.id),
+            literal(valued_at, PortfolioSnapshot.valued_at.type),
+        ).select_from(Investment
+        ).join(Portfolio, Investment.portfolio_id == Portfolio.id
+        ).join(LatestNav, Investment.scheme_id == LatestNav.scheme_id
+        ).where(Investment.is_active.is_(True)
+        ).group_by(Investment.portfolio_id, Portfolio.user_id)
+        if portfolio_ids is not None:
+            query = query.where(Investment.portfolio_id.in_(portfolio_ids))
+        return insert(PortfolioSnapshot).from_select(
+            ["run_id", "portfolio_id", "user_id", "total_amount", "total_value", "gain_loss", "returns_pct",
+             "total_investments", "valued_at"],
+            query
+        )
+
+    @staticmethod
+    def fetch_portfolio_snapshot_totals(run_id):
+        """
+        SQL query to count the portfolios and investments valued by a revaluation run.
+
+        :arg.
+            run_id (UUID): ID of the revaluation run.
+        :return:
+            select: SQLAlchemy select query returning portfolios and investments.
+        """
+        return select(
+            func.count().label("portfolios"),
+            func.coalesce(func.sum(PortfolioSnapshot.total_investments), 0).label("investments"),
+        ).where(PortfolioSnapshot.run_id == run_id)
+
+    @staticmethod
+    def prune_portfolio_snapshots(before):
+        """
+        SQL statement to delete portfolio snapshots older than the retention window.
+
+        :arg.
+            before (datetime): Snapshots valued before this time are deleted.
+        :return:
+            delete: SQLAlchemy delete statement.
+        """
+        return delete(PortfolioSnapshot).where(PortfolioSnapshot.valued_at < before)
+
+    @staticmethod
+    def check_portfolio_daily_values_exist(value_date):
+        """
+        SQL query to check whether any user has a stored portfolio value for a day.
+
+        :arg.
+            value_date (date): The day to check.
+        :return:
+            select: SQLAlchemy select query returning a boolean.
+        """
+        return select(exists().where(PortfolioDailyValue.value_date == value_date))
+
+    @staticmethod
+    def clear_portfolio_daily_values(value_date, user_ids=None):
+        """
+        SQL statement to delete the stored portfolio values of a day before they are rebuilt.
+
+        :arg.
+            value_date (date): The day to clear.
+            user_ids: IDs (or a subquery of IDs) of the users to clear; all users when None.
+        :return:
+            delete: SQLAlchemy delete statement.
+        """
+        query = delete(PortfolioDailyValue).where(PortfolioDailyValue.value_date == value_date)
+        if user_ids is not None:
+            query = query.where(PortfolioDailyValue.user_id.in_(user_ids))
+        return query
+
+    @staticmethod
+    def rebuild_portfolio_daily_values(value_date, user_ids=None):
+        """
+        SQL statement to value the investments users held on a day at the NAV in force that day, in one
+        set-based pass. Each holding is priced at its scheme's newest nav_series point on or before the day
+        (an index-only lookup on idx_nav_series_scheme_date), or at its purchase NAV when there is none.
+
+        :arg.
+            value_date (date): The day to value.
+            user_ids: IDs (or a subquery of IDs) of the users to value; all users when None.
+        :return:
+            insert: SQLAlchemy INSERT ... SELECT statement.
+        """
+        nav_on_day = select(NavHistory.nav).where(
+            NavHistory.scheme_id == Investment.scheme_id,
+            NavHistory.nav_date <= value_date
+        ).order_by(NavHistory.nav_date.desc()).limit(1).correlate(Investment).scalar_subquery()
+        held_until = datetime.datetime.combine(value_date + datetime.timedelta(days=1), datetime.time.min,
+                                               tzinfo=datetime.timezone.utc)
+        holdings = select(
+            Portfolio.user_id.label("user_id"),
+            Investment.id.label("investment_id"),
+            Investment.amount.label("amount"),
+            (Investment.units * func.coalesce(nav_on_day, Investment.purchased_nav)).label("value"),
+        ).select_from(Investment
+        ).join(Portfolio, Investment.portfolio_id == Portfolio.id
+        ).where(Investment.is_active.is_(True), Investment.investment_date < held_until)
+        if user_ids is not None:
+            holdings = holdings.where(Portfolio.user_id.in_(user_ids))
+        holdings = holdings.subquery()
+
+        query = select(
+            holdings.c.user_id,
+            literal(value_date, PortfolioDailyValue.value_date.type),
+            func.sum(holdings.c.amount),
+            func.sum(holdings.c.value),
+            func.sum(holdings.c.value - holdings.c.amount),
+            case(
+                (func.sum(holdings.c.amount) > 0,
+                 func.sum(holdings.c.value - holdings.c.amount) / func.sum(holdings.c.amount) * 100),
+                else_=0
+            ),
+            func.count(holdings.c.investment_id),
+            func.now(),
+        ).group_by(holdings.c.user_id)
+        return insert(PortfolioDailyValue).from_select(
+            ["user_id", "value_date", "total_amount", "total_value", "gain_loss", "returns_pct", "total_investments",
+             "updated_at"],
+            query
+        )
+
+    @staticmethod
+    def fetch_portfolio_history(user_id: str, start, end, granularity: str = "daily", dialect_name: str = "postgresql"):
+        """
+        SQL query to fetch a user's stored daily portfolio values over a date range, downsampled in the database.
+        Weekly and monthly series keep the last stored day of every week / month.
+
+        :arg.
+            user_id (str): The ID of the user.
+            start (date): First day of the range.
+            end (date): Last day of the range.
+            granularity (str): "daily", "weekly" or "monthly".
+            dialect_name (str): Dialect of the session, which decides how days are bucketed.
+        :return:
+            select: SQLAlchemy select query returning value_date, total_amount, total_value, gain_loss and
+            returns_pct ordered by value_date.
+        """
+        in_range = (PortfolioDailyValue.user_id == user_id,
+                    PortfolioDailyValue.value_date.between(start, end))
+        query = select(
+            PortfolioDailyValue.value_date,
+            PortfolioDailyValue.total_amount,
+            PortfolioDailyValue.total_value,
+            PortfolioDailyValue.gain_loss,
+            PortfolioDailyValue.returns_pct,
+        ).where(*in_range).order_by(PortfolioDailyValue.value_date)
+        if granularity == "daily":
+            return query
+
+        period = {"weekly": "week", "monthly": "month"}[granularity]
+        if dialect_name == "postgresql":
+            bucket = func.date_trunc(period, PortfolioDailyValue.value_date)
+        else:
+            bucket = func.strftime("%Y-%W" if period == "week" else "%Y-%m", PortfolioDailyValue.value_date)
+        period_ends = select(func.max(PortfolioDailyValue.value_date)).where(*in_range).group_by(bucket)
+        return query.where(PortfolioDailyValue.value_date.in_(period_ends))
+
+    @staticmethod
+    def fetch_latest_nav_updated_at():
+        """
+        Generates a SQL query to fetch the newest latest_nav.updated_at, i.e. the NAV cache epoch in the database.
+
+        :return:
+            select: SQLAlchemy select query returning a single timestamp (None when latest_nav is empty).
+        """
+        return select(func.max(LatestNav.updated_at))
+
+    @staticmethod
+    def record_scheduler_job_run(run: dict, failed: bool):
+        """
+        Generates an upsert storing the last run of a scheduler job and bumping its run/failure counters.
+
+        :arg.
+            run (dict): job_id, instance_id, last_started_at, last_finished_at, last_duration_ms, last_status,
+                last_error and last_result.
+            failed (bool): Whether the run failed.
+
+        :return:
+            insert: SQLAlchemy insert ... on conflict do update statement.
+        """
+        stmt = upsert(SchedulerJob).values(**run, run_count=1, failure_count=int(failed))
+        return stmt.on_conflict_do_update(
+            index_elements=[SchedulerJob.job_id],
+            set_={
+                **{key: stmt.excluded[key] for key in run if key != "job_id"},
+                "run_count": SchedulerJob.run_count + 1,
+                "failure_count": SchedulerJob.failure_count + int(failed),
+            },
+        )
+
+    @staticmethod
+    def fetch_scheduler_jobs():
+        """
+        SQL query to fetch the last run of every scheduler job.
+
+        :return:
+            select: SQLAlchemy select query.
+        """
+        return select(*SchedulerJob.__table__.columns).order_by(SchedulerJob.job_id)
+
+    @staticmethod
+    def try_advisory_lock(lock_key: int):
+        """
+        SQL statement trying to take a session-level Postgres advisory lock without waiting.
+
+        :arg.
+            lock_key (int): Advisory lock key.
+
+        :return:
+            text: SQLAlchemy text clause returning True if the lock was acquired.
+        """
+        return text("SELECT pg_try_advisory_lock(:lock_key)").bindparams(lock_key=lock_key)
+
+    @staticmethod
+    def advisory_unlock(lock_key: int):
+        """
+        SQL statement releasing a session-level Postgres advisory lock held by this connection.
+
+        :arg.
+            lock_key (int): Advisory lock key.
+
+        :return:
+            text: SQLAlchemy text clause.
+        """
+        return text("SELECT pg_advisory_unlock(:lock_key)").bindparams(lock_key=lock_key)
+
+    @staticmethod
+    def holds_advisory_lock(lock_key: int):
+        """
+        SQL statement checking that this connection's backend still holds the given advisory lock.
+        A transparently reconnected connection is a new backend and no longer holds it.
+
+        :arg.
+            lock_key (int): Advisory lock key.
+
+        :return:
+            text: SQLAlchemy text clause returning True if the lock is held.
+        """
+        return text(
+            "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid() "
+            "AND granted AND objsubid = 1 AND ((classid::bigint << 32) | objid::bigint) = :lock_key)"
+        ).bindparams(lock_key=lock_key)
+
+    @staticmethod
+    def create_nav_series_partition(year: int):
+        """
+        DDL to create the yearly nav_series partition for the given year (Postgres only).
+
+        :arg.
+            year (int): Calendar year covered by the partition.
+        :return:
+            text: SQLAlchemy text clause creating the partition if it does not exist.
+        """
+        return text(
+            f"CREATE TABLE IF NOT EXISTS nav_series_y{year:04d} PARTITION OF nav_series "
+            f"FOR VALUES FROM ('{year:04d}-01-01') TO ('{year + 1:04d}-01-01')"
+        )
+
+    @staticmethod
+    def create_scheme_staging_table():
+        """
+        DDL for the staging table the COPY loader writes the scheduler feed into (Postgres only).
+        It is a temporary table private to the session and dropped at commit/rollback, so overlapping loads
+        (e.g. a manual ``scheduler.py`` run next to the leader, or a leader handover mid-sync) never see or drop
+        each other's rows.
+
+        :return:
+            text: SQLAlchemy text clause creating the staging table.
+        """
+        return text(
+            "CREATE TEMP TABLE fund_scheme_staging ("
+            "seq BIGINT NOT NULL, scheme_code TEXT NOT NULL, scheme_name TEXT NOT NULL, fund_family TEXT NOT NULL, "
+            "fund_type TEXT NOT NULL, nav DOUBLE PRECISION NOT NULL, nav_date DATE NOT NULL, "
+            "updated_at TIMESTAMPTZ NOT NULL, fingerprint TEXT NOT NULL) ON COMMIT DROP"
+        )
+
+    @staticmethod
+    def discard_unchanged_staged_schemes():
+        """
+        SQL statement removing every staged scheme whose last staged row matches the stored fingerprint.
+
+        :return:
+            text: SQLAlchemy text clause.
+        """
+        return text(
+            "DELETE FROM fund_scheme_staging s "
+            "USING (SELECT DISTINCT ON (scheme_code) scheme_code, fingerprint FROM fund_scheme_staging "
+            "       ORDER BY scheme_code, seq DESC) l "
+            "JOIN fund_schemes fs ON fs.scheme_code = l.scheme_code AND fs.fingerprint = l.fingerprint "
+            "WHERE s.scheme_code = l.scheme_code"
+        )
+
+    @staticmethod
+    def merge_staged_fund_schemes():
+        """
+        Set-based upsert of staged rows into fund_schemes; the last staged row per scheme_code wins.
+
+        :return:
+            text: SQLAlchemy text clause returning (scheme_code, id, inserted) for every merged scheme.
+        """
+        return text(
+            "INSERT INTO fund_schemes (id, scheme_code, scheme_name, fund_family, fund_type, fingerprint, "
+            "created_at, updated_at) "
+            "SELECT gen_random_uuid(), s.scheme_code, s.scheme_name, s.fund_family, s.fund_type, s.fingerprint, "
+            "s.updated_at, s.updated_at "
+            "FROM (SELECT DISTINCT ON (scheme_code) * FROM fund_scheme_staging ORDER BY scheme_code, seq DESC) s "
+            "ON CONFLICT (scheme_code) DO UPDATE SET scheme_name = EXCLUDED.scheme_name, "
+            "fund_family = EXCLUDED.fund_family, fund_type = EXCLUDED.fund_type, "
+            "fingerprint = EXCLUDED.fingerprint, updated_at = EXCLUDED.updated_at "
+            "RETURNING scheme_code, id, (xmax = 0) AS inserted"
+        )
+
+    @staticmethod
+    def merge_staged_nav_series():
+        """
+        Set-based upsert of staged NAV points into nav_series; the last staged row per (scheme, nav_date) wins.
+
+        :return:
+            text: SQLAlchemy text clause.
+        """
+        return text(
+            "INSERT INTO nav_series (scheme_id, nav_date, nav, updated_at) "
+            "SELECT fs.id, s.nav_date, s.nav, s.updated_at "
+            "FROM (SELECT DISTINCT ON (scheme_code, nav_date) * FROM fund_scheme_staging "
+            "      ORDER BY scheme_code, nav_date, seq DESC) s "
+            "JOIN fund_schemes fs ON fs.scheme_code = s.scheme_code "
+            "ON CONFLICT (scheme_id, nav_date) DO UPDATE SET nav = EXCLUDED.nav, updated_at = EXCLUDED.updated_at"
+        )
+
+    @staticmethod
+    def merge_staged_latest_nav():
+        """
+        Set-based upsert of the newest staged NAV per scheme into latest_nav; never moves a scheme back in time.
+
+        :return:
+            text: SQLAlchemy text clause.
+        """
+        return text(
+            "INSERT INTO latest_nav (scheme_id, nav, nav_date, updated_at) "
+            "SELECT fs.id, s.nav, s.nav_date, s.updated_at "
+            "FROM (SELECT DISTINCT ON (scheme_code) * FROM fund_scheme_staging "
+            "      ORDER BY scheme_code, nav_date DESC, seq DESC) s "
+            "JOIN fund_schemes fs ON fs.scheme_code = s.scheme_code "
+            "ON CONFLICT (scheme_id) DO UPDATE SET nav = EXCLUDED.nav, nav_date = EXCLUDED.nav_date, "
+            "updated_at = EXCLUDED.updated_at WHERE latest_nav.nav_date <= EXCLUDED.nav_date"
+        )
@@ -1,10 +1,13 @@
 import datetime
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
 from sqlalchemy import TIMESTAMP, MetaData, create_engine
 
 from src.config import SQLConfig
+from src.db.pg.migrations import SchemaMigrations
+from src.db.pg.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_metrics
 from src.logging import logger
 
 
@@ -20,6 +23,8 @@ class SessionUtil:
     def __init__(self):
         self.user_engines = {}
         self.sessionmakers = {}
+        self.async_engines = {}
+        self.async_sessionmakers = {}
 
     def get_session(self, database: str = SQLConfig.SQL_DATABASE, metadata: MetaData = None) -> Generator[Session, None, None]:
         self._get_engine(database=database, metadata=metadata)
@@ -27,15 +32,34 @@ class SessionUtil:
         with sessionmaker_() as session:
             yield session
 
+    async def get_async_session(self, database: str = SQLConfig.SQL_DATABASE, metadata: MetaData = None) -> AsyncGenerator[AsyncSession, None]:
+        async with self.async_session(database=database, metadata=metadata) as session:
+            yield session
+
+    def async_session(self, database: str = SQLConfig.SQL_DATABASE, metadata: MetaData = None) -> AsyncSession:
+        """
+        Create a new AsyncSession for the given database.
+        Usable as ``async with session_util.async_session() as session:`` outside FastAPI dependencies.
+        """
+        self._get_async_engine(database=database, metadata=metadata)
+        return self.async_sessionmakers[database]()
+
+    def async_connection(self, database: str = SQLConfig.SQL_DATABASE, metadata: MetaData = None) -> AsyncConnection:
+        """
+        Create a new AsyncConnection for the given database, for callers that need to hold one connection
+        (e.g. session-level advisory locks). Open it with ``await`` or ``async with``.
+        """
+        return self._get_async_engine(database=database, metadata=metadata).connect()
+
     def _get_engine(self, database: str = SQLConfig.SQL_DATABASE, metadata: MetaData = None):
         if database not in self.user_engines:
             engine = create_engine(
                 f"{SQLConfig.SQL_URL}/{SQLConfig.SQL_DATABASE}",
-                connect_args={"connect_timeout": 10000},
-                pool_size=1,
-                pool_pre_ping=True,
+                connect_args={"connect_timeout": SQLConfig.SQL_CONNECT_TIMEOUT},
                 future=True,
+                **self._pool_options(InstrumentedQueuePool),
             )
+            pool_metrics.register(f"{database}.sync", engine.pool)
             self.user_engines[database] = engine
 
             self.sessionmakers[database] = sessionmaker(
@@ -51,6 +75,44 @@ class SessionUtil:
             )
         return self.user_engines[database]
 
+    def _get_async_engine(self, database: str = SQLConfig.SQL_DATABASE, metadata: MetaData = None) -> AsyncEngine:
+        if database not in self.async_engines:
+            # DDL (database/table creation) is still done once through the sync engine.
+            self._get_engine(database=database, metadata=metadata)
+            engine = create_async_engine(
+                f"{self.async_url(SQLConfig.SQL_URL)}/{SQLConfig.SQL_DATABASE}",
+                connect_args={"timeout": SQLConfig.SQL_CONNECT_TIMEOUT},
+                **self._pool_options(InstrumentedAsyncQueuePool),
+            )
+            pool_metrics.register(f"{database}.async", engine.sync_engine.pool)
+            self.async_engines[database] = engine
+
+            self.async_sessionmakers[database] = async_sessionmaker(
+                bind=engine,
+                expire_on_commit=False,
+                autoflush=False,
+            )
+        return self.async_engines[database]
+
+    @staticmethod
+    def _pool_options(poolclass) -> dict:
+        """Pool keyword arguments shared by the sync and async engines, taken from SQLConfig."""
+        return {
+            "poolclass": poolclass,
+            "pool_size": SQLConfig.SQL_POOL_SIZE,
+            "max_overflow": SQLConfig.SQL_MAX_OVERFLOW,
+            "pool_timeout": SQLConfig.SQL_POOL_TIMEOUT,
+            "pool_recycle": SQLConfig.SQL_POOL_RECYCLE,
+            "pool_pre_ping": SQLConfig.SQL_POOL_PRE_PING,
+        }
+
+    @staticmethod
+    def async_url(url: str) -> str:
+        """Translate the configured (sync) postgres URL to its asyncpg equivalent."""
+        for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+            if url.startswith(prefix):
+                return "postgresql+asyncpg://" + url[len(prefix):]
+        return url
 
     def create_default_dependencies(self, _engine, metadata: MetaData):
         # if not database_exists(str(_engine.url)):
@@ -58,6 +120,7 @@ class SessionUtil:
         self.create_database()
 
         metadata.create_all(_engine, checkfirst=True)
+        SchemaMigrations.upgrade(_engine)
 
     @staticmethod
     def create_database():
@@ -98,5 +161,10 @@ class SessionUtil:
 session_util = SessionUtil()
 
 # Dependency for FastAPI
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async for session in session_util.get_async_session():
+        yield session
+
+# Sync dependency, kept for scripts and tests that run against SQLite
+def get_sync_db() -> Generator[Session, None, None]:
     yield from session_util.get_session()
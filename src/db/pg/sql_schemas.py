@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Index, ForeignKey
+from sqlalchemy import DDL, Date, Index, ForeignKey, event, text
 from sqlalchemy.orm import Mapped, MappedColumn, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from src.db.pg.sessions import Base
@@ -20,6 +20,8 @@ class Users(Base):
     address: Mapped[str] = MappedColumn(nullable=True)
     password: Mapped[str] = MappedColumn(nullable=False)
     is_active: Mapped[bool] = MappedColumn(default=True, nullable=False, index=True)
+    # bumped on every investment write; with the NAV epoch it versions the user's NAV-derived responses (ETags)
+    investments_version: Mapped[int] = MappedColumn(default=0, server_default="0", nullable=False)
     created_at: Mapped[datetime.datetime] = MappedColumn(default=datetime.datetime.now(datetime.timezone.utc), nullable=False, index=True
     )
     updated_at: Mapped[datetime.datetime] = MappedColumn(default=datetime.datetime.now(datetime.timezone.utc),
@@ -68,6 +70,9 @@ class Portfolio(Base):
 
 class FundScheme(Base):
     __tablename__ = "fund_schemes"
+    __table_args__ = (
+        Index("idx_fund_scheme_family_code", "fund_family", "scheme_code"),
+    )
 
     id: Mapped[uuid.UUID] = MappedColumn(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False
@@ -76,6 +81,8 @@ class FundScheme(Base):
     scheme_name: Mapped[str] = MappedColumn(nullable=False)
     fund_family: Mapped[str] = MappedColumn(nullable=False)
     fund_type: Mapped[str] = MappedColumn(nullable=False)
+    # md5 of (name, family, type, latest nav, nav date) as last synced; lets the scheduler skip unchanged schemes
+    fingerprint: Mapped[str] = MappedColumn(nullable=True)
     created_at: Mapped[datetime.datetime] = MappedColumn(default=datetime.datetime.now(datetime.timezone.utc), nullable=False, index=True)
     updated_at: Mapped[datetime.datetime] = MappedColumn(
         default=datetime.datetime.now(datetime.timezone.utc),
@@ -85,7 +92,8 @@ class FundScheme(Base):
     )
     investments = relationship("Investment", back_populates="fund_scheme")
 
-    nav_history = relationship("NavHistory", back_populates="fund_scheme")
+    nav_history = relationship("NavHistory", back_populates="fund_scheme", order_by="NavHistory.nav_date")
+    latest_nav = relationship("LatestNav", back_populates="fund_scheme", uselist=False)
 
 
 
@@ -121,16 +129,143 @@ class Investment(Base):
 
 
 class NavHistory(Base):
-    __tablename__ = "nav_history"
-    id: Mapped[uuid.UUID] = MappedColumn(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False
+    """
+    Append-only NAV time series: one row per scheme per NAV date.
+    On Postgres the table is range-partitioned by nav_date (one partition per year).
+    """
+    __tablename__ = "nav_series"
+    __table_args__ = (
+        Index(
+            "idx_nav_series_scheme_date",
+            "scheme_id",
+            text("nav_date DESC"),
+            postgresql_include=["nav"],
+        ),
+        {"postgresql_partition_by": "RANGE (nav_date)"},
     )
-    scheme_id = MappedColumn(UUID(as_uuid=True), ForeignKey("fund_schemes.id", ondelete="CASCADE"), unique = True, nullable=False, index=True)
+
+    scheme_id: Mapped[uuid.UUID] = MappedColumn(
+        UUID(as_uuid=True), ForeignKey("fund_schemes.id", ondelete="CASCADE"), primary_key=True, nullable=False
+    )
+    nav_date: Mapped[datetime.date] = MappedColumn(Date, primary_key=True, nullable=False)
     nav: Mapped[float] = MappedColumn(nullable=False)
     updated_at: Mapped[datetime.datetime] = MappedColumn(default=datetime.datetime.now(datetime.timezone.utc), onupdate=datetime.datetime.now(datetime.timezone.utc), nullable=False)
 
     fund_scheme = relationship("FundScheme", back_populates="nav_history")
 
-# from sqlalchemy import create_engine
-# engine = create_engine("")
-# Base.metadata.create_all(engine)
+
+class LatestNav(Base):
+    """
+    Latest NAV per scheme, kept in step with nav_series by the scheduler so point lookups stay a single-row read.
+    """
+    __tablename__ = "latest_nav"
+
+    scheme_id: Mapped[uuid.UUID] = MappedColumn(
+        UUID(as_uuid=True), ForeignKey("fund_schemes.id", ondelete="CASCADE"), primary_key=True, nullable=False
+    )
+    nav: Mapped[float] = MappedColumn(nullable=False)
+    nav_date: Mapped[datetime.date] = MappedColumn(Date, nullable=False)
+    # Indexed so the NAV epoch (max(updated_at)) read by cache checks and per-user ETags is an index lookup
+    updated_at: Mapped[datetime.datetime] = MappedColumn(default=datetime.datetime.now(datetime.timezone.utc), onupdate=datetime.datetime.now(datetime.timezone.utc), nullable=False, index=True)
+
+    fund_scheme = relationship("FundScheme", back_populates="latest_nav")
+
+
+class FundFamily(Base):
+    """
+    Per-family summary of fund_schemes, rebuilt by the scheduler after each NAV sync.
+    """
+    __tablename__ = "fund_families"
+
+    fund_family: Mapped[str] = MappedColumn(primary_key=True, nullable=False)
+    scheme_count: Mapped[int] = MappedColumn(nullable=False)
+    latest_nav_date: Mapped[datetime.date] = MappedColumn(Date, nullable=True)
+    updated_at: Mapped[datetime.datetime] = MappedColumn(default=datetime.datetime.now(datetime.timezone.utc), nullable=False)
+
+
+class PortfolioValuation(Base):
+    """
+    Valuation of each user's active investments at the latest NAVs (one row per user). Refreshed for the affected
+    users after every NAV sync and after create_investment, so the portfolio summary is a primary-key lookup.
+    """
+    __tablename__ = "portfolio_valuations"
+
+    user_id: Mapped[uuid.UUID] = MappedColumn(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, nullable=False
+    )
+    total_amount: Mapped[float] = MappedColumn(nullable=False)
+    total_value: Mapped[float] = MappedColumn(nullable=False)
+    gain_loss: Mapped[float] = MappedColumn(nullable=False)
+    returns_pct: Mapped[float] = MappedColumn(nullable=False)
+    total_investments: Mapped[int] = MappedColumn(nullable=False)
+    updated_at: Mapped[datetime.datetime] = MappedColumn(default=datetime.datetime.now(datetime.timezone.utc), nullable=False)
+
+
+class PortfolioSnapshot(Base):
+    """
+    Valuation of each portfolio's active investments as of one scheduler run (one row per portfolio per run),
+    written by the revaluation stage that follows every NAV sync which changed NAVs.
+    """
+    __tablename__ = "portfolio_snapshots"
+    __table_args__ = (
+        Index("idx_portfolio_snapshot_portfolio_valued", "portfolio_id", text("valued_at DESC")),
+        Index("idx_portfolio_snapshot_valued", "valued_at"),
+    )
+
+    run_id: Mapped[uuid.UUID] = MappedColumn(UUID(as_uuid=True), primary_key=True, nullable=False)
+    portfolio_id: Mapped[uuid.UUID] = MappedColumn(
+        UUID(as_uuid=True), ForeignKey("portfolios.id", ondelete="CASCADE"), primary_key=True, nullable=False
+    )
+    user_id: Mapped[uuid.UUID] = MappedColumn(UUID(as_uuid=True), nullable=False, index=True)
+    total_amount: Mapped[float] = MappedColumn(nullable=False)
+    total_value: Mapped[float] = MappedColumn(nullable=False)
+    gain_loss: Mapped[float] = MappedColumn(nullable=False)
+    returns_pct: Mapped[float] = MappedColumn(nullable=False)
+    total_investments: Mapped[int] = MappedColumn(nullable=False)
+    valued_at: Mapped[datetime.datetime] = MappedColumn(nullable=False)
+
+
+class PortfolioDailyValue(Base):
+    """
+    Value of each user's active investments at the NAV in force on each calendar day (one row per user per day).
+    Today's row is rewritten by every NAV sync; past days are filled by the backfill, so the history chart is a
+    primary-key range scan.
+    """
+    __tablename__ = "portfolio_daily_value"
+
+    user_id: Mapped[uuid.UUID] = MappedColumn(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, nullable=False
+    )
+    value_date: Mapped[datetime.date] = MappedColumn(Date, primary_key=True, nullable=False)
+    total_amount: Mapped[float] = MappedColumn(nullable=False)
+    total_value: Mapped[float] = MappedColumn(nullable=False)
+    gain_loss: Mapped[float] = MappedColumn(nullable=False)
+    returns_pct: Mapped[float] = MappedColumn(nullable=False)
+    total_investments: Mapped[int] = MappedColumn(nullable=False)
+    updated_at: Mapped[datetime.datetime] = MappedColumn(default=datetime.datetime.now(datetime.timezone.utc), nullable=False)
+
+
+class SchedulerJob(Base):
+    """
+    Outcome of the last run of every scheduler job (one row per job), written after each run.
+    """
+    __tablename__ = "scheduler_jobs"
+
+    job_id: Mapped[str] = MappedColumn(primary_key=True, nullable=False)
+    instance_id: Mapped[str] = MappedColumn(nullable=False)  # host:pid of the process that ran it last
+    last_started_at: Mapped[datetime.datetime] = MappedColumn(nullable=False)
+    last_finished_at: Mapped[datetime.datetime] = MappedColumn(nullable=False)
+    last_duration_ms: Mapped[float] = MappedColumn(nullable=False)
+    last_status: Mapped[str] = MappedColumn(nullable=False)  # "success" or "failed"
+    last_error: Mapped[str] = MappedColumn(nullable=True)
+    last_result: Mapped[str] = MappedColumn(nullable=True)  # e.g. the ingestion report summary
+    run_count: Mapped[int] = MappedColumn(default=0, nullable=False)
+    failure_count: Mapped[int] = MappedColumn(default=0, nullable=False)
+
+
+# Rows whose year has no partition yet land in the default partition instead of failing the insert.
+event.listen(
+    NavHistory.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS nav_series_default PARTITION OF nav_series DEFAULT").execute_if(dialect="postgresql"),
+)
@@ -1,67 +1,165 @@
+import asyncio
 import datetime
+import time
 
-import httpx
-from sqlalchemy.orm import Session
+from src.cache.nav import nav_cache
+from src.cache.responses import response_cache
+from src.config import SchedulerConfig
+from src.core.schemas.scheduler import BackfillReport, IngestionReport
 from src.logging import logger
-from src.config import RapidAPIConfig
 from src.db.pg.handler import SQLHandler
-from src.db.pg.sessions import get_db
+from src.db.pg.sessions import session_util
+from src.scheduler.ingestion import FundIngestionPipeline, RapidAPIFeed
 
 
 class SchedulerHandler:
     async def update_all_portfolios(self):
         """
-        Fetch latest fund schemes from RapidAPI and update Postgres.
+        Full refresh: fetch latest fund schemes (scheme master and NAVs) from RapidAPI and update Postgres, then
+        re-value the portfolios holding the changed schemes.
         This function runs once per schedule (APScheduler handles intervals).
         """
-        try:
-            logger.info("Inside scheduler to update portfolios")
-            db: Session = next(get_db())
+        return await self._sync(nav_only=False)
+
+    async def refresh_navs(self):
+        """
+        NAV-only refresh: write the NAVs of already known schemes from RapidAPI, leaving the scheme master alone,
+        then re-value the portfolios holding the changed schemes.
+        """
+        return await self._sync(nav_only=True)
+
+    @staticmethod
+    async def refresh_summaries():
+        """
+        Rebuild the derived summary tables (fund family index, portfolio valuations, today's portfolio values)
+        from scratch.
+        """
+        async with session_util.async_session() as db:
             sql_handler = SQLHandler(session=db)
+            await sql_handler.refresh_fund_family_summary()
+            await sql_handler.refresh_portfolio_valuations()
+            await sql_handler.refresh_portfolio_daily_values(datetime.datetime.now(datetime.timezone.utc).date())
+        await response_cache.invalidate()
+
+    @staticmethod
+    async def record_daily_values(sql_handler: SQLHandler, report: IngestionReport):
+        """
+        Daily value stage: rewrite today's portfolio_daily_value rows of the users holding a changed scheme.
+        The first sync of a day values every user, so each day has a row for everyone with investments.
+
+        :param sql_handler: Handler bound to the sync's session.
+        :param report: Report of the sync; its changed_scheme_ids select the users to value.
+        """
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        with report.timed("daily_value"):
+            scheme_ids = report.changed_scheme_ids
+            if not await sql_handler.check_portfolio_daily_values_exist(today):
+                scheme_ids = None
+            await sql_handler.refresh_portfolio_daily_values(today, scheme_ids=scheme_ids)
+
+    @staticmethod
+    async def backfill_daily_values(start: datetime.date, end: datetime.date, workers: int | None = None):
+        """
+        Value every user on every day from start to end (inclusive) into portfolio_daily_value, using a pool of
+        workers that each value one day at a time on their own session. Days are independent, so a failed day is
+        logged and reported without stopping the others; re-running a range overwrites it.
+
+        :param start: First day to value.
+        :param end: Last day to value.
+        :param workers: Days valued concurrently (defaults to SCHEDULER_BACKFILL_WORKERS); keep it within the
+            connection pool size.
+        :return: BackfillReport with the days and rows written.
+        """
+        workers = max(1, workers or SchedulerConfig.SCHEDULER_BACKFILL_WORKERS)
+        report = BackfillReport(start=start, end=end, workers=workers)
+        days = asyncio.Queue()
+        for offset in range((end - start).days + 1):
+            days.put_nowait(start + datetime.timedelta(days=offset))
+
+        async def worker():
+            while not days.empty():
+                value_date = days.get_nowait()
+                try:
+                    async with session_util.async_session() as db:
+                        report.rows += await SQLHandler(session=db).refresh_portfolio_daily_values(value_date)
+                    report.days += 1
+                except Exception as e:
+                    report.failed_days.append(value_date)
+                    logger.error(f"Backfill of portfolio values for {value_date} failed: {e}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(report.workers)))
+        report.elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+        if report.failed_days:
+            report.failed_days.sort()
+            report.status, report.error = "failed", f"{len(report.failed_days)} days failed"
+        logger.info(f"Backfilled portfolio values: {report.summary()}")
+        return report
+
+    @staticmethod
+    async def refresh_nav_cache():
+        """
+        Reload this process's NAV cache when another process (the scheduler leader) has synced newer NAVs.
+        :return: True if the cache was reloaded.
+        """
+        async with session_util.async_session() as db:
+            reloaded = await nav_cache.refresh_if_stale(db)
+        if reloaded:
+            # Drops this worker's in-memory responses; a shared (Redis) cache was already cleared by the leader
+            await response_cache.invalidate()
+        return reloaded
+
+    @staticmethod
+    async def revalue_portfolios(sql_handler: SQLHandler, report: IngestionReport):
+        """
+        Revaluation stage: snapshot the current value and gain/loss of every portfolio holding a changed scheme
+        (set-based, in the database) under the run's id, and record the throughput on the report.
 
-            fund_schemes = await self.fetch_fund_schemes_from_rapidapi()
-            if not fund_schemes:
-                logger.info("No fund schemes fetched from RapidAPI")
-                return
-            current_time = datetime.datetime.now()
-            scheme_mapping = await sql_handler.bulk_upsert_fund_schemes(
-                [
-                    {
-                        "scheme_code": s["Scheme_Code"],
-                        "scheme_name": s["Scheme_Name"],
-                        "fund_family": s["Mutual_Fund_Family"],
-                        "fund_type": s.get("Scheme_Type", "Unknown"),
-                        "updated_at": current_time
-                    }
-                    for s in fund_schemes
-                ]
+        :param sql_handler: Handler bound to the sync's session.
+        :param report: Report of the sync; its changed_scheme_ids select the portfolios to value.
+        """
+        valued_at = datetime.datetime.now(datetime.timezone.utc)
+        retention_days = SchedulerConfig.SCHEDULER_SNAPSHOT_RETENTION_DAYS
+        with report.timed("revalue"):
+            totals = await sql_handler.snapshot_portfolio_valuations(
+                report.run_id, valued_at, scheme_ids=report.changed_scheme_ids,
+                retain_before=valued_at - datetime.timedelta(days=retention_days) if retention_days > 0 else None,
             )
-            nav_data = [
-                {
-                    "scheme_id": str(scheme_mapping[str(s["Scheme_Code"])]),
-                    "nav": s["Net_Asset_Value"],
-                    "updated_at": current_time
-                }
-                for s in fund_schemes if str(s["Scheme_Code"]) in scheme_mapping
-            ]
-            await sql_handler.bulk_upsert_nav_history(nav_data)
-
-            logger.info(f"{len(fund_schemes)} schemes synced, investments updated")
+        report.portfolios_revalued = totals["portfolios"]
+        report.investments_revalued = totals["investments"]
+        elapsed = report.timings_ms["revalue"] / 1000
+        report.revaluation_rows_per_sec = round(totals["investments"] / elapsed, 1) if elapsed else 0.0
+        logger.info(f"Revalued {report.investments_revalued} investments in {report.portfolios_revalued} portfolios "
+                    f"({report.revaluation_rows_per_sec:.0f} rows/s)")
+
+    async def _sync(self, nav_only: bool) -> IngestionReport:
+        report = IngestionReport()
+        try:
+            logger.info("Inside scheduler to update portfolios")
+            async with session_util.async_session() as db:
+                sql_handler = SQLHandler(session=db)
+                await FundIngestionPipeline(sql_handler, nav_only=nav_only).run(RapidAPIFeed.iter_schemes(),
+                                                                                 report=report)
+                if not report.received:
+                    logger.info("No fund schemes fetched from RapidAPI")
+                    return report
+
+                # Nothing changed: the snapshots, daily values, summary, valuations and every NAV cache are current.
+                if report.inserted or report.updated:
+                    await self.revalue_portfolios(sql_handler, report)
+                    await self.record_daily_values(sql_handler, report)
+                    with report.timed("refresh_summary"):
+                        await sql_handler.refresh_fund_family_summary()
+                    with report.timed("refresh_valuations"):
+                        await sql_handler.refresh_portfolio_valuations(scheme_ids=report.changed_scheme_ids)
+                    with report.timed("reload_nav_cache"):
+                        await nav_cache.reload(db)
+                    with report.timed("invalidate_responses"):
+                        await response_cache.invalidate()
+
+            logger.info(f"{report.valid} schemes synced: {report.summary()}")
 
         except Exception as e:
+            report.status, report.error = "failed", str(e)
             logger.error(f"Error updating portfolios: {e}")
-
-    @staticmethod
-    async def fetch_fund_schemes_from_rapidapi():
-        url = f"https://{RapidAPIConfig.RAPIDAPI_HOST}/latest?Scheme_Type=Open"
-        headers = {
-            "X-RapidAPI-Key": RapidAPIConfig.RAPIDAPI_KEY,
-            "X-RapidAPI-Host": RapidAPIConfig.RAPIDAPI_HOST
-        }
-
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.get(url, headers=headers)
-            if response.status_code != 200:
-                logger.error(f"Failed to fetch schemes: {response.text}")
-                return []
-            return response.json()
+        return report
@@ -0,0 +1,329 @@
+import datetime
+import hashlib
+from typing import AsyncIterator
+
+import httpx
+import ijson
+
+from src.config import RapidAPIConfig, SchedulerConfig
+from src.core.schemas.scheduler import IngestionReport
+from src.db.pg.handler import SQLHandler
+from src.logging import logger
+
+
+class _ResponseReader:
+    """
+    File-like adapter so ijson can pull bytes from a streaming httpx response.
+    """
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+        self._buffer = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += await self._chunks.__anext__()
+            except StopAsyncIteration:
+                break
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class RapidAPIFeed:
+    """
+    Incremental reader for the RapidAPI latest-NAV feed (a top-level JSON array of scheme records).
+    """
+
+    @staticmethod
+    async def iter_schemes(scheme_type: str = "Open") -> AsyncIterator[dict]:
+        """
+        Stream scheme records from RapidAPI one at a time, without loading the whole payload.
+
+        :param scheme_type: Scheme_Type filter sent to RapidAPI.
+        :return: Async iterator of raw scheme records.
+        """
+        url = f"https://{RapidAPIConfig.RAPIDAPI_HOST}/latest?Scheme_Type={scheme_type}"
+        headers = {
+            "X-RapidAPI-Key": RapidAPIConfig.RAPIDAPI_KEY,
+            "X-RapidAPI-Host": RapidAPIConfig.RAPIDAPI_HOST
+        }
+
+        async with httpx.AsyncClient(timeout=60) as client:
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    logger.error(f"Failed to fetch schemes: {response.text}")
+                    return
+                async for record in ijson.items_async(_ResponseReader(response), "item", use_float=True):
+                    yield record
+
+
+class FundIngestionPipeline:
+    """
+    Parse -> normalize -> load pipeline for the scheduler's fund scheme/NAV sync.
+
+    Records flow through generators and are written in fixed-size chunks, so memory stays flat
+    regardless of feed size. Everything is written in one transaction, committed at the end.
+
+    Each scheme carries a fingerprint of its name, family, type, NAV and NAV date. Schemes whose fingerprint
+    matches the stored one are skipped, so an unchanged feed writes nothing.
+
+    With ``nav_only`` the scheme master is left alone: only NAV points of already known schemes are written,
+    and only when they differ from the scheme's latest NAV.
+
+    Two load modes are supported:
+      * ``batch``: each chunk is upserted with INSERT ... ON CONFLICT into fund_schemes/nav_series/latest_nav.
+      * ``copy``: chunks are COPYed into a transaction-scoped temp staging table and merged with three set-based
+        upserts at the end (Postgres + asyncpg only; other sessions fall back to ``batch``).
+    """
+
+    def __init__(self, sql_handler: SQLHandler, batch_size: int = SchedulerConfig.SCHEDULER_BATCH_SIZE,
+                 load_mode: str = SchedulerConfig.SCHEDULER_LOAD_MODE, nav_only: bool = False):
+        self.sql_handler = sql_handler
+        self.batch_size = batch_size
+        self.load_mode = "batch" if nav_only else load_mode
+        self.nav_only = nav_only
+        sql_ops = sql_handler.sql_ops
+        if self.load_mode == "copy" and not (sql_ops.is_async and sql_ops.dialect_name == "postgresql"):
+            logger.warning("COPY load mode needs an asyncpg session; falling back to batch mode")
+            self.load_mode = "batch"
+
+    async def run(self, records: AsyncIterator[dict], report: IngestionReport | None = None) -> IngestionReport:
+        """
+        Ingest the given raw records.
+
+        :param records: Async iterator of raw RapidAPI scheme records.
+        :param report: Report to fill in; a new one is created if not given.
+        :return: Row counts and per-stage timings.
+        """
+        report = report or IngestionReport()
+        current_time = datetime.datetime.now(datetime.timezone.utc)
+        await self.sql_handler.ensure_nav_series_partitions({current_time.year - 1, current_time.year})
+
+        try:
+            rows = self._normalized(self._timed_records(records, report), report, current_time)
+            if self.load_mode == "copy":
+                await self.copy_load(rows, report)
+            elif self.nav_only:
+                async for batch in self._chunks(rows):
+                    await self.write_nav_batch(batch, report)
+            else:
+                async for batch in self._chunks(rows):
+                    await self.write_batch(batch, report)
+            with report.timed("commit"):
+                await self.sql_handler.sql_ops.commit()
+        except Exception as e:
+            await self.sql_handler.sql_ops.rollback()
+            report.status, report.error = "failed", str(e)
+            raise
+        return report
+
+    async def copy_load(self, rows: AsyncIterator[dict], report: IngestionReport) -> dict:
+        """
+        COPY normalized rows into the staging table chunk by chunk, then merge them in one set-based pass.
+
+        :param rows: Normalized rows produced by ``normalize``.
+        :param report: Report to update.
+        :return: A dictionary mapping scheme codes to their corresponding IDs.
+        """
+        with report.timed("prepare_staging"):
+            await self.sql_handler.prepare_scheme_staging()
+        seq = 0
+        scheme_codes = set()
+        async for batch in self._chunks(rows):
+            staged = []
+            for row in batch:
+                seq += 1
+                scheme, nav = row["scheme"], row["nav"]
+                scheme_codes.add(scheme["scheme_code"])
+                staged.append((seq, scheme["scheme_code"], scheme["scheme_name"], scheme["fund_family"],
+                               scheme["fund_type"], nav["nav"], nav["nav_date"], nav["updated_at"],
+                               scheme["fingerprint"]))
+            with report.timed("copy"):
+                await self.sql_handler.copy_scheme_staging(staged)
+            report.batches += 1
+        with report.timed("diff"):
+            await self.sql_handler.discard_unchanged_staged_schemes()
+        with report.timed("merge"):
+            scheme_mapping, inserted, nav_rows = await self.sql_handler.merge_scheme_staging()
+        report.inserted += inserted
+        report.updated += len(scheme_mapping) - inserted
+        report.unchanged += len(scheme_codes) - len(scheme_mapping)
+        report.schemes_upserted += len(scheme_mapping)
+        report.navs_upserted += nav_rows
+        report.changed_scheme_ids.update(scheme_mapping.values())
+        return scheme_mapping
+
+    async def write_batch(self, batch: list[dict], report: IngestionReport):
+        """
+        Upsert the new and changed schemes of one batch (schemes first, then their NAV points) without committing.
+
+        :param batch: Normalized rows produced by ``normalize``.
+        :param report: Report to update.
+        """
+        # ON CONFLICT cannot touch the same row twice in one statement, so keep the last record per scheme
+        batch = list({row["scheme"]["scheme_code"]: row for row in batch}.values())
+        with report.timed("diff"):
+            stored = await self.sql_handler.fetch_scheme_fingerprints([row["scheme"]["scheme_code"] for row in batch])
+        changed = []
+        for row in batch:
+            scheme = row["scheme"]
+            if scheme["scheme_code"] not in stored:
+                report.inserted += 1
+            elif stored[scheme["scheme_code"]] != scheme["fingerprint"]:
+                report.updated += 1
+            else:
+                report.unchanged += 1
+                continue
+            changed.append(row)
+        report.batches += 1
+        if not changed:
+            return
+        batch = changed
+        with report.timed("upsert_schemes"):
+            scheme_mapping = await self.sql_handler.bulk_upsert_fund_schemes(
+                [row["scheme"] for row in batch], commit=False
+            )
+        nav_data = [
+            {**row["nav"], "scheme_id": scheme_mapping[row["scheme"]["scheme_code"]]}
+            for row in batch if row["scheme"]["scheme_code"] in scheme_mapping
+        ]
+        with report.timed("upsert_navs"):
+            await self.sql_handler.bulk_upsert_nav_history(nav_data, commit=False)
+        report.schemes_upserted += len(scheme_mapping)
+        report.navs_upserted += len(nav_data)
+        report.changed_scheme_ids.update(scheme_mapping.values())
+
+    async def write_nav_batch(self, batch: list[dict], report: IngestionReport):
+        """
+        Write the NAV points of one batch that differ from their scheme's latest NAV, without committing.
+        Schemes that are not in fund_schemes yet are left for the next full refresh. The fingerprint of every written
+        scheme is recomputed from its stored master fields and the new NAV, so the next full refresh only rewrites
+        the schemes whose master fields changed in the feed.
+
+        :param batch: Normalized rows produced by ``normalize``.
+        :param report: Report to update.
+        """
+        batch = list({row["scheme"]["scheme_code"]: row for row in batch}.values())
+        with report.timed("diff"):
+            stored = await self.sql_handler.fetch_scheme_latest_navs([row["scheme"]["scheme_code"] for row in batch])
+        nav_data, fingerprints = [], {}
+        for row in batch:
+            current, nav = stored.get(row["scheme"]["scheme_code"]), row["nav"]
+            if current is None:
+                report.skipped += 1
+            elif (current.nav_date, current.nav) == (nav["nav_date"], nav["nav"]):
+                report.unchanged += 1
+            else:
+                report.updated += 1
+                nav_data.append({**nav, "scheme_id": current.id})
+                fingerprints[current.id] = self.fingerprint(current.scheme_name, current.fund_family,
+                                                            current.fund_type, nav["nav"], nav["nav_date"])
+        with report.timed("upsert_navs"):
+            await self.sql_handler.bulk_upsert_nav_history(nav_data, commit=False)
+            await self.sql_handler.update_scheme_fingerprints(fingerprints, commit=False)
+        report.batches += 1
+        report.navs_upserted += len(nav_data)
+        report.changed_scheme_ids.update(row["scheme_id"] for row in nav_data)
+
+    @classmethod
+    def normalize(cls, record: dict, current_time: datetime.datetime) -> dict | None:
+        """
+        Validate a raw feed record and split it into a fund scheme row and a NAV row.
+
+        :param record: Raw RapidAPI record.
+        :param current_time: Timestamp of this sync run.
+        :return: {"scheme": ..., "nav": ...} or None if the record is unusable.
+        """
+        try:
+            scheme_code = str(record["Scheme_Code"]).strip()
+            scheme_name = str(record["Scheme_Name"]).strip()
+            fund_family = str(record["Mutual_Fund_Family"]).strip()
+            nav = float(record["Net_Asset_Value"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not scheme_code or not scheme_name or not fund_family or nav <= 0:
+            return None
+        fund_type = record.get("Scheme_Type") or "Unknown"
+        nav_date = cls.parse_nav_date(record.get("Date"), default=current_time.date())
+        return {
+            "scheme": {
+                "scheme_code": scheme_code,
+                "scheme_name": scheme_name,
+                "fund_family": fund_family,
+                "fund_type": fund_type,
+                "fingerprint": cls.fingerprint(scheme_name, fund_family, fund_type, nav, nav_date),
+                "updated_at": current_time,
+            },
+            "nav": {
+                "nav": nav,
+                "nav_date": nav_date,
+                "updated_at": current_time,
+            },
+        }
+
+    @staticmethod
+    def fingerprint(scheme_name: str, fund_family: str, fund_type: str, nav: float, nav_date: datetime.date) -> str:
+        """
+        Content fingerprint of a scheme as published by the feed.
+
+        :return: Hex md5 of the fields that, when changed, require a write.
+        """
+        content = "\x1f".join((scheme_name, fund_family, fund_type, repr(nav), nav_date.isoformat()))
+        return hashlib.md5(content.encode()).hexdigest()
+
+    @staticmethod
+    def parse_nav_date(value: str | None, default: datetime.date) -> datetime.date:
+        """
+        Parse the NAV date published by RapidAPI (e.g. "16-Oct-2026").
+        :param value: Date string from the feed.
+        :param default: Date to use when the feed has no (parseable) date.
+        :return: The NAV date.
+        """
+        if value:
+            for date_format in ("%d-%b-%Y", "%Y-%m-%d", "%d-%m-%Y"):
+                try:
+                    return datetime.datetime.strptime(str(value), date_format).date()
+                except ValueError:
+                    continue
+        return default
+
+    @staticmethod
+    async def _timed_records(records: AsyncIterator[dict], report: IngestionReport) -> AsyncIterator[dict]:
+        """Time how long the pipeline waits on the feed (download + parse) for each record."""
+        iterator = records.__aiter__()
+        while True:
+            with report.timed("parse"):
+                try:
+                    record = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+            report.received += 1
+            yield record
+
+    async def _normalized(self, records: AsyncIterator[dict], report: IngestionReport,
+                          current_time: datetime.datetime) -> AsyncIterator[dict]:
+        """Normalize records, dropping (and counting) the ones that fail validation."""
+        async for record in records:
+            with report.timed("normalize"):
+                row = self.normalize(record, current_time)
+            if row is None:
+                report.rejected += 1
+                continue
+            report.valid += 1
+            yield row
+
+    async def _chunks(self, rows: AsyncIterator[dict]) -> AsyncIterator[list[dict]]:
+        """Group rows into lists of at most batch_size."""
+        batch = []
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
@@ -0,0 +1,110 @@
+import datetime
+import functools
+import time
+from typing import Awaitable, Callable, NamedTuple
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from src.db.pg.handler import SQLHandler
+from src.db.pg.sessions import session_util
+from src.logging import logger
+from src.scheduler.leader import LeaderElection
+
+
+class JobSpec(NamedTuple):
+    job_id: str
+    func: Callable[[], Awaitable]
+    interval_seconds: int  # <= 0 disables the job
+    jitter_seconds: int = 0
+    leader_only: bool = True  # False: runs in every API worker (e.g. per-process caches)
+    max_instances: int = 1
+    coalesce: bool = True
+
+
+class JobRegistry:
+    """
+    Scheduler jobs with their own interval, jitter and overlap protection.
+
+    Every run is timed and its outcome (duration, success/failure, error, result summary) is stored in the
+    scheduler_jobs table. A job counts as failed if it raises or returns a report whose status is "failed".
+    """
+
+    def __init__(self):
+        self.jobs: dict[str, JobSpec] = {}
+
+    def register(self, spec: JobSpec):
+        """
+        Add a job to the registry (replacing any job with the same id).
+
+        :param spec: The job to register.
+        """
+        self.jobs[spec.job_id] = spec
+
+    def schedule(self, scheduler: AsyncIOScheduler, election: LeaderElection, leader_jobs: bool, local_jobs: bool):
+        """
+        Add the enabled jobs to an APScheduler instance.
+
+        :param scheduler: Scheduler to add the jobs to.
+        :param election: Leader election that gates leader-only jobs.
+        :param leader_jobs: Whether this process takes part in running leader-only jobs.
+        :param local_jobs: Whether this process runs the per-process jobs.
+        """
+        for spec in self.jobs.values():
+            if spec.interval_seconds <= 0 or not (leader_jobs if spec.leader_only else local_jobs):
+                continue
+            func = self.recorded(spec.job_id, spec.func, election.instance_id)
+            if spec.leader_only:
+                func = election.leader_only(func)
+            scheduler.add_job(
+                func,
+                "interval",
+                seconds=spec.interval_seconds,
+                jitter=spec.jitter_seconds or None,
+                id=spec.job_id,
+                name=spec.job_id,
+                max_instances=spec.max_instances,
+                coalesce=spec.coalesce,
+                replace_existing=True,
+            )
+            logger.info(f"Scheduled job {spec.job_id} every {spec.interval_seconds}s (jitter {spec.jitter_seconds}s)")
+
+    @staticmethod
+    def recorded(job_id: str, func: Callable[[], Awaitable], instance_id: str):
+        """
+        Wrap a job so the duration and outcome of every run is written to scheduler_jobs.
+
+        :param job_id: Job id the run is recorded under.
+        :param func: Async callable to run.
+        :param instance_id: Id of this process, stored with the run.
+        :return: Async callable returning the job's result (errors are logged and recorded, not raised).
+        """
+        @functools.wraps(func)
+        async def run():
+            started_at = datetime.datetime.now(datetime.timezone.utc)
+            started = time.perf_counter()
+            result, status, error = None, "success", None
+            try:
+                result = await func()
+                if getattr(result, "status", "success") == "failed":
+                    status, error = "failed", getattr(result, "error", None)
+            except Exception as e:
+                status, error = "failed", str(e)
+                logger.error(f"Scheduler job {job_id} failed: {e}")
+            summary = getattr(result, "summary", None)
+            run_record = {
+                "job_id": job_id,
+                "instance_id": instance_id,
+                "last_started_at": started_at,
+                "last_finished_at": datetime.datetime.now(datetime.timezone.utc),
+                "last_duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "last_status": status,
+                "last_error": error,
+                "last_result": summary() if callable(summary) else None if result is None else str(result),
+            }
+            try:
+                async with session_util.async_session() as db:
+                    await SQLHandler(session=db).record_scheduler_job_run(run_record)
+            except Exception as e:
+                logger.error(f"Could not record run of scheduler job {job_id}: {e}")
+            return result
+        return run
@@ -0,0 +1,115 @@
+import datetime
+import functools
+import os
+import socket
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.config import SchedulerConfig
+from src.db.pg.queries import SQLQueries
+from src.db.pg.sessions import session_util
+from src.logging import logger
+
+
+class LeaderElection:
+    """
+    Elects a single scheduler leader across all API workers / scheduler processes.
+
+    The leader holds a session-level Postgres advisory lock on a dedicated connection for as long as it leads.
+    Every heartbeat the leader checks it still holds the lock and followers retry it. When the leader dies its
+    connection closes, Postgres releases the lock, and the next follower heartbeat takes over.
+    Databases without advisory locks (e.g. SQLite) only ever have one process, which is always the leader.
+    """
+
+    def __init__(self, lock_key: int = SchedulerConfig.SCHEDULER_LOCK_KEY):
+        self.lock_key = lock_key
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.connection: AsyncConnection | None = None
+        self.is_leader = False
+        self.leader_since: datetime.datetime | None = None
+        self.last_heartbeat: datetime.datetime | None = None
+
+    async def heartbeat(self) -> bool:
+        """
+        Check that the lock is still held (leader) or try to take it (follower).
+
+        :return: True if this process is the leader after the heartbeat.
+        """
+        try:
+            if self.connection is None:
+                self.connection = await session_util.async_connection()
+            if self.connection.dialect.name != "postgresql":
+                self._set_leader(True)
+            else:
+                held = self.is_leader and (
+                    await self.connection.execute(SQLQueries.holds_advisory_lock(self.lock_key))
+                ).scalar()
+                if not held:
+                    held = (await self.connection.execute(SQLQueries.try_advisory_lock(self.lock_key))).scalar()
+                await self.connection.commit()
+                self._set_leader(bool(held))
+        except Exception as e:
+            logger.error(f"Scheduler heartbeat failed, giving up leadership: {e}")
+            await self._drop_connection()
+            self._set_leader(False)
+        self.last_heartbeat = datetime.datetime.now(datetime.timezone.utc)
+        return self.is_leader
+
+    async def resign(self):
+        """
+        Release the lock (if held) and close the dedicated connection, so another process can take over right away.
+        """
+        if self.connection is not None and self.is_leader and self.connection.dialect.name == "postgresql":
+            try:
+                await self.connection.execute(SQLQueries.advisory_unlock(self.lock_key))
+                await self.connection.commit()
+            except Exception as e:
+                logger.warning(f"Could not release scheduler lock: {e}")
+        await self._drop_connection()
+        self._set_leader(False)
+
+    def leader_only(self, job):
+        """
+        Wrap a scheduler job so it only runs in the leader process.
+
+        :param job: Async callable to guard.
+        :return: Async callable that skips the job (returning None) on followers.
+        """
+        @functools.wraps(job)
+        async def run(*args, **kwargs):
+            if not self.is_leader:
+                logger.debug(f"Skipping {job.__name__}: {self.instance_id} is not the scheduler leader")
+                return None
+            return await job(*args, **kwargs)
+        return run
+
+    def status(self) -> dict:
+        return {
+            "instance_id": self.instance_id,
+            "is_leader": self.is_leader,
+            "leader_since": self.leader_since,
+            "last_heartbeat": self.last_heartbeat,
+        }
+
+    def _set_leader(self, is_leader: bool):
+        if is_leader and not self.is_leader:
+            self.leader_since = datetime.datetime.now(datetime.timezone.utc)
+            logger.info(f"{self.instance_id} is now the scheduler leader")
+        elif not is_leader and self.is_leader:
+            self.leader_since = None
+            logger.warning(f"{self.instance_id} lost scheduler leadership")
+        self.is_leader = is_leader
+
+    async def _drop_connection(self):
+        # Invalidate instead of returning the connection to the pool: a pooled connection would keep the lock.
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        try:
+            await connection.invalidate()
+            await connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing scheduler lock connection: {e}")
+
+
+leader_election = LeaderElection()
@@ -0,0 +1,71 @@
+import datetime
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from src.config import SchedulerConfig
+from src.logging import logger
+from src.scheduler.fund_schema import SchedulerHandler
+from src.scheduler.jobs import JobRegistry, JobSpec
+from src.scheduler.leader import LeaderElection, leader_election
+
+
+def default_job_registry(handler: SchedulerHandler | None = None) -> JobRegistry:
+    """
+    Build the registry of the application's scheduler jobs from SchedulerConfig.
+
+    :param handler: SchedulerHandler whose methods are scheduled.
+    :return: The job registry.
+    """
+    handler = handler or SchedulerHandler()
+    jitter = SchedulerConfig.SCHEDULER_JITTER_SECONDS
+    registry = JobRegistry()
+    registry.register(JobSpec("full_refresh", handler.update_all_portfolios,
+                              SchedulerConfig.SCHEDULER_INTERVAL_SECONDS, jitter))
+    registry.register(JobSpec("nav_refresh", handler.refresh_navs,
+                              SchedulerConfig.SCHEDULER_NAV_INTERVAL_SECONDS, jitter))
+    registry.register(JobSpec("summary_refresh", handler.refresh_summaries,
+                              SchedulerConfig.SCHEDULER_SUMMARY_INTERVAL_SECONDS, jitter))
+    registry.register(JobSpec("cache_warm", handler.refresh_nav_cache,
+                              SchedulerConfig.SCHEDULER_CACHE_INTERVAL_SECONDS,
+                              min(jitter, SchedulerConfig.SCHEDULER_CACHE_INTERVAL_SECONDS // 4), leader_only=False))
+    return registry
+
+
+class SchedulerRunner:
+    """
+    Owns the APScheduler instance of one process.
+
+    Leader-only jobs (syncs, summary refresh) only run in the process holding the scheduler lock; every process
+    taking part in the election runs the heartbeat. Local jobs (keeping this process's NAV cache in step with the
+    database) run in every API worker, whether or not it leads. SCHEDULER_ENABLED=false turns off leader jobs.
+    """
+
+    def __init__(self, leader_jobs: bool = True, local_jobs: bool = True, election: LeaderElection = leader_election,
+                 registry: JobRegistry | None = None):
+        self.leader_jobs = leader_jobs and SchedulerConfig.SCHEDULER_ENABLED
+        self.local_jobs = local_jobs
+        self.election = election
+        self.registry = registry or default_job_registry()
+        self.scheduler = AsyncIOScheduler()
+
+    async def start(self):
+        if self.leader_jobs:
+            self.scheduler.add_job(
+                self.election.heartbeat,
+                "interval",
+                seconds=SchedulerConfig.SCHEDULER_HEARTBEAT_SECONDS,
+                next_run_time=datetime.datetime.now(),
+                id="leader_heartbeat",
+                max_instances=1,
+                coalesce=True,
+            )
+        self.registry.schedule(self.scheduler, self.election, leader_jobs=self.leader_jobs, local_jobs=self.local_jobs)
+        self.scheduler.start()
+        logger.info(f"Scheduler started (leader_jobs={self.leader_jobs}, local_jobs={self.local_jobs})")
+
+    async def shutdown(self):
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        if self.leader_jobs:
+            await self.election.resign()
+        logger.info("Scheduler stopped")
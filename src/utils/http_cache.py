@@ -0,0 +1,82 @@
+import hashlib
+
+from fastapi.responses import Response
+
+from src.utils.serialization import FastJSONResponse
+
+
+class ETagUtil:
+
+    @staticmethod
+    def from_body(body: bytes) -> str:
+        """
+        Build a strong ETag from a response body.
+
+        Args:
+            body (bytes): The serialized response body.
+
+        Returns:
+            str: Quoted ETag value.
+        """
+        return f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+
+    @staticmethod
+    def matches(if_none_match: str | None, etag: str) -> bool:
+        """
+        Check an If-None-Match request header against the current ETag.
+
+        Args:
+            if_none_match (str | None): Raw If-None-Match header value.
+            etag (str): Current ETag of the resource.
+
+        Returns:
+            bool: True if the client's copy is still current.
+        """
+        if not if_none_match:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+class ConditionalGet:
+    """
+    Validators (ETag, Cache-Control) computed for a request before its handler runs.
+    """
+
+    def __init__(self, etag: str | None, cache_control: str):
+        self.etag = etag
+        self.cache_control = cache_control
+
+    @property
+    def headers(self) -> dict:
+        headers = {"Cache-Control": self.cache_control}
+        if self.etag:
+            headers["ETag"] = self.etag
+        return headers
+
+    def not_modified(self, if_none_match: str | None) -> bool:
+        """
+        Check whether the client's copy is current.
+
+        Args:
+            if_none_match (str | None): Raw If-None-Match header value.
+
+        Returns:
+            bool: True if a 304 can be sent.
+        """
+        return bool(self.etag) and ETagUtil.matches(if_none_match, self.etag)
+
+    def apply(self, content):
+        """
+        Attach the validators to a handler's result.
+
+        Args:
+            content: A Response, or content to render as JSON.
+
+        Returns:
+            Response: The response carrying ETag and Cache-Control.
+        """
+        if not isinstance(content, Response):
+            content = FastJSONResponse(content)
+        content.headers.update(self.headers)
+        return content
@@ -1,3 +1,4 @@
+from src.cache.tokens import token_cache
 from src.config import JWTConfig
 from datetime import datetime, timedelta, timezone
 import jwt
@@ -5,6 +6,26 @@ import jwt
 
 class JWTUtil:
 
+    @staticmethod
+    def verification_keys() -> dict[str, str]:
+        """
+        Keys accepted when verifying a token, by kid: the current signing key and the previous keys
+        that are being rotated out.
+
+        Returns:
+            dict: kid -> secret.
+        """
+        keys = dict(key.split(":", 1) for key in filter(None, JWTConfig.JWT_PREVIOUS_KEYS.split(",")))
+        keys[JWTConfig.JWT_KEY_ID] = JWTConfig.JWT_SECRET_KEY
+        return keys
+
+    @staticmethod
+    def _encode(data: dict, token_type: str, expires_in: timedelta) -> str:
+        to_encode = data.copy()
+        to_encode.update({"exp": datetime.now(timezone.utc) + expires_in, "type": token_type})
+        return jwt.encode(to_encode, JWTConfig.JWT_SECRET_KEY, algorithm=JWTConfig.JWT_ALGORITHM,
+                          headers={"kid": JWTConfig.JWT_KEY_ID})
+
     @staticmethod
     def create_access_token(data: dict) -> str:
         """
@@ -16,7 +37,47 @@ class JWTUtil:
         Returns:
             str: The generated JWT access token.
         """
-        to_encode = data.copy()
-        expire = datetime.now(timezone.utc) + timedelta(minutes=JWTConfig.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire})
-        return jwt.encode(to_encode, JWTConfig.JWT_SECRET_KEY, algorithm=JWTConfig.JWT_ALGORITHM)
+        return JWTUtil._encode(data, "access", timedelta(minutes=JWTConfig.JWT_ACCESS_TOKEN_EXPIRE_MINUTES))
+
+    @staticmethod
+    def create_refresh_token(data: dict) -> str | None:
+        """
+        Create a long-lived JWT refresh token, which can only be exchanged for new tokens at /auth/refresh.
+
+        Args:
+            data (dict): The data to include in the token.
+
+        Returns:
+            str | None: The generated JWT refresh token, or None when refresh tokens are disabled.
+        """
+        if JWTConfig.JWT_REFRESH_TOKEN_EXPIRE_MINUTES <= 0:
+            return None
+        return JWTUtil._encode(data, "refresh", timedelta(minutes=JWTConfig.JWT_REFRESH_TOKEN_EXPIRE_MINUTES))
+
+    @staticmethod
+    def decode_token(token: str, token_type: str = "access") -> dict:
+        """
+        Verify a JWT with the key named by its kid header and return its claims.
+        Verified tokens are cached until they expire, so repeated requests with the same token skip verification.
+
+        Args:
+            token (str): The encoded token.
+            token_type (str): Expected "type" claim; tokens issued without one count as access tokens.
+
+        Returns:
+            dict: The token's claims.
+
+        Raises:
+            jwt.PyJWTError: If the token is invalid, expired, signed with an unknown key or of another type.
+        """
+        claims = token_cache.get(token)
+        if claims is None:
+            kid = jwt.get_unverified_header(token).get("kid", JWTConfig.JWT_KEY_ID)
+            key = JWTUtil.verification_keys().get(kid)
+            if key is None:
+                raise jwt.InvalidKeyError(f"Unknown signing key: {kid}")
+            claims = jwt.decode(token, key, algorithms=[JWTConfig.JWT_ALGORITHM])
+            token_cache.put(token, claims)
+        if claims.get("type", "access") != token_type:
+            raise jwt.InvalidTokenError(f"Expected a {token_type} token")
+        return claims
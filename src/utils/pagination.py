@@ -0,0 +1,42 @@
+import base64
+import json
+
+from fastapi import status
+
+from src.exceptions import MutualFundException
+
+
+class CursorUtil:
+
+    @staticmethod
+    def encode(*values) -> str:
+        """
+        Encode the sort-key values of the last row of a page into an opaque cursor.
+
+        Args:
+            *values: Sort-key values, in ORDER BY order.
+
+        Returns:
+            str: URL-safe cursor string.
+        """
+        return base64.urlsafe_b64encode(json.dumps(list(values), default=str).encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode(cursor: str, size: int) -> list:
+        """
+        Decode a cursor produced by ``encode``.
+
+        Args:
+            cursor (str): The cursor received from the client.
+            size (int): Number of sort-key values the cursor must contain.
+
+        Returns:
+            list: The sort-key values.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        except (ValueError, TypeError):
+            values = None
+        if not isinstance(values, list) or len(values) != size:
+            raise MutualFundException(message="Invalid pagination cursor", code=status.HTTP_400_BAD_REQUEST)
+        return values
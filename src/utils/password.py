@@ -1,12 +1,106 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.config import AuthConfig
+from src.exceptions import MutualFundException
+
+
+def build_context(rounds: int = AuthConfig.PASSWORD_BCRYPT_ROUNDS) -> CryptContext:
+    """
+    Build the bcrypt context. Hashes made with any other cost factor are reported as needing an update,
+    so they are upgraded (or downgraded) on the next successful login.
+
+    :param rounds: bcrypt cost factor (log2 of the number of rounds).
+    """
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=rounds,
+                        bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds)
+
+
+pwd_context = build_context()
+
+
+# Module-level so a process pool can pickle them by reference.
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+def _verify_and_update(password: str, hashed: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded worker pool so a burst of logins cannot stall the event loop.
+
+    At most ``workers`` hashes run at once and ``max_pending`` more may wait for a worker; beyond that,
+    requests are turned away with 429 instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int = AuthConfig.PASSWORD_HASH_WORKERS,
+                 max_pending: int = AuthConfig.PASSWORD_HASH_MAX_PENDING,
+                 executor: str = AuthConfig.PASSWORD_HASH_EXECUTOR):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor_kind = executor
+        self.executor: Executor | None = None
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _executor(self) -> Executor:
+        if self.executor is None:
+            if self.executor_kind == "process":
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self.executor
+
+    async def run(self, func, *args):
+        """
+        Run a hashing function on the pool.
+
+        :param func: Module-level function to call.
+        :param args: Its arguments.
+        :return: The function's result.
+        """
+        if self.in_flight >= self.workers + self.max_pending:
+            self.rejected += 1
+            raise MutualFundException(message="Too many authentication requests, please retry shortly.",
+                                      code=status.HTTP_429_TOO_MANY_REQUESTS)
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+password_hasher = PasswordHasher()
+
 
 class PasswordHashingUtil:
     @staticmethod
-    def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
+    async def hash_password(password: str) -> str:
+        return await password_hasher.run(_hash, password)
+
+    @staticmethod
+    async def verify_password(provided_password: str, db_password: str) -> bool:
+        return await password_hasher.run(_verify, provided_password, db_password)
 
     @staticmethod
-    def verify_password(provided_password: str, db_password: str) -> bool:
-        return pwd_context.verify(provided_password, db_password)
+    async def verify_and_update(provided_password: str, db_password: str) -> tuple[bool, str | None]:
+        """
+        Verify a password and, if its hash was made with another cost factor, rehash it.
+        :return: Whether the password matches, and the new hash to store (None if the stored one is current).
+        """
+        return await password_hasher.run(_verify_and_update, provided_password, db_password)
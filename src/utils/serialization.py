@@ -0,0 +1,76 @@
+import decimal
+from collections.abc import Mapping
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+
+from src.core.schemas.responses import SuccessResponseModel
+
+
+class JSONUtil:
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    @staticmethod
+    def default(obj):
+        """
+        Convert the values orjson does not handle natively. UUID, datetime, date and dataclasses are native.
+
+        Args:
+            obj: The value to convert.
+
+        Returns:
+            A value orjson can serialize.
+        """
+        if isinstance(obj, decimal.Decimal):
+            # Same as jsonable_encoder: integral decimals become ints, the rest floats
+            return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+        if isinstance(obj, BaseModel):
+            # Shallow: nested values are serialized by orjson itself, without a model_dump copy
+            return {name: getattr(obj, name) for name in type(obj).model_fields}
+        if isinstance(obj, Row):
+            return dict(obj._mapping)
+        if isinstance(obj, Mapping):
+            return dict(obj)
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    @staticmethod
+    def dumps(content) -> bytes:
+        """
+        Serialize content (including SQLAlchemy rows/mappings, UUIDs, datetimes and Decimals) straight to JSON bytes.
+
+        Args:
+            content: The value to serialize.
+
+        Returns:
+            bytes: The JSON document.
+        """
+        return orjson.dumps(content, default=JSONUtil.default, option=JSONUtil.OPTIONS)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered with orjson. Returning one from a handler also skips FastAPI's jsonable_encoder pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return JSONUtil.dumps(content)
+
+    @classmethod
+    def success(cls, message: str, data=None, **fields) -> "FastJSONResponse":
+        """
+        Build a SuccessResponseModel-shaped response without validating or copying data.
+
+        Args:
+            message (str): Response message.
+            data: Response data (rows, dicts or lists), serialized as is.
+            **fields: Other SuccessResponseModel fields, e.g. nav_epoch.
+
+        Returns:
+            FastJSONResponse: The response.
+        """
+        return cls(SuccessResponseModel.model_construct(message=message, data=data, **fields))
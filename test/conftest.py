@@ -0,0 +1,41 @@
+import os
+
+from dotenv import load_dotenv
+
+# src.config validates these settings on import; values from .env or the environment take precedence
+load_dotenv()
+for name, value in {"JWT_SECRET_KEY": "test-jwt-secret-key-of-at-least-32-bytes", "RAPIDAPI_KEY": "test",
+                    "SQL_URL": "postgresql://localhost:5432"}.items():
+    os.environ.setdefault(name, value)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, StaticPool  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from main import app  # noqa: E402
+from src.db.pg.sessions import Base, get_db  # noqa: E402
+
+
+# Test database setup
+SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+Base.metadata.create_all(bind=engine, checkfirst=True)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+@pytest.fixture
+def client():
+    return TestClient(app)
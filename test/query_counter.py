@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """
+    Counts the SQL statements an engine executes while active.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(engine, max_queries: int):
+    """
+    Fail the test if the block issues more than ``max_queries`` SQL statements (catches N+1 regressions).
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+    assert counter.count <= max_queries, (
+        f"Expected at most {max_queries} queries, got {counter.count}:\n" + "\n".join(counter.statements)
+    )
@@ -0,0 +1,39 @@
+import datetime
+from collections import namedtuple
+
+import numpy as np
+
+from src.analytics.returns import PortfolioAnalytics, xirr
+
+CashFlow = namedtuple("CashFlow", "scheme_id scheme_code scheme_name amount units investment_date nav nav_date")
+
+
+def test_xirr_solves_many_series_at_once():
+    rates = xirr(
+        amounts=np.array([-1000.0, 1100.0, -1000.0, -1000.0, 2152.5, -500.0, -500.0]),
+        days=np.array([0, 365, 0, 365, 730, 0, 365]),
+        groups=np.array([0, 0, 1, 1, 1, 2, 2]),
+        n_groups=3,
+    )
+    assert np.allclose(rates[:2], [0.10, 0.05], atol=1e-6)
+    assert np.isnan(rates[2])  # only outflows: no rate solves it
+
+
+def test_sip_analytics_match_nav_growth():
+    # 10 years of monthly SIPs into a scheme whose NAV grows 1% every 30 days
+    start, valued_on = datetime.date(2015, 1, 1), datetime.date(2015, 1, 1) + datetime.timedelta(days=30 * 120)
+    final_nav = 10 * 1.01 ** 120
+    rows = [
+        CashFlow("s1", "SIP1", "SIP Scheme", 1000.0, 1000.0 / (10 * 1.01 ** month),
+                 datetime.datetime.combine(start + datetime.timedelta(days=30 * month), datetime.time()),
+                 final_nav, valued_on)
+        for month in range(120)
+    ]
+
+    result = PortfolioAnalytics.compute(rows)
+
+    expected_pct = (1.01 ** (365 / 30) - 1) * 100
+    assert abs(result["totals"]["xirr_pct"] - expected_pct) < 0.01
+    assert result["totals"]["instalments"] == 120
+    assert result["schemes"][0]["xirr_pct"] == result["totals"]["xirr_pct"]
+    assert result["totals"]["invested"] == 120000.0
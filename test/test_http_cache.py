@@ -0,0 +1,44 @@
+import asyncio
+import datetime
+
+from sqlalchemy import select
+
+from src.db.pg.handler import SQLHandler
+from src.db.pg.sql_schemas import Users
+from test.conftest import TestingSessionLocal
+
+
+def _auth_headers(client):
+    user = {"email": "etag@example.com", "first_name": "E", "last_name": "Tag", "password": "strongpassword123"}
+    client.post("/api/auth/register", json=user)
+    response = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    return {"Authorization": f"Bearer {response.headers['Authorization']}"}
+
+
+def test_portfolio_summary_conditional_get(client):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with TestingSessionLocal() as session:
+        sql_handler = SQLHandler(session=session)
+        mapping = asyncio.run(sql_handler.bulk_upsert_fund_schemes([
+            {"scheme_code": "ETAG1", "scheme_name": "ETag Scheme", "fund_family": "ETag Fund", "fund_type": "Open",
+             "updated_at": now}
+        ]))
+        asyncio.run(sql_handler.bulk_upsert_nav_history([
+            {"scheme_id": mapping["ETAG1"], "nav": 10.0, "nav_date": now.date(), "updated_at": now}
+        ]))
+
+    headers = _auth_headers(client)
+    response = client.get("/api/portfolio/summary", headers=headers)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200 and response.headers["Cache-Control"] == "private, no-cache"
+
+    response = client.get("/api/portfolio/summary", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304 and response.headers["ETag"] == etag
+
+    # An investment write through another worker bumps the version in the database; the cached principal of this
+    # worker is not involved, so the old ETag stops matching at once
+    with TestingSessionLocal() as session:
+        user_id = session.scalar(select(Users.id).where(Users.email == "etag@example.com"))
+        asyncio.run(SQLHandler(session=session).bump_investments_version(user_id))
+    response = client.get("/api/portfolio/summary", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["ETag"] != etag
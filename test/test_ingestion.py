@@ -0,0 +1,79 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from src.db.pg.handler import SQLHandler
+from src.db.pg.sql_schemas import FundScheme, LatestNav, NavHistory
+from src.scheduler.ingestion import FundIngestionPipeline
+from test.conftest import TestingSessionLocal
+
+
+def _feed(records):
+    async def iterator():
+        for record in records:
+            yield record
+    return iterator()
+
+def test_pipeline_batches_validates_and_dedupes():
+    records = [
+        {"Scheme_Code": 9000 + i, "Scheme_Name": f"Ingest {i}", "Mutual_Fund_Family": "Ingest Fund",
+         "Scheme_Type": "Open Ended", "Net_Asset_Value": 10 + i, "Date": "15-Oct-2026"}
+        for i in range(7)
+    ]
+    records.append({"Scheme_Code": 9000, "Scheme_Name": "Ingest 0", "Mutual_Fund_Family": "Ingest Fund",
+                    "Net_Asset_Value": "12.5", "Date": "16-Oct-2026"})  # later NAV for the same scheme
+    records.append({"Scheme_Code": 9999, "Scheme_Name": "Broken", "Mutual_Fund_Family": "Ingest Fund",
+                    "Net_Asset_Value": "N.A."})
+
+    with TestingSessionLocal() as session:
+        pipeline = FundIngestionPipeline(SQLHandler(session=session), batch_size=3)
+        report = asyncio.run(pipeline.run(_feed(records)))
+
+        assert (report.received, report.valid, report.rejected, report.batches) == (9, 8, 1, 3)
+        assert {"parse", "normalize", "upsert_schemes", "upsert_navs", "commit"} <= report.timings_ms.keys()
+        assert session.scalar(select(func.count()).select_from(FundScheme).where(
+            FundScheme.fund_family == "Ingest Fund")) == 7
+        scheme_id = session.scalar(select(FundScheme.id).where(FundScheme.scheme_code == "9000"))
+        assert session.scalar(select(func.count()).select_from(NavHistory).where(NavHistory.scheme_id == scheme_id)) == 2
+        assert session.scalar(select(LatestNav.nav).where(LatestNav.scheme_id == scheme_id)) == 12.5
+
+
+def test_pipeline_skips_unchanged_schemes():
+    records = [
+        {"Scheme_Code": 9100 + i, "Scheme_Name": f"Delta {i}", "Mutual_Fund_Family": "Delta Fund",
+         "Scheme_Type": "Open Ended", "Net_Asset_Value": 20 + i, "Date": "15-Oct-2026"}
+        for i in range(4)
+    ]
+
+    with TestingSessionLocal() as session:
+        pipeline = FundIngestionPipeline(SQLHandler(session=session), batch_size=3)
+        first = asyncio.run(pipeline.run(_feed(records)))
+        assert (first.inserted, first.updated, first.unchanged) == (4, 0, 0)
+
+        scheme_id = session.scalar(select(FundScheme.id).where(FundScheme.scheme_code == "9101"))
+        updated_at = session.scalar(select(FundScheme.updated_at).where(FundScheme.id == scheme_id))
+        records[2] = {**records[2], "Net_Asset_Value": 30, "Date": "16-Oct-2026"}
+        second = asyncio.run(pipeline.run(_feed(records)))
+
+        assert (second.inserted, second.updated, second.unchanged) == (0, 1, 3)
+        assert (second.schemes_upserted, second.navs_upserted) == (1, 1)
+        assert session.scalar(select(FundScheme.updated_at).where(FundScheme.id == scheme_id)) == updated_at
+
+
+def test_nav_only_run_keeps_fingerprints_current():
+    records = [
+        {"Scheme_Code": 9200 + i, "Scheme_Name": f"NavOnly {i}", "Mutual_Fund_Family": "NavOnly Fund",
+         "Scheme_Type": "Open Ended", "Net_Asset_Value": 40 + i, "Date": "15-Oct-2026"}
+        for i in range(3)
+    ]
+
+    with TestingSessionLocal() as session:
+        asyncio.run(FundIngestionPipeline(SQLHandler(session=session)).run(_feed(records)))
+        records = [{**record, "Net_Asset_Value": record["Net_Asset_Value"] + 1, "Date": "16-Oct-2026"}
+                   for record in records]
+        nav_only = asyncio.run(FundIngestionPipeline(SQLHandler(session=session), nav_only=True).run(_feed(records)))
+        assert (nav_only.updated, nav_only.navs_upserted) == (3, 3)
+
+        # The full refresh that follows sees the NAVs already written and leaves every scheme alone
+        full = asyncio.run(FundIngestionPipeline(SQLHandler(session=session)).run(_feed(records)))
+        assert (full.updated, full.unchanged, full.schemes_upserted) == (0, 3, 0)
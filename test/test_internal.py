@@ -0,0 +1,16 @@
+from src.config import ModuleConfig
+
+
+def test_internal_endpoints_need_the_internal_token(client, monkeypatch):
+    user = {"email": "internal@example.com", "first_name": "In", "last_name": "Ternal", "password": "strongpassword123"}
+    client.post("/api/auth/register", json=user)
+    token = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]}).headers["Authorization"]
+    user_headers = {"Authorization": f"Bearer {token}"}
+
+    monkeypatch.setattr(ModuleConfig, "INTERNAL_API_TOKEN", "")
+    assert client.get("/api/internal/cache-stats", headers=user_headers).status_code == 404
+
+    monkeypatch.setattr(ModuleConfig, "INTERNAL_API_TOKEN", "ops-secret")
+    assert client.get("/api/internal/cache-stats", headers=user_headers).status_code == 403
+    assert client.get("/api/internal/cache-stats", headers={"X-Internal-Token": "wrong"}).status_code == 403
+    assert client.get("/api/internal/cache-stats", headers={"X-Internal-Token": "ops-secret"}).status_code == 200
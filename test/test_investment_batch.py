@@ -0,0 +1,60 @@
+import asyncio
+import datetime
+import uuid
+
+from src.db.pg.handler import SQLHandler
+from test.query_counter import assert_max_queries
+from test.conftest import engine, TestingSessionLocal
+
+
+def _auth_headers(client):
+    user = {"email": "basket@example.com", "first_name": "Bas", "last_name": "Ket", "password": "strongpassword123"}
+    client.post("/api/auth/register", json=user)
+    response = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    return {"Authorization": f"Bearer {response.headers['Authorization']}"}
+
+
+def test_basket_order_is_one_transaction_with_per_item_errors(client):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with TestingSessionLocal() as session:
+        sql_handler = SQLHandler(session=session)
+        mapping = asyncio.run(sql_handler.bulk_upsert_fund_schemes([
+            {"scheme_code": code, "scheme_name": code, "fund_family": "Basket Fund", "fund_type": "Open",
+             "updated_at": now} for code in ("BK1", "BK2", "BK_NO_NAV")
+        ]))
+        asyncio.run(sql_handler.bulk_upsert_nav_history([
+            {"scheme_id": mapping["BK1"], "nav": 10.0, "nav_date": now.date(), "updated_at": now},
+            {"scheme_id": mapping["BK2"], "nav": 25.0, "nav_date": now.date(), "updated_at": now},
+        ]))
+    headers = _auth_headers(client)
+    client.get("/api/me", headers=headers)  # the user lookup is cached from here on
+
+    order = {"investments": [
+        {"scheme_id": str(mapping["BK1"]), "amount": 1000},
+        {"scheme_id": "not-a-uuid", "amount": 1000},
+        {"scheme_id": str(mapping["BK2"]), "amount": 500},
+        {"scheme_id": str(uuid.uuid4()), "amount": 1000},
+        {"scheme_id": str(mapping["BK_NO_NAV"]), "amount": 1000},
+        {"scheme_id": str(mapping["BK1"]), "amount": -5},
+    ]}
+    # scheme validation + portfolio lookup + one multi-row insert + version bump + valuation refresh (2)
+    with assert_max_queries(engine, 6):
+        response = client.post("/api/investments/batch", json=order, headers=headers)
+
+    data = response.json()["data"]
+    assert response.status_code == 200
+    assert [(item["index"], item["units"]) for item in data["created"]] == [(0, 100.0), (2, 20.0)]
+    assert [(error["index"], error["message"]) for error in data["errors"]] == [
+        (1, "Invalid scheme id"), (3, "Fund scheme not found"), (4, "No NAV available for the scheme"),
+        (5, "Amount must be positive"),
+    ]
+
+    summary = client.get("/api/portfolio/summary", headers=headers).json()["data"]
+    assert (summary["total_amount"], summary["total_investments"]) == (1500.0, 2)
+
+    other = {"portfolio_id": str(uuid.uuid4()), "investments": [{"scheme_id": str(mapping["BK1"]), "amount": 100}]}
+    assert client.post("/api/investments/batch", json=other, headers=headers).status_code == 404
+    assert client.post("/api/investment", json={"scheme_id": str(mapping["BK1"]), "amount": 100,
+                                                 "portfolio_id": other["portfolio_id"]}, headers=headers).status_code == 404
+    assert client.post("/api/investment", json={"scheme_id": "not-a-uuid", "amount": 100},
+                       headers=headers).status_code == 422
@@ -0,0 +1,45 @@
+import jwt
+import pytest
+
+from src.cache.tokens import token_cache
+from src.config import JWTConfig
+from src.utils.jwt_util import JWTUtil
+
+
+def test_tokens_verify_across_key_rotation(monkeypatch):
+    old_token = JWTUtil.create_access_token({"user_id": "u-1"})
+    assert jwt.get_unverified_header(old_token)["kid"] == JWTConfig.JWT_KEY_ID
+
+    # new signing key; the old one stays accepted while its tokens expire
+    monkeypatch.setattr(JWTConfig, "JWT_PREVIOUS_KEYS", f"{JWTConfig.JWT_KEY_ID}:{JWTConfig.JWT_SECRET_KEY}")
+    monkeypatch.setattr(JWTConfig, "JWT_KEY_ID", "rotated")
+    monkeypatch.setattr(JWTConfig, "JWT_SECRET_KEY", "rotated-secret-key-of-at-least-32-bytes")
+    token_cache.clear()
+    new_token = JWTUtil.create_access_token({"user_id": "u-2"})
+    assert JWTUtil.decode_token(old_token)["user_id"] == "u-1"
+    assert JWTUtil.decode_token(new_token)["user_id"] == "u-2"
+
+    hits = token_cache.hits
+    JWTUtil.decode_token(new_token)
+    assert token_cache.hits == hits + 1
+
+    monkeypatch.setattr(JWTConfig, "JWT_PREVIOUS_KEYS", "")
+    token_cache.clear()
+    with pytest.raises(jwt.PyJWTError):
+        JWTUtil.decode_token(old_token)
+    with pytest.raises(jwt.PyJWTError):
+        JWTUtil.decode_token(JWTUtil.create_refresh_token({"user_id": "u-2"}))
+
+def test_refresh_issues_new_tokens(client):
+    user = {"email": "refresh@example.com", "first_name": "Re", "last_name": "Fresh", "password": "strongpassword123"}
+    client.post("/api/auth/register", json=user)
+    login = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    refresh_token = login.headers["X-Refresh-Token"]
+
+    # a refresh token is not an access token
+    assert client.get("/api/me", headers={"Authorization": f"Bearer {refresh_token}"}).status_code == 401
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    assert client.get("/api/me", headers={"Authorization": f"Bearer {response.headers['Authorization']}"}).status_code == 200
+    assert client.post("/api/auth/refresh", json={"refresh_token": response.headers["Authorization"]}).status_code == 401
@@ -0,0 +1,46 @@
+import asyncio
+import datetime
+
+from src.db.pg.handler import SQLHandler
+from test.query_counter import assert_max_queries
+from test.conftest import engine, TestingSessionLocal
+
+
+def _auth_headers(client):
+    user = {"email": "nav.batch@example.com", "first_name": "Nav", "last_name": "Batch", "password": "strongpassword123"}
+    client.post("/api/auth/register", json=user)
+    response = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    return {"Authorization": f"Bearer {response.headers['Authorization']}"}
+
+
+def test_nav_batch_is_one_query_and_columnar(client):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    codes = [f"NB{i}" for i in range(50)]
+    with TestingSessionLocal() as session:
+        sql_handler = SQLHandler(session=session)
+        mapping = asyncio.run(sql_handler.bulk_upsert_fund_schemes([
+            {"scheme_code": code, "scheme_name": code, "fund_family": "Nav Batch Fund", "fund_type": "Open",
+             "updated_at": now} for code in codes
+        ]))
+        asyncio.run(sql_handler.bulk_upsert_nav_history([
+            {"scheme_id": mapping[code], "nav": 10.0 + i, "nav_date": now.date(), "updated_at": now}
+            for i, code in enumerate(codes)
+        ]))
+    headers = _auth_headers(client)
+    client.get("/api/me", headers=headers)  # the user lookup is cached from here on
+
+    # one NAV query for all 50 schemes, not one per scheme
+    with assert_max_queries(engine, 1):
+        response = client.post("/api/nav/batch", json={"scheme_codes": ["NB3", "UNKNOWN", *codes, "NB3"]}, headers=headers)
+
+    data = response.json()["data"]
+    assert response.status_code == 200
+    assert data["codes"] == ["NB3", *(code for code in codes if code != "NB3")]
+    assert data["navs"][:2] == [13.0, 10.0]
+    assert data["dates"][0] == now.date().isoformat()
+    assert data["missing"] == ["UNKNOWN"]
+
+    response = client.get("/api/nav/NB7", headers=headers)
+    assert (response.json()["data"]["codes"], response.json()["data"]["navs"]) == (["NB7"], [17.0])
+    assert client.get("/api/nav/UNKNOWN", headers=headers).status_code == 404
+    assert client.post("/api/nav/batch", json={"scheme_codes": []}, headers=headers).status_code == 422
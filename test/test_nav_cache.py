@@ -0,0 +1,24 @@
+import datetime
+from types import SimpleNamespace
+
+from src.cache.nav import NavCache
+
+
+def _row(scheme_id, scheme_code, nav, updated_at):
+    return SimpleNamespace(scheme_id=scheme_id, scheme_code=scheme_code, nav=nav,
+                           nav_date=updated_at.date(), updated_at=updated_at)
+
+def test_nav_cache_swap_and_counters():
+    cache = NavCache()
+    first = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    cache.swap([_row("id-1", "100", 10.5, first)])
+
+    assert cache.get_by_code("100").nav == 10.5
+    assert cache.get_by_id("id-1").scheme_code == "100"
+    assert cache.get_by_code("999") is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    old_epoch = cache.epoch
+    cache.swap([_row("id-1", "100", 11.0, first + datetime.timedelta(hours=1))])
+    assert cache.epoch > old_epoch
+    assert cache.get_by_code("100").nav == 11.0
@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+from src.exceptions import MutualFundException
+from src.utils import password
+from src.utils.password import PasswordHasher, PasswordHashingUtil, build_context
+
+
+def test_hash_is_upgraded_when_cost_factor_changes(monkeypatch):
+    monkeypatch.setattr(password, "pwd_context", build_context(rounds=4))
+    hashed = asyncio.run(PasswordHashingUtil.hash_password("strongpassword123"))
+    assert asyncio.run(PasswordHashingUtil.verify_and_update("strongpassword123", hashed)) == (True, None)
+    assert asyncio.run(PasswordHashingUtil.verify_and_update("wrongpassword", hashed)) == (False, None)
+
+    monkeypatch.setattr(password, "pwd_context", build_context(rounds=5))
+    verified, new_hash = asyncio.run(PasswordHashingUtil.verify_and_update("strongpassword123", hashed))
+    assert verified and new_hash.startswith("$2b$05$")
+
+def test_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(workers=1, max_pending=1, executor="thread")
+
+    async def burst():
+        return await asyncio.gather(*(hasher.run(time.sleep, 0.05) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(burst())
+    rejected = [result for result in results if isinstance(result, MutualFundException)]
+    assert len(rejected) == 1 and rejected[0].code == 429
+    assert (hasher.rejected, hasher.in_flight) == (1, 0)
+    hasher.shutdown()
@@ -0,0 +1,62 @@
+import asyncio
+import datetime
+
+from sqlalchemy import select
+
+from src.db.pg.handler import SQLHandler
+from src.db.pg.sql_schemas import Investment, Portfolio, Users
+from test.conftest import TestingSessionLocal
+
+
+def _auth_headers(client):
+    user = {"email": "history@example.com", "first_name": "His", "last_name": "Tory", "password": "strongpassword123"}
+    client.post("/api/auth/register", json=user)
+    response = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    return {"Authorization": f"Bearer {response.headers['Authorization']}"}
+
+
+def test_history_values_each_day_at_that_days_nav(client):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    headers = _auth_headers(client)
+    with TestingSessionLocal() as session:
+        sql_handler = SQLHandler(session=session)
+        scheme_id = asyncio.run(sql_handler.bulk_upsert_fund_schemes([
+            {"scheme_code": "HIST1", "scheme_name": "History Scheme", "fund_family": "History Fund",
+             "fund_type": "Open", "updated_at": now}
+        ]))["HIST1"]
+        asyncio.run(sql_handler.bulk_upsert_nav_history([
+            {"scheme_id": scheme_id, "nav": nav, "nav_date": nav_date, "updated_at": now}
+            for nav, nav_date in ((10.0, datetime.date(2025, 1, 1)), (12.0, datetime.date(2025, 1, 15)),
+                                  (15.0, datetime.date(2025, 2, 10)))
+        ]))
+        user_id = session.scalar(select(Users.id).where(Users.email == "history@example.com"))
+        portfolio = Portfolio(user_id=user_id, name="Default")
+        session.add(portfolio)
+        session.flush()
+        session.add_all([
+            Investment(portfolio_id=portfolio.id, scheme_id=scheme_id, amount=1000, units=100, purchased_nav=10,
+                       investment_date=datetime.datetime(2025, 1, 1, 10, tzinfo=datetime.timezone.utc)),
+            Investment(portfolio_id=portfolio.id, scheme_id=scheme_id, amount=600, units=50, purchased_nav=12,
+                       investment_date=datetime.datetime(2025, 2, 1, 10, tzinfo=datetime.timezone.utc)),
+        ])
+        session.commit()
+        # what the backfill does for every day of the range
+        for offset in range(59):
+            asyncio.run(sql_handler.refresh_portfolio_daily_values(datetime.date(2025, 1, 1) + datetime.timedelta(days=offset)))
+
+    daily = client.get("/api/portfolio/history?from=2025-01-01&to=2025-02-28", headers=headers).json()["data"]
+    points = {point["date"]: (point["total_amount"], point["total_value"]) for point in daily["points"]}
+    assert len(points) == 59
+    assert points["2025-01-01"] == (1000.0, 1000.0)
+    assert points["2025-01-15"] == (1000.0, 1200.0)
+    assert points["2025-02-01"] == (1600.0, 1800.0)
+    assert points["2025-02-28"] == (1600.0, 2250.0)
+
+    monthly = client.get("/api/portfolio/history?from=2025-01-01&to=2025-02-28&granularity=monthly",
+                         headers=headers).json()["data"]
+    assert [(point["date"], point["total_value"]) for point in monthly["points"]] == [
+        ("2025-01-31", 1200.0), ("2025-02-28", 2250.0)
+    ]
+
+    response = client.get("/api/portfolio/history?from=2025-03-01&to=2025-02-01", headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,100 @@
+import asyncio
+import datetime
+
+from sqlalchemy import select, update
+
+from src.core.schemas.scheduler import IngestionReport
+from src.db.pg.handler import SQLHandler
+from src.db.pg.sql_schemas import Investment, LatestNav, Portfolio, PortfolioSnapshot, Users
+from src.scheduler.fund_schema import SchedulerHandler
+from test.conftest import TestingSessionLocal
+
+
+def _auth_headers(client):
+    user = {"email": "valuation@example.com", "first_name": "Val", "last_name": "Uation", "password": "strongpassword123"}
+    client.post("/api/auth/register", json=user)
+    response = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    return {"Authorization": f"Bearer {response.headers['Authorization']}"}
+
+
+def test_summary_served_from_valuation_table(client):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with TestingSessionLocal() as session:
+        sql_handler = SQLHandler(session=session)
+        mapping = asyncio.run(sql_handler.bulk_upsert_fund_schemes([
+            {"scheme_code": "VAL1", "scheme_name": "Valuation Scheme", "fund_family": "Valuation Fund",
+             "fund_type": "Open", "updated_at": now}
+        ]))
+        scheme_id = mapping["VAL1"]
+        asyncio.run(sql_handler.bulk_upsert_nav_history([
+            {"scheme_id": scheme_id, "nav": 10.0, "nav_date": now.date(), "updated_at": now}
+        ]))
+
+    headers = _auth_headers(client)
+    with TestingSessionLocal() as session:
+        user_id = session.scalar(select(Users.id).where(Users.email == "valuation@example.com"))
+        portfolio = Portfolio(user_id=user_id, name="Default")
+        session.add(portfolio)
+        session.flush()
+        session.add(Investment(portfolio_id=portfolio.id, scheme_id=scheme_id, amount=1000, units=100, purchased_nav=10))
+        session.commit()
+        # what create_investment does after inserting
+        asyncio.run(SQLHandler(session=session).refresh_portfolio_valuations(user_ids=[user_id]))
+
+    summary = client.get("/api/portfolio/summary", headers=headers).json()["data"]
+    assert (summary["total_amount"], summary["total_value"], summary["total_investments"]) == (1000.0, 1000.0, 1)
+
+    # A NAV sync that changed the scheme re-values its holders
+    with TestingSessionLocal() as session:
+        session.execute(update(LatestNav).where(LatestNav.scheme_id == scheme_id).values(nav=12.5))
+        session.commit()
+        asyncio.run(SQLHandler(session=session).refresh_portfolio_valuations(scheme_ids={scheme_id}))
+
+    summary = client.get("/api/portfolio/summary", headers=headers).json()["data"]
+    assert (summary["total_value"], summary["gain_loss"], summary["returns_pct"]) == (1250.0, 250.0, 25.0)
+
+    # A user who no longer holds anything loses the stored row
+    with TestingSessionLocal() as session:
+        session.execute(update(Investment).where(Investment.scheme_id == scheme_id).values(is_active=False))
+        session.commit()
+        asyncio.run(SQLHandler(session=session).refresh_portfolio_valuations(user_ids=[user_id]))
+
+    summary = client.get("/api/portfolio/summary", headers=headers).json()["data"]
+    assert (summary["total_value"], summary["total_investments"]) == (0.0, 0)
+
+
+def test_revaluation_snapshots_portfolios_holding_changed_schemes(client):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with TestingSessionLocal() as session:
+        sql_handler = SQLHandler(session=session)
+        mapping = asyncio.run(sql_handler.bulk_upsert_fund_schemes([
+            {"scheme_code": code, "scheme_name": code, "fund_family": "Snapshot Fund", "fund_type": "Open",
+             "updated_at": now} for code in ("SNAP1", "SNAP2")
+        ]))
+        asyncio.run(sql_handler.bulk_upsert_nav_history([
+            {"scheme_id": mapping[code], "nav": 10.0, "nav_date": now.date(), "updated_at": now}
+            for code in ("SNAP1", "SNAP2")
+        ]))
+        user = Users(email="snapshot@example.com", first_name="Snap", last_name="Shot", password="x")
+        session.add(user)
+        session.flush()
+        holder, bystander = Portfolio(user_id=user.id, name="Holder"), Portfolio(user_id=user.id, name="Bystander")
+        session.add_all([holder, bystander])
+        session.flush()
+        session.add_all([
+            Investment(portfolio_id=holder.id, scheme_id=mapping["SNAP1"], amount=1000, units=100, purchased_nav=10),
+            Investment(portfolio_id=holder.id, scheme_id=mapping["SNAP2"], amount=500, units=50, purchased_nav=10),
+            Investment(portfolio_id=bystander.id, scheme_id=mapping["SNAP2"], amount=500, units=50, purchased_nav=10),
+        ])
+        session.execute(update(LatestNav).where(LatestNav.scheme_id == mapping["SNAP1"]).values(nav=12.0))
+        session.commit()
+
+        report = IngestionReport(changed_scheme_ids={mapping["SNAP1"]})
+        asyncio.run(SchedulerHandler.revalue_portfolios(SQLHandler(session=session), report))
+
+        snapshots = session.execute(select(PortfolioSnapshot).where(PortfolioSnapshot.run_id == report.run_id)).scalars().all()
+        assert [(s.portfolio_id, s.total_amount, s.total_value, s.gain_loss, s.total_investments) for s in snapshots] == [
+            (holder.id, 1500.0, 1700.0, 200.0, 2)
+        ]
+        assert (report.portfolios_revalued, report.investments_revalued) == (1, 2)
+        assert report.revaluation_rows_per_sec > 0
@@ -0,0 +1,52 @@
+import datetime
+
+from src.db.pg.handler import SQLHandler
+from test.query_counter import assert_max_queries
+from test.conftest import engine, TestingSessionLocal
+
+
+def _auth_headers(client):
+    user = {"email": "query.count@example.com", "first_name": "Query", "last_name": "Count", "password": "strongpassword123"}
+    client.post("/api/auth/register", json=user)
+    response = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    return {"Authorization": f"Bearer {response.headers['Authorization']}"}
+
+async def _seed_family(family: str, schemes: int):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with TestingSessionLocal() as session:
+        sql_handler = SQLHandler(session=session)
+        mapping = await sql_handler.bulk_upsert_fund_schemes([
+            {"scheme_code": f"QC{i}", "scheme_name": f"Scheme {i}", "fund_family": family,
+             "fund_type": "Open", "updated_at": now}
+            for i in range(schemes)
+        ])
+        await sql_handler.bulk_upsert_nav_history([
+            {"scheme_id": scheme_id, "nav": 10.0, "nav_date": now.date(), "updated_at": now}
+            for scheme_id in mapping.values()
+        ])
+        await sql_handler.refresh_fund_family_summary()
+
+def test_schemes_by_family_has_no_n_plus_one(client):
+    import asyncio
+    asyncio.run(_seed_family("Query Count Fund", schemes=25))
+    headers = _auth_headers(client)
+
+    # user lookup + family existence check + one projected schemes query
+    with assert_max_queries(engine, 3):
+        response = client.get("/api/fund-families/Query Count Fund/schemes", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 25
+
+def test_registration_and_login_round_trips(client):
+    user = {"email": "round.trips@example.com", "first_name": "Round", "last_name": "Trips", "password": "strongpassword123"}
+
+    # user insert + default portfolio insert (one statement on Postgres), no existence check
+    with assert_max_queries(engine, 2):
+        assert client.post("/api/auth/register", json=user).status_code == 200
+    with assert_max_queries(engine, 1):
+        assert client.post("/api/auth/register", json=user).status_code == 409
+
+    with assert_max_queries(engine, 1):
+        response = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    assert response.status_code == 200
@@ -0,0 +1,118 @@
+import asyncio
+import fnmatch
+
+from src.cache.responses import MemoryBackend, RedisBackend, ResponseCache
+from src.utils.serialization import FastJSONResponse
+
+
+class FakeRedis:
+    """
+    Stands in for redis.asyncio.Redis: the commands RedisBackend uses, with millisecond expiry ignored.
+    """
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, px=None):
+        self.store[key] = value
+
+    async def scan_iter(self, match="*", count=None):
+        for key in list(self.store):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+
+def _cached_handler(backend):
+    cache = ResponseCache(backend, ttl_seconds=60)
+
+    class Handler:
+        calls = 0
+
+        @cache.cached("fetch")
+        async def fetch(self, name: str):
+            self.calls += 1
+            await asyncio.sleep(0.01)  # long enough for concurrent requests to pile up behind the first
+            return FastJSONResponse.success(message="ok", data={"name": name})
+
+    handler = Handler()
+    handler.cache = cache
+    return handler
+
+
+def test_memory_backend_lru_and_ttl():
+    async def run():
+        backend = MemoryBackend(max_size=2)
+        await backend.set("a", b"1", 60)
+        await backend.set("b", b"2", 60)
+        assert await backend.get("a") == b"1"  # a is now the most recently used
+        await backend.set("c", b"3", 60)
+        assert await backend.get("b") is None
+        assert backend.evictions == 1
+
+        await backend.set("d", b"4", 0)
+        assert await backend.get("d") is None
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_compute_once():
+    async def run():
+        handler = _cached_handler(MemoryBackend(max_size=10))
+        responses = await asyncio.gather(*(handler.fetch("x") for _ in range(20)))
+        assert handler.calls == 1
+        assert len({response.body for response in responses}) == 1 and b'"name":"x"' in responses[0].body
+        assert (handler.cache.misses, handler.cache.coalesced) == (1, 19)
+
+        await handler.fetch("x")
+        await handler.fetch("y")
+        assert (handler.calls, handler.cache.hits) == (2, 1)
+
+        await handler.cache.invalidate()
+        await handler.fetch("x")
+        assert handler.calls == 3
+
+    asyncio.run(run())
+
+
+def test_redis_backend_is_shared_and_invalidated():
+    async def run():
+        redis = FakeRedis()
+        first, second = _cached_handler(RedisBackend(redis, prefix="t:")), _cached_handler(RedisBackend(redis, prefix="t:"))
+        await first.fetch("x")
+        await second.fetch("x")
+        assert (first.calls, second.calls) == (1, 0)
+
+        redis.store["other:key"] = b"kept"
+        await second.cache.invalidate()
+        assert list(redis.store) == ["other:key"]
+        await first.fetch("x")
+        assert first.calls == 2
+
+    asyncio.run(run())
+
+
+def test_errors_are_not_cached():
+    async def run():
+        cache = ResponseCache(MemoryBackend(max_size=10), ttl_seconds=60)
+        calls = 0
+
+        async def fail():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(cache.get_or_compute("k", fail) for _ in range(3)), return_exceptions=True)
+        assert calls == 1 and all(isinstance(result, ValueError) for result in results)
+        assert cache.in_flight == {}
+        await asyncio.gather(cache.get_or_compute("k", fail), return_exceptions=True)
+        assert calls == 2
+
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+import asyncio
+import contextlib
+
+from src.scheduler.leader import LeaderElection
+
+
+def test_leader_only_jobs_are_skipped_on_followers():
+    election = LeaderElection(lock_key=1)
+    runs = []
+
+    async def job(value):
+        runs.append(value)
+        return value
+
+    guarded = election.leader_only(job)
+    assert asyncio.run(guarded("follower")) is None
+    election.is_leader = True
+    assert asyncio.run(guarded("leader")) == "leader"
+    assert runs == ["leader"]
+
+
+def test_job_runs_are_recorded(monkeypatch):
+    from sqlalchemy import select
+
+    from src.core.schemas.scheduler import IngestionReport
+    from src.db.pg.sql_schemas import SchedulerJob
+    from src.scheduler import jobs
+    from test.conftest import TestingSessionLocal
+
+    @contextlib.asynccontextmanager
+    async def session():
+        with TestingSessionLocal() as db:
+            yield db
+
+    monkeypatch.setattr(jobs.session_util, "async_session", session)
+
+    async def failing_sync():
+        return IngestionReport(status="failed", error="upstream quota exceeded")
+
+    async def ok():
+        return True
+
+    asyncio.run(jobs.JobRegistry.recorded("test_sync", failing_sync, "host:1")())
+    asyncio.run(jobs.JobRegistry.recorded("test_sync", ok, "host:2")())
+
+    with TestingSessionLocal() as session:
+        job = session.scalar(select(SchedulerJob).where(SchedulerJob.job_id == "test_sync"))
+        assert (job.run_count, job.failure_count, job.last_status, job.instance_id) == (2, 1, "success", "host:2")
+        assert job.last_duration_ms >= 0
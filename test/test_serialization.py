@@ -0,0 +1,23 @@
+import datetime
+import decimal
+import uuid
+
+import orjson
+
+from src.utils.serialization import FastJSONResponse, JSONUtil
+
+
+def test_rows_serialize_like_jsonable_encoder():
+    scheme_id = uuid.uuid4()
+    row = {"scheme_id": scheme_id, "amount": decimal.Decimal("1000"), "units": decimal.Decimal("12.5"),
+           "nav_date": datetime.date(2026, 1, 2), "updated_at": datetime.datetime(2026, 1, 2, 3, 4, 5)}
+
+    assert orjson.loads(JSONUtil.dumps(row)) == {"scheme_id": str(scheme_id), "amount": 1000, "units": 12.5,
+                                                "nav_date": "2026-01-02", "updated_at": "2026-01-02T03:04:05"}
+
+def test_success_response_keeps_envelope():
+    response = FastJSONResponse.success(message="ok", data=[{"code": "100"}], nav_epoch=7)
+
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == {"status": "success", "message": "ok", "data": [{"code": "100"}],
+                                           "nav_epoch": 7}
@@ -0,0 +1,50 @@
+import asyncio
+import uuid
+
+from sqlalchemy import select
+
+from src.cache.users import UserCache, UserPrincipal, user_cache
+from src.db.pg.handler import SQLHandler
+from src.db.pg.sql_schemas import Users
+from test.conftest import TestingSessionLocal
+
+
+def _principal(is_active=True):
+    return UserPrincipal(uuid.uuid4(), "cache@example.com", "Cache", "User", is_active)
+
+def test_user_cache_lru_ttl_and_counters():
+    cache = UserCache(max_size=2, ttl_seconds=60)
+    first, second, third = _principal(), _principal(), _principal()
+    cache.put(first)
+    cache.put(second)
+    assert cache.get(first.id) == first  # first is now the most recently used
+    cache.put(third)
+
+    assert cache.get(second.id) is None
+    assert cache.get(third.id) == third
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 1, 1)
+
+    cache.invalidate(first.id)
+    assert cache.get(first.id) is None
+    cache.put(_principal(is_active=False))
+    assert cache.stats()["size"] == 1
+
+    expired = UserCache(max_size=2, ttl_seconds=0)
+    expired.put(first)
+    assert expired.get(first.id) is None
+
+def test_deactivated_user_is_rejected(client):
+    user = {"email": "deactivate@example.com", "first_name": "De", "last_name": "Activate", "password": "strongpassword123"}
+    client.post("/api/auth/register", json=user)
+    token = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]}).headers["Authorization"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/me", headers=headers).status_code == 200
+    hits = user_cache.hits
+    assert client.get("/api/me", headers=headers).status_code == 200
+    assert user_cache.hits == hits + 1
+
+    with TestingSessionLocal() as session:
+        user_id = session.scalar(select(Users.id).where(Users.email == user["email"]))
+        asyncio.run(SQLHandler(session=session).update_user(user_id, {"is_active": False}))
+    assert client.get("/api/me", headers=headers).status_code == 401